@@ -0,0 +1,76 @@
+import asyncio
+import json
+
+# Events buffered per client before the oldest ones are dropped
+SUBSCRIBER_QUEUE_SIZE = 64
+
+
+def format_sse(event, data):
+    """Encodes one Server-Sent Event. `data` is raw JSON bytes or a JSON-serializable object."""
+    if not isinstance(data, (bytes, bytearray)):
+        data = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + bytes(data) + b"\n\n"
+
+
+RESYNC_EVENT = format_sse("resync", {"reason": "client fell behind, refetch via REST"})
+
+
+class Subscriber:
+    __slots__ = ("topics", "queue", "lagged")
+
+    def __init__(self, topics, maxsize):
+        self.topics = topics
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.lagged = False
+
+
+class Broadcaster:
+    """
+    Topic fan-out for SSE clients on a single event loop.
+
+    Every event is encoded once and the same bytes are queued for each
+    subscriber of its topic, so an idle client costs one parked coroutine and
+    a publish costs O(subscribers of that topic). A slow client never blocks
+    the publisher: when its queue is full the oldest event is dropped and
+    the client is told to resync over REST.
+    """
+
+    def __init__(self, queue_size=SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._topics = {}  # topic -> set of Subscriber
+
+    def subscribe(self, topics):
+        sub = Subscriber(frozenset(topics), self.queue_size)
+        for topic in sub.topics:
+            self._topics.setdefault(topic, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        for topic in sub.topics:
+            subs = self._topics.get(topic)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._topics[topic]
+
+    def subscriber_count(self):
+        return len({sub for subs in self._topics.values() for sub in subs})
+
+    def publish(self, topic, chunk):
+        """Queues pre-encoded SSE bytes for every subscriber of `topic`. Never blocks."""
+        for sub in self._topics.get(topic, ()):
+            if sub.queue.full():
+                sub.queue.get_nowait()
+                sub.lagged = True
+            sub.queue.put_nowait(chunk)
+
+    async def next_event(self, sub, timeout):
+        """Waits for the subscriber's next chunk; returns None on timeout (send a heartbeat)."""
+        try:
+            chunk = await asyncio.wait_for(sub.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+        if sub.lagged:
+            sub.lagged = False
+            return RESYNC_EVENT + chunk
+        return chunk
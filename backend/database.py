@@ -1,12 +1,30 @@
 import os
 import json
-import glob
-import pandas as pd
+import base64
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
 
-BASE_PATH = os.path.join(os.getcwd(), "data")
+from processing.parquet_store import list_partitions, partition_files
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASE_PATH = os.getenv("DATA_DIR", os.path.join(ROOT_DIR, "data"))
 PREDICTIONS_FILE = os.path.join(BASE_PATH, "latest_predictions.json")
 NEWS_PATH = os.path.join(BASE_PATH, "processed_news")
 
+# Only the NewsItem columns are read from disk. An explicit schema lets files
+# written from batches with an all-null column (typed `null` by pandas) scan
+# alongside files where that column is a string.
+NEWS_SCHEMA = pa.schema([
+    ("stock", pa.string()),
+    ("title", pa.string()),
+    ("description", pa.string()),
+    ("source", pa.string()),
+    ("published_at", pa.string()),
+    ("sentiment_score", pa.float64()),
+])
+NEWS_COLUMNS = NEWS_SCHEMA.names
+
 def read_predictions():
     """Reads the JSON file generated by the ML pipeline."""
     if not os.path.exists(PREDICTIONS_FILE):
@@ -18,35 +36,107 @@ def read_predictions():
         print(f"Database Read Error: {e}")
         return []
 
-def read_news(stock_symbol, limit=10):
-    """Reads parquet news data for a specific stock."""
+def encode_cursor(date, item):
+    raw = json.dumps([date, item["published_at"] or "", item["title"] or ""]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def decode_cursor(cursor):
+    """Returns the (partition date, published_at, title) key of the last item on the previous page."""
     try:
-        files = glob.glob(os.path.join(NEWS_PATH, "**/*.parquet"), recursive=True)
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if len(key) == 2:  # issued before the partition date was included
+            key = [str(key[0])[:10]] + key
+        date, published_at, title = key
+        return str(date), str(published_at), str(title)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+# Null published_at / title sort as "", i.e. after every timestamped headline of
+# their partition. Sorting and the cursor predicate both use this key.
+def _sort_key(item):
+    return (item["published_at"] or "", item["title"] or "")
+
+def _before(published_at, title):
+    """Filter for rows that sort after (published_at, title) in _sort_key order, newest first."""
+    published = pc.coalesce(ds.field("published_at"), pa.scalar(""))
+    headline = pc.coalesce(ds.field("title"), pa.scalar(""))
+    return (published < published_at) | ((published == published_at) & (headline < title))
+
+def query_news(stock_symbol, start=None, end=None, cursor=None, limit=20, root=NEWS_PATH):
+    """
+    Newest-first news for one stock, paginated by an opaque keyset cursor.
+
+    Partitions outside [start, end] (and newer than the cursor) are never
+    opened. Inside a partition only the NewsItem columns are read and the
+    stock filter is pushed down to Parquet row-group statistics. Partitions
+    are visited newest first and the scan stops once the page is full.
+    Returns (items, next_cursor).
+    """
+    after = decode_cursor(cursor) if cursor else None
+    if after is not None and after[0]:
+        end = min(end[:10], after[0]) if end else after[0]
+
+    items = []
+    for date, path in list_partitions(root, start, end):
+        files = partition_files(path)
+        if not files:
+            continue
+
+        condition = ds.field("stock") == stock_symbol
+        if after is not None and date == (after[0] or date):
+            condition &= _before(after[1], after[2])
+
+        table = ds.dataset(files, schema=NEWS_SCHEMA, format="parquet").to_table(
+            columns=NEWS_COLUMNS, filter=condition
+        )
+        rows = table.to_pylist()
+        rows.sort(key=_sort_key, reverse=True)
+        items.extend((date, row) for row in rows)
+        if len(items) >= limit:
+            break
+
+    page = items[:limit]
+    next_cursor = encode_cursor(*page[-1]) if len(page) == limit else None
+    return [row for _, row in page], next_cursor
+
+def query_news_bulk(stock_symbols, start=None, end=None, limit=10, root=NEWS_PATH):
+    """
+    Latest `limit` headlines for each of several stocks in one newest-first
+    pass over the partitions (one scan per partition for all symbols).
+    Returns {symbol: {column: [values]}} without the redundant `stock` column.
+    """
+    fields = [c for c in NEWS_COLUMNS if c != "stock"]
+    result = {symbol: {c: [] for c in fields} for symbol in stock_symbols}
+    counts = dict.fromkeys(stock_symbols, 0)
+
+    for date, path in list_partitions(root, start, end):
+        pending = [s for s in stock_symbols if counts[s] < limit]
+        if not pending:
+            break
+        files = partition_files(path)
         if not files:
-            return []
-        
-        # Sort by modification time to get latest data first
-        files = sorted(files, key=os.path.getmtime, reverse=True)[:5]
-        
-        df_list = []
-        for f in files:
-            try:
-                df = pd.read_parquet(f)
-                df_list.append(df)
-            except:
+            continue
+
+        table = ds.dataset(files, schema=NEWS_SCHEMA, format="parquet").to_table(
+            columns=NEWS_COLUMNS, filter=ds.field("stock").isin(pending)
+        )
+        if table.num_rows == 0:
+            continue
+        table = table.sort_by([("published_at", "descending"), ("title", "descending")])
+        columns = table.to_pydict()
+        for i, symbol in enumerate(columns["stock"]):
+            if counts[symbol] >= limit:
                 continue
-        
-        if not df_list:
-            return []
-            
-        full_df = pd.concat(df_list)
-        stock_news = full_df[full_df['stock'] == stock_symbol]
-        
-        if stock_news.empty:
-            return []
-            
-        return stock_news.sort_values(by='published_at', ascending=False).head(limit).to_dict(orient="records")
-        
+            counts[symbol] += 1
+            for c in fields:
+                result[symbol][c].append(columns[c][i])
+    return result
+
+def read_news(stock_symbol, limit=10):
+    """Latest news records for a specific stock."""
+    try:
+        items, _ = query_news(stock_symbol, limit=limit)
+        return items
     except Exception as e:
         print(f"Parquet Read Error: {e}")
-        return []
\ No newline at end of file
+        return []
@@ -0,0 +1,137 @@
+import os
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+import pandas as pd
+import xgboost as xgb
+
+from backend.series_store import to_ns
+from ml_pipeline.explanations import explain_batch, model_version, price_features, WARMUP_BARS
+
+# Explanations for past dates, computed on demand. One request for a date
+# explains every symbol in a single batched pred_contribs call, and the result
+# is cached under (model version, date): in memory for the hottest dates and as
+# JSON under <cache_dir>/<model version>/<date>.json across restarts. The
+# version is a hash of the model file, so a retrain starts a fresh cache with no
+# invalidation step. Today's date is never cached because its bar is still trading,
+# and neither is a result built while some symbol's history failed to load.
+# Concurrent requests for one (version, date) share a single computation.
+# The latest snapshot is not served from here: daily_prediction writes it to
+# latest_explanations.json when it publishes.
+
+# --- CONFIGURATION ---
+MEMORY_ENTRIES = 32
+
+
+class HistoricalExplainer:
+    """
+    `history(symbols)` -> {symbol: Series} of daily bars (e.g. HistoryCache.get_many),
+    `sentiment(date)` -> {symbol: mean sentiment that day}, `symbols()` -> symbols to explain.
+    """
+
+    def __init__(self, model_path, cache_dir, history, sentiment, symbols):
+        self.model_path = model_path
+        self.cache_dir = cache_dir
+        self.history = history
+        self.sentiment = sentiment
+        self.symbols = symbols
+        self._lock = threading.Lock()        # guards _memory and _inflight
+        self._model_lock = threading.Lock()
+        self._model = (None, None, None)  # (file stat, version, booster)
+        self._memory = OrderedDict()      # (version, date) -> result
+        self._inflight = {}               # (version, date) -> Future
+
+    def _load_model(self):
+        with self._model_lock:
+            st = os.stat(self.model_path)  # FileNotFoundError when no model has been trained
+            key = (st.st_mtime_ns, st.st_size)
+            if self._model[0] != key:
+                booster = xgb.Booster()
+                booster.load_model(self.model_path)
+                self._model = (key, model_version(self.model_path), booster)
+            return self._model[1], self._model[2]
+
+    def explain(self, date):
+        """
+        {model_version, date, explanations: {stock: {..., as_of}}} for the trading day on or before `date`.
+        Raises ValueError for a malformed or future date, LookupError when no symbol has enough history by then.
+        """
+        day = pd.Timestamp(date).normalize()  # ValueError on a malformed date
+        today = pd.Timestamp.now().normalize()
+        if day > today:
+            raise ValueError(f"{day.date()} is in the future")
+        date = day.strftime("%Y-%m-%d")
+
+        version, booster = self._load_model()
+        key = (version, date)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+            future = self._inflight.get(key)
+            leading = future is None
+            if leading:
+                future = self._inflight[key] = Future()
+        if not leading:
+            return future.result()
+
+        result = error = None
+        keep = False
+        try:
+            result, keep = self._load_or_compute(version, booster, day, cacheable=day < today)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            with self._lock:
+                if keep:
+                    self._memory[key] = result
+                    if len(self._memory) > MEMORY_ENTRIES:
+                        self._memory.popitem(last=False)
+                self._inflight.pop(key, None)
+            if error is None and result is not None:
+                future.set_result(result)
+            else:
+                future.set_exception(error or RuntimeError(f"Explanation for {date} was interrupted"))
+        return result
+
+    def _load_or_compute(self, version, booster, day, cacheable):
+        """(result, whether to keep it cached)."""
+        path = os.path.join(self.cache_dir, version, f"{day.strftime('%Y-%m-%d')}.json")
+        try:
+            with open(path) as f:
+                return json.load(f), True
+        except (FileNotFoundError, ValueError):
+            pass
+        result, complete = self._compute(version, booster, day)
+        if not result["explanations"]:
+            raise LookupError(f"No price history to explain {day.date()} (outside the history window?)")
+        if not (cacheable and complete):
+            return result, False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "w") as f:
+            json.dump(result, f, separators=(",", ":"))
+        os.replace(path + ".tmp", path)
+        return result, True
+
+    def _compute(self, version, booster, day):
+        """(result, complete): complete is False when some symbol's history came back empty (a failed fetch)."""
+        end = to_ns(day + pd.Timedelta(days=1))
+        sentiment = self.sentiment(day.strftime("%Y-%m-%d"))
+        symbols = list(self.symbols())
+        history = self.history(symbols)
+        complete = all(len(history.get(symbol, ())) for symbol in symbols)
+        stocks, rows, as_of = [], [], {}
+        for symbol, series in history.items():
+            bars = series.slice(None, end)
+            features = price_features(bars["close"][-WARMUP_BARS:].tolist())
+            if features is None:
+                continue
+            stocks.append(symbol)
+            rows.append({"mc_sentiment": sentiment.get(symbol, 0.0), **features})
+            as_of[symbol] = str(pd.Timestamp(int(bars["dates"][-1])).date())
+        explanations = explain_batch(booster, stocks, rows)
+        for stock, entry in explanations.items():
+            entry["as_of"] = as_of[stock]
+        return {"model_version": version, "date": day.strftime("%Y-%m-%d"), "explanations": explanations}, complete
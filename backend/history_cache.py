@@ -0,0 +1,245 @@
+import os
+import time
+import zlib
+import importlib
+import threading
+from concurrent.futures import Future
+import numpy as np
+import pandas as pd
+
+from backend.series_store import Series, to_ns
+
+# How much history to pull per interval. Requests are served as slices of this window.
+INTERVAL_PERIODS = {
+    "1d": "2y",
+    "1wk": "5y",
+    "1mo": "10y",
+    "1h": "730d",
+    "30m": "60d",
+    "15m": "60d",
+    "5m": "60d",
+    "1m": "7d",
+}
+INTRADAY_INTERVALS = {"1h", "30m", "15m", "5m", "1m"}
+# What an expired, non-empty entry re-fetches: a short recent window whose bars are
+# appended to the cached series (see Series.extend) instead of the whole period
+REFRESH_PERIODS = {
+    "1d": "5d",
+    "1wk": "1mo",
+    "1mo": "3mo",
+    "1h": "5d",
+    "30m": "5d",
+    "15m": "5d",
+    "5m": "5d",
+    "1m": "1d",
+}
+
+HISTORY_TTL_SECONDS = int(os.getenv("HISTORY_TTL_SECONDS", "300"))
+# Failed or empty fetches are cached briefly so an unknown symbol can't hammer upstream
+NEGATIVE_TTL_SECONDS = 30
+
+
+# --- UPSTREAM FETCHERS ---
+# A fetcher takes (symbols, interval, period) and returns {symbol: DataFrame}
+# indexed by date with at least a 'close' column and optionally open/high/low/volume (any case).
+
+def yfinance_fetcher(symbols, interval, period):
+    """Downloads all requested symbols from Yahoo Finance in one call."""
+    import yfinance as yf
+
+    tickers = [f"{s}.NS" for s in symbols]
+    df = yf.download(tickers, period=period, interval=interval, group_by="ticker",
+                     progress=False, auto_adjust=True, threads=True)
+    frames = {}
+    if df.empty:
+        return frames
+    for symbol, ticker in zip(symbols, tickers):
+        if isinstance(df.columns, pd.MultiIndex):
+            if ticker not in df.columns.get_level_values(0):
+                continue
+            frames[symbol] = df[ticker]
+        else:
+            frames[symbol] = df
+    return frames
+
+
+SYNTHETIC_FREQS = {"1d": "B", "1wk": "W-FRI", "1mo": "MS", "1h": "h",
+                   "30m": "30min", "15m": "15min", "5m": "5min", "1m": "min"}
+
+def synthetic_fetcher(symbols, interval, period, bars=500):
+    """Deterministic random-walk stand-in for yfinance (tests, benchmarks, offline dev)."""
+    end = pd.Timestamp.now().normalize()
+    index = pd.date_range(end=end, periods=bars, freq=SYNTHETIC_FREQS.get(interval, "B"))
+    frames = {}
+    for symbol in symbols:
+        rng = np.random.default_rng(zlib.crc32(f"{symbol}:{interval}".encode()))
+        close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.015, bars)))
+        frames[symbol] = pd.DataFrame({
+            "Close": close,
+            "Volume": rng.integers(100_000, 5_000_000, bars),
+        }, index=index)
+    return frames
+
+
+def load_fetcher(spec):
+    """Resolves 'yfinance', 'synthetic' or a 'package.module:function' path."""
+    if spec in (None, "", "yfinance"):
+        return yfinance_fetcher
+    if spec == "synthetic":
+        return synthetic_fetcher
+    module_name, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _normalize(frame):
+    """Converts an upstream frame into a date-sorted, tz-naive Series of OHLCV arrays."""
+    if frame is None or frame.empty:
+        return Series()
+    frame = frame.copy()
+    frame.columns = [str(c).lower() for c in frame.columns]
+    out = pd.DataFrame(index=pd.DatetimeIndex(frame.index))
+    out["close"] = frame["close"].astype("float64")
+    for column in ("open", "high", "low"):
+        if column in frame.columns:
+            out[column] = frame[column].astype("float64").fillna(out["close"])
+    out["volume"] = frame["volume"].fillna(0).astype("int64") if "volume" in frame.columns else 0
+    out = out.dropna(subset=["close"])
+    if out.index.tz is not None:
+        out.index = out.index.tz_localize(None)
+    return Series.from_frame(out.sort_index())
+
+
+class HistoryCache:
+    """
+    Per-(symbol, interval) TTL cache in front of the upstream price fetcher.
+
+    Concurrent misses for the same key are coalesced: the first caller fetches,
+    everyone else waits on its Future, so a dashboard refresh by many users
+    costs one upstream request per symbol per TTL. An expired series is
+    refreshed by fetching only REFRESH_PERIODS and appending to it in place
+    (the leading caller is its only writer); the full period is fetched when
+    the cache is cold or the recent window doesn't continue the cached bars.
+    """
+
+    def __init__(self, fetcher=None, ttl=HISTORY_TTL_SECONDS):
+        self.fetcher = fetcher or yfinance_fetcher
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}   # key -> (expires_at, Series)
+        self._inflight = {}  # key -> Future
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, symbol, interval="1d"):
+        return self.get_many([symbol], interval)[symbol]
+
+    def get_many(self, symbols, interval="1d"):
+        """Returns {symbol: Series}; all uncached symbols are fetched in a single upstream call."""
+        now = time.monotonic()
+        results, leading, waiting, stale = {}, {}, {}, {}
+        with self._lock:
+            for symbol in dict.fromkeys(symbols):
+                key = (symbol, interval)
+                entry = self._entries.get(key)
+                if entry and entry[0] > now:
+                    results[symbol] = entry[1]
+                    continue
+                future = self._inflight.get(key)
+                if future is None:
+                    future = Future()
+                    self._inflight[key] = future
+                    leading[symbol] = future
+                    if entry and len(entry[1]):
+                        stale[symbol] = entry[1]
+                else:
+                    waiting[symbol] = future
+
+        if leading:
+            self._fetch(interval, leading, stale)
+        for symbol, future in {**leading, **waiting}.items():
+            results[symbol] = future.result()
+        return results
+
+    def _call_fetcher(self, symbols, interval, period):
+        try:
+            return self.fetcher(symbols, interval, period)
+        except Exception as e:
+            print(f"Error fetching history for {', '.join(symbols)}: {e}")
+            return {}
+
+    def _fetch(self, interval, futures, stale=None):
+        refreshed, frames = {}, {}
+        try:
+            stale = stale or {}
+            if stale:
+                recent = self._call_fetcher(list(stale), interval, REFRESH_PERIODS[interval])
+                for symbol, series in stale.items():
+                    try:
+                        if series.extend(_normalize(recent.get(symbol))):
+                            refreshed[symbol] = series
+                    except Exception as e:
+                        print(f"Error refreshing history for {symbol}: {e!r}")
+            rest = [symbol for symbol in futures if symbol not in refreshed]
+            if rest:
+                frames = self._call_fetcher(rest, interval, INTERVAL_PERIODS[interval])
+        except Exception as e:
+            print(f"Error fetching history for {', '.join(futures)}: {e!r}")
+
+        # Every waiter gets a result or the exception, and the key leaves _inflight, whatever happens
+        for symbol, future in futures.items():
+            series = error = None
+            try:
+                series = refreshed[symbol] if symbol in refreshed else _normalize(frames.get(symbol))
+            except Exception as e:
+                error = e
+                print(f"Error normalizing history for {symbol}: {e!r}")
+            finally:
+                with self._lock:
+                    if series is not None:
+                        ttl = self.ttl if len(series) else NEGATIVE_TTL_SECONDS
+                        self._entries[(symbol, interval)] = (time.monotonic() + ttl, series)
+                    self._inflight.pop((symbol, interval), None)
+                if series is not None:
+                    future.set_result(series)
+                else:
+                    future.set_exception(error or RuntimeError(f"History fetch for {symbol} was interrupted"))
+
+
+def history_bounds(start=None, end=None):
+    """
+    (start ns or None, end ns or None) for a [start, end] request, defaulting to
+    the last 3 months. A bare end date includes every bar on that day.
+    Raises ValueError on a malformed date.
+    """
+    if start is None and end is None:
+        start = pd.Timestamp.now().normalize() - pd.DateOffset(months=3)
+    end_ns = None
+    if end is not None:
+        end_ts = pd.Timestamp(end)
+        if len(str(end)) <= 10:
+            end_ts += pd.Timedelta(days=1)
+        end_ns = end_ts.value
+    return None if start is None else to_ns(start), end_ns
+
+
+def history_columns(series, bounds, interval="1d"):
+    """Slices the cached series to history_bounds() and returns {'date', 'close', 'volume'} column lists."""
+    # Views into the cached arrays; only the output lists are allocated
+    bars = series.slice(*bounds)
+
+    unit = "m" if interval in INTRADAY_INTERVALS else "D"
+    dates = np.datetime_as_string(bars["dates"].view("datetime64[ns]"), unit=unit).tolist()
+    return {
+        "date": [d.replace("T", " ") for d in dates] if unit == "m" else dates,
+        "close": np.round(bars["close"], 2).tolist(),
+        "volume": bars["volume"].tolist(),
+    }
+
+
+def serialize_history(series, start=None, end=None, interval="1d"):
+    """StockHistory dicts for the cached series, built from the column lists."""
+    columns = history_columns(series, history_bounds(start, end), interval=interval)
+    return [{"date": d, "close": c, "volume": v}
+            for d, c, v in zip(columns["date"], columns["close"], columns["volume"])]
@@ -1,14 +1,45 @@
+import sys
 import os
+
+# --- FIX: Add project root to path so 'backend.*' imports work when run from backend/ ---
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
 import json
-import glob
-import pandas as pd
-from fastapi import FastAPI, HTTPException
+import time
+import asyncio
+import contextlib
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from typing import List, Optional
-import yfinance as yf
+from typing import Optional
+
+from backend.schemas import NewsPage
+from backend.database import query_news, query_news_bulk
+from backend.stock_index import ProcessedDataIndex
+from backend.history_cache import HistoryCache, INTERVAL_PERIODS, load_fetcher, serialize_history, history_bounds, history_columns
+from backend.predictions_cache import PredictionsPayload, accepts_gzip, etag_matches, not_modified_since
+from backend.broadcaster import Broadcaster, format_sse
+from backend.pipeline_watcher import PipelineWatcher
+from backend.explanations_cache import HistoricalExplainer
+from ingestion.symbols import symbol_names
+from ml_pipeline.sentiment_aggregates import daily_sentiment
+from monitoring import metrics
+from eda.eda_stats import EdaStatsStore
+
+# Seconds between SSE keep-alive comments on an idle stream
+SSE_HEARTBEAT_SECONDS = 15
+# Upper bound on ?symbols= for the bulk endpoints
+MAX_BULK_SYMBOLS = 500
 
-app = FastAPI(title="Stock Big Data API")
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    watcher = PipelineWatcher(BROADCASTER, PREDICTIONS, {"news": NEWS_DATA_PATH, "moneycontrol": MC_DATA_PATH})
+    task = asyncio.create_task(watcher.run())
+    yield
+    task.cancel()
+
+app = FastAPI(title="Stock Big Data API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,12 +49,48 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template (not raw path) to keep series cardinality bounded
+    route = request.scope.get("route")
+    labels = {"route": getattr(route, "path", "unmatched"), "method": request.method}
+    metrics.histogram("api_request_seconds", "API request latency until response headers", labels).observe(
+        time.perf_counter() - start)
+    metrics.counter("api_responses_total", "API responses by status", {**labels, "status": str(response.status_code)}).inc()
+    return response
+
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-BASE_PATH = os.path.join(ROOT_DIR, "data")
+# DATA_DIR points the API at another data folder (e.g. a load-test fixture)
+BASE_PATH = os.getenv("DATA_DIR", os.path.join(ROOT_DIR, "data"))
 PREDICTIONS_FILE = os.path.join(BASE_PATH, "latest_predictions.json")
-PROCESSED_DATA_FILE = os.path.join(BASE_PATH, "processed_data", "processed_stocks.csv")
+EXPLANATIONS_FILE = os.path.join(BASE_PATH, "latest_explanations.json")
+MODEL_FILE = os.path.join(ROOT_DIR, "models", "xgboost_stock_model.json")
+PROCESSED_DATA_FILE = os.path.join(BASE_PATH, "processed_data", "processed_stocks.arrow")
+NEWS_DATA_PATH = os.path.join(BASE_PATH, "processed_news")
+MC_DATA_PATH = os.path.join(BASE_PATH, "processed_moneycontrol")
 PLOT_DIR = os.path.join(ROOT_DIR, "eda", "plots")
 
+PREDICTIONS = PredictionsPayload(PREDICTIONS_FILE)
+# Same stat-and-reload caching as the predictions; the file is written right before them
+EXPLANATIONS = PredictionsPayload(EXPLANATIONS_FILE)
+BROADCASTER = Broadcaster()
+EDA_STATS = EdaStatsStore(os.path.join(BASE_PATH, "eda_stats"))
+# Loaded lazily on first request, reloaded whenever the pipeline rewrites the file
+PROCESSED_INDEX = ProcessedDataIndex(PROCESSED_DATA_FILE)
+# Set HISTORY_FETCHER=synthetic (or module:function) to run without Yahoo Finance
+HISTORY_CACHE = HistoryCache(fetcher=load_fetcher(os.getenv("HISTORY_FETCHER")))
+
+def sentiment_on(date):
+    day = daily_sentiment(MC_DATA_PATH, start=date, end=date)
+    return dict(zip(day["stock"], day["sentiment"]))
+
+# Past dates are explained for all symbols at once and cached by (model version, date)
+HISTORICAL_EXPLAINER = HistoricalExplainer(MODEL_FILE, os.path.join(BASE_PATH, "cache", "explanations"),
+                                           lambda symbols: HISTORY_CACHE.get_many(symbols, "1d"),
+                                           sentiment_on, symbol_names)
+
 # Mount EDA plots folder so Frontend can access images
 if os.path.exists(PLOT_DIR):
     app.mount("/plots", StaticFiles(directory=PLOT_DIR), name="plots")
@@ -32,46 +99,205 @@ if os.path.exists(PLOT_DIR):
 def health_check():
     return {"status": "ok", "message": "Big Data API is running"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus exposition of the API's own metrics plus the snapshots pushed by pipeline jobs."""
+    metrics.gauge("api_stream_subscribers", "Connected SSE clients").set(BROADCASTER.subscriber_count())
+    series = [{**s, "labels": {**s["labels"], "job": "api"}} for s in metrics.REGISTRY.snapshot()]
+    return PlainTextResponse(metrics.render_prometheus(series + metrics.collect_snapshots()),
+                             media_type="text/plain; version=0.0.4")
+
+@app.get("/eda/stats")
+def get_eda_stats(
+    symbols: Optional[str] = None,
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+):
+    """
+    Precomputed EDA aggregates (histogram, correlation, sentiment/return bins,
+    monthly series) for the selected symbols and month range, for client-side charts.
+    """
+    parsed = parse_symbols(symbols) if symbols else None
+    result = EDA_STATS.query(parsed, start=date_from, end=date_to)
+    if result is None:
+        raise HTTPException(status_code=404, detail="EDA statistics have not been built yet")
+    return result
+
 @app.get("/predictions")
-def get_all_predictions():
-    if not os.path.exists(PREDICTIONS_FILE):
-        return []
-    with open(PREDICTIONS_FILE, "r") as f:
-        data = json.load(f)
-    return data
+def get_all_predictions(request: Request):
+    """Serves the cached predictions bytes; repeat polls with a matching ETag get a bodyless 304."""
+    snapshot = PREDICTIONS.current()
+    gzipped = accepts_gzip(request.headers.get("accept-encoding"))
+    headers = {
+        "ETag": snapshot.gzip_etag if gzipped else snapshot.etag,
+        "Last-Modified": snapshot.last_modified,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+
+    # Either encoding's ETag proves the client holds this version
+    if_none_match = request.headers.get("if-none-match")
+    if etag_matches(if_none_match, snapshot.etag, snapshot.gzip_etag) or (
+        if_none_match is None and not_modified_since(request.headers.get("if-modified-since"), snapshot.mtime)
+    ):
+        return Response(status_code=304, headers=headers)
+
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=snapshot.gzipped, media_type="application/json", headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+def load_explanations(date):
+    """The latest published explanations, or (with `date`) the historical batch for that day."""
+    if date is None:
+        data = EXPLANATIONS.current().data
+        if not data:
+            raise HTTPException(status_code=404, detail="No explanations have been published yet")
+        return data
+    try:
+        return HISTORICAL_EXPLAINER.explain(date)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Model not found; train it first")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+def explanation_meta(data):
+    return {k: data[k] for k in ("model_version", "generated_at", "date") if k in data}
+
+@app.get("/explain")
+def get_bulk_explanations(symbols: Optional[str] = None, date: Optional[str] = None):
+    """
+    Per-feature contributions for many symbols (all by default), from the
+    latest snapshot or, with `date` (YYYY-MM-DD), computed for that day in one batch.
+    """
+    data = load_explanations(date)
+    entries = data["explanations"]
+    if symbols:
+        entries = {s: entries[s] for s in parse_symbols(symbols.upper()) if s in entries}
+    return {**explanation_meta(data), "explanations": entries}
+
+@app.get("/explain/{stock}")
+def get_explanation(stock: str, date: Optional[str] = None):
+    """
+    Why the model predicts what it does for this stock: TreeSHAP contribution
+    of each feature in log-odds (base_value + contributions = margin). Served
+    from the published snapshot with no model evaluation; `date` explains a past day.
+    """
+    data = load_explanations(date)
+    entry = data["explanations"].get(stock.upper())
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"No explanation for {stock}")
+    return {"stock": stock.upper(), **explanation_meta(data), **entry}
 
-@app.get("/news/{stock}")
-def get_stock_news(stock: str):
-    """Returns the latest records for this stock from the processed big data file."""
+@app.get("/stream")
+async def stream_updates(symbols: Optional[str] = None):
+    """
+    Server-Sent Events feed. Emits the current predictions on connect, then a
+    `predictions` event per new snapshot and a `news` event per newly scored
+    headline for the comma-separated `symbols`.
+    """
+    topics = {"predictions"} | {f"news:{s.strip()}" for s in (symbols or "").split(",") if s.strip()}
+    sub = BROADCASTER.subscribe(topics)
+
+    async def events():
+        try:
+            snapshot = await asyncio.to_thread(PREDICTIONS.current)
+            yield format_sse("predictions", snapshot.body)
+            while True:
+                chunk = await BROADCASTER.next_event(sub, SSE_HEARTBEAT_SECONDS)
+                yield chunk if chunk is not None else b": keep-alive\n\n"
+        finally:
+            BROADCASTER.unsubscribe(sub)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/news/{stock}", response_model=NewsPage)
+def get_stock_news(
+    stock: str,
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=200),
+):
+    """Scored headlines for this stock from processed_news, newest first. Pass `next_cursor` back as `cursor` for the next page."""
     try:
-        if not os.path.exists(PROCESSED_DATA_FILE):
-            return []
-        df = pd.read_csv(PROCESSED_DATA_FILE)
-        stock_data = df[df['Stock_Symbol'] == stock].sort_values(by='Date', ascending=False).head(10)
-        return stock_data.to_dict(orient="records")
-    except:
+        items, next_cursor = query_news(stock, start=date_from, end=date_to, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
+
+@app.get("/records/{stock}")
+def get_stock_records(stock: str, limit: int = Query(10, ge=1, le=500), before: Optional[str] = None):
+    """
+    Returns the latest records for this stock from the processed big data file.
+    Pass the oldest `Date` of a page as `before` to fetch the next page.
+    """
+    try:
+        return PROCESSED_INDEX.lookup(stock, limit=limit, before=before)
+    except Exception as e:
+        print(f"Error reading processed data: {e}")
         return []
 
+def parse_symbols(symbols):
+    parsed = list(dict.fromkeys(s.strip() for s in symbols.split(",") if s.strip()))
+    if not parsed:
+        raise HTTPException(status_code=400, detail="symbols is required")
+    if len(parsed) > MAX_BULK_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_SYMBOLS} symbols per request")
+    return parsed
+
+def stream_columnar(meta, per_symbol):
+    """
+    Streams {**meta, "symbols": {SYMBOL: {field: [values]}}} one symbol at a
+    time, so a large response is never built as a single string.
+    """
+    def chunks():
+        head = json.dumps(meta, separators=(",", ":"))[:-1]
+        yield (head + ("," if meta else "") + '"symbols":{').encode("utf-8")
+        for i, (symbol, columns) in enumerate(per_symbol):
+            prefix = "," if i else ""
+            yield (prefix + json.dumps(symbol) + ":" + json.dumps(columns, separators=(",", ":"))).encode("utf-8")
+        yield b"}}"
+    return StreamingResponse(chunks(), media_type="application/json")
+
+@app.get("/history")
+def get_bulk_history(symbols: str, start: Optional[str] = None, end: Optional[str] = None, interval: str = "1d"):
+    """Columnar price history for many symbols; uncached symbols are fetched upstream in one call."""
+    if interval not in INTERVAL_PERIODS:
+        raise HTTPException(status_code=400, detail=f"Unsupported interval '{interval}'")
+    parsed = parse_symbols(symbols)
+    # Everything that can fail runs before the response starts streaming, so errors keep their status code
+    try:
+        bounds = history_bounds(start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {e}")
+    series = HISTORY_CACHE.get_many(parsed, interval)
+    per_symbol = ((s, history_columns(series[s], bounds, interval=interval)) for s in parsed)
+    return stream_columnar({"interval": interval}, per_symbol)
+
+@app.get("/news")
+def get_bulk_news(
+    symbols: str,
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    limit: int = Query(10, ge=1, le=200),
+):
+    """Columnar latest headlines for many symbols from one pass over processed_news."""
+    parsed = parse_symbols(symbols)
+    result = query_news_bulk(parsed, start=date_from, end=date_to, limit=limit)
+    return stream_columnar({}, ((s, result[s]) for s in parsed))
+
 @app.get("/history/{stock}")
-def get_stock_history(stock: str):
+def get_stock_history(stock: str, start: Optional[str] = None, end: Optional[str] = None, interval: str = "1d"):
+    """Price history for the chart; defaults to the last 3 months of daily bars."""
+    if interval not in INTERVAL_PERIODS:
+        raise HTTPException(status_code=400, detail=f"Unsupported interval '{interval}'")
     try:
-        ticker = f"{stock}.NS"
-        df = yf.download(ticker, period="3mo", interval="1d", progress=False, auto_adjust=True)
-        if df.empty: return []
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = df.columns.get_level_values(0)
-        df.columns = [str(c).lower() for c in df.columns]
-        df = df.reset_index()
-        date_col = next((c for c in df.columns if 'date' in c.lower() or 'index' in c.lower()), None)
-        if not date_col: return []
-        history = []
-        for _, row in df.iterrows():
-            history.append({
-                "date": row[date_col].strftime('%Y-%m-%d'),
-                "close": round(float(row['close']), 2),
-                "volume": int(row['volume']) if 'volume' in row else 0
-            })
-        return history
+        series = HISTORY_CACHE.get(stock, interval)
+        return serialize_history(series, start=start, end=end, interval=interval)
     except Exception as e:
         print(f"Error fetching history: {e}")
         return []
@@ -0,0 +1,122 @@
+import os
+import asyncio
+import pandas as pd
+
+from backend.broadcaster import format_sse
+
+WATCH_INTERVAL_SECONDS = float(os.getenv("WATCH_INTERVAL_SECONDS", "1"))
+# Polls a part file may fail to read before it is skipped as corrupt
+WATCH_READ_ATTEMPTS = int(os.getenv("WATCH_READ_ATTEMPTS", "5"))
+
+# processed_* column -> NewsItem field, per streaming source
+NEWS_FIELD_MAPS = {
+    "news": {"stock": "stock", "title": "title", "description": "description",
+             "source": "source", "published_at": "published_at", "sentiment_score": "sentiment_score"},
+    "moneycontrol": {"stock_tag": "stock", "text": "title", "source": "source",
+                     "created_at": "published_at", "sentiment_score": "sentiment_score"},
+}
+
+
+class PartitionWatcher:
+    """
+    Reports Parquet part files added under a `date=` partitioned directory.
+    A file keeps being reported by scan() until the caller passes it to mark_seen().
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._dir_mtimes = {}
+        self._seen = {}    # partition dir -> set of file names
+        self._unread = {}  # partition dir -> names reported but not yet marked seen
+
+    def scan(self):
+        try:
+            partitions = [e for e in os.scandir(self.root) if e.is_dir() and e.name.startswith("date=")]
+        except FileNotFoundError:
+            return []
+
+        new_files = []
+        for entry in partitions:
+            # Only list partitions whose directory changed (i.e. got a new part file) or still owe a read
+            mtime = entry.stat().st_mtime_ns
+            if self._dir_mtimes.get(entry.path) == mtime and not self._unread.get(entry.path):
+                continue
+            self._dir_mtimes[entry.path] = mtime
+            seen = self._seen.setdefault(entry.path, set())
+            unread = self._unread[entry.path] = set()
+            for f in os.scandir(entry.path):
+                if f.name.endswith(".parquet") and f.name not in seen:
+                    unread.add(f.name)
+                    new_files.append(f.path)
+        return new_files
+
+    def mark_seen(self, path):
+        partition, name = os.path.split(path)
+        self._unread.get(partition, set()).discard(name)
+        self._seen.setdefault(partition, set()).add(name)
+
+
+def to_news_items(df, kind):
+    fields = NEWS_FIELD_MAPS[kind]
+    df = df[[c for c in fields if c in df.columns]].rename(columns=fields)
+    if "stock" not in df.columns:
+        return []
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict(orient="records")
+
+
+class PipelineWatcher:
+    """
+    Polls the pipeline's outputs and publishes changes to the broadcaster:
+    a new predictions version goes to the 'predictions' topic and every newly
+    written headline goes to 'news:<SYMBOL>'. Polling is stat-based, so an
+    idle pipeline costs a handful of syscalls per interval.
+    """
+
+    def __init__(self, broadcaster, predictions, news_dirs, interval=WATCH_INTERVAL_SECONDS,
+                 read_attempts=WATCH_READ_ATTEMPTS):
+        self.broadcaster = broadcaster
+        self.predictions = predictions
+        self.watchers = {kind: PartitionWatcher(path) for kind, path in news_dirs.items()}
+        self.interval = interval
+        self.read_attempts = read_attempts
+        self._failures = {}  # path -> failed reads so far
+        self._predictions_version = None
+
+    def _read_new_headlines(self):
+        items = []
+        for kind, watcher in self.watchers.items():
+            for path in watcher.scan():
+                try:
+                    items.extend(to_news_items(pd.read_parquet(path), kind))
+                except Exception as e:
+                    failures = self._failures[path] = self._failures.get(path, 0) + 1
+                    if failures < self.read_attempts:
+                        print(f"⚠️ Watcher could not read {path}, retrying next poll: {e}")
+                        continue
+                    print(f"❌ Watcher skipping {path} after {failures} failed reads: {e}")
+                self._failures.pop(path, None)
+                watcher.mark_seen(path)
+        return items
+
+    async def poll_once(self):
+        snapshot = await asyncio.to_thread(self.predictions.current)
+        if snapshot.version != self._predictions_version:
+            self._predictions_version = snapshot.version
+            self.broadcaster.publish("predictions", format_sse("predictions", snapshot.body))
+
+        for item in await asyncio.to_thread(self._read_new_headlines):
+            self.broadcaster.publish(f"news:{item['stock']}", format_sse("news", item))
+
+    async def run(self):
+        # Existing state is what clients fetch over REST; only push what changes from here on
+        self._predictions_version = (await asyncio.to_thread(self.predictions.current)).version
+        for watcher in self.watchers.values():
+            for path in await asyncio.to_thread(watcher.scan):
+                watcher.mark_seen(path)
+        while True:
+            try:
+                await self.poll_once()
+            except Exception as e:
+                print(f"❌ Pipeline Watcher Error: {e}")
+            await asyncio.sleep(self.interval)
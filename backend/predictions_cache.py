@@ -0,0 +1,111 @@
+import os
+import json
+import gzip
+import hashlib
+import threading
+from collections import namedtuple
+from email.utils import formatdate, parsedate_to_datetime
+
+PredictionsSnapshot = namedtuple(
+    "PredictionsSnapshot", ["version", "data", "body", "gzipped", "etag", "gzip_etag", "last_modified", "mtime"]
+)
+
+
+def _make_snapshot(version, data, mtime):
+    body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    digest = hashlib.sha1(body).hexdigest()[:16]
+    return PredictionsSnapshot(
+        version=version,
+        data=data,
+        body=body,
+        gzipped=gzip.compress(body, compresslevel=6, mtime=0),
+        # Strong ETags promise byte-identical bodies, so each encoding gets its own
+        etag='"%s"' % digest,
+        gzip_etag='"%s-gz"' % digest,
+        last_modified=formatdate(mtime, usegmt=True),
+        mtime=int(mtime),
+    )
+
+
+class PredictionsPayload:
+    """
+    Keeps latest_predictions.json pre-serialized (plain and gzipped) per file version.
+
+    The file is only re-read when its mtime/size changes, so a steady-state
+    poll is a stat() plus returning cached bytes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._snapshot = _make_snapshot(None, [], 0)
+
+    def _file_version(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None, 0
+        return (st.st_mtime_ns, st.st_size), st.st_mtime
+
+    def current(self):
+        version, mtime = self._file_version()
+        if version == self._snapshot.version:
+            return self._snapshot
+        with self._lock:
+            if version == self._snapshot.version:
+                return self._snapshot
+            if version is None:
+                self._snapshot = _make_snapshot(None, [], 0)
+                return self._snapshot
+            try:
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+            except Exception as e:
+                # Half-written file: keep serving the previous version until the next poll
+                print(f"Predictions Read Error: {e}")
+                return self._snapshot
+            self._snapshot = _make_snapshot(version, data, mtime)
+            return self._snapshot
+
+
+def etag_matches(if_none_match, *etags):
+    """Weak comparison of an If-None-Match header against any of our ETags (one per encoding)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") in etags:
+            return True
+    return False
+
+
+def accepts_gzip(accept_encoding):
+    """Whether an Accept-Encoding header allows gzip: an explicit q=0 refuses it, and `*` covers it when unnamed."""
+    named = wildcard = None
+    for item in (accept_encoding or "").split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        coding = coding.lower()
+        if coding in ("gzip", "x-gzip"):
+            named = max(named or 0.0, q)
+        elif coding == "*":
+            wildcard = q
+    if named is not None:
+        return named > 0
+    return bool(wildcard)
+
+
+def not_modified_since(if_modified_since, mtime):
+    if not if_modified_since:
+        return False
+    try:
+        return int(parsedate_to_datetime(if_modified_since).timestamp()) >= mtime
+    except (TypeError, ValueError):
+        return False
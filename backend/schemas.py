@@ -10,12 +10,17 @@ class StockPrediction(BaseModel):
     timestamp: str
 
 class NewsItem(BaseModel):
+    # Every column but stock is nullable in processed_news (NEWS_SCHEMA)
     stock: str
-    title: str
+    title: Optional[str] = None
     description: Optional[str] = None
-    source: str
-    published_at: str
-    sentiment_score: float
+    source: Optional[str] = None
+    published_at: Optional[str] = None
+    sentiment_score: Optional[float] = None
+
+class NewsPage(BaseModel):
+    items: List[NewsItem]
+    next_cursor: Optional[str] = None
 
 class StockHistory(BaseModel):
     date: str
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+# Bytes per bar: int64 date + float32 open/high/low + float64 close + int64 volume.
+# Close stays float64 because it is what the API serves and the models consume;
+# float32 would lose paise above ~65,536 (e.g. MRF). 2,000 symbols x 5 years of
+# daily bars (~252/year) is 2.52M bars = ~87 MiB at exact size. After appends the
+# spare capacity can add up to another 100% for the series that grew.
+BAR_BYTES = 8 + 3 * 4 + 8 + 8
+FIELDS = ("dates", "open", "high", "low", "close", "volume")
+DTYPES = {"dates": np.int64, "open": np.float32, "high": np.float32, "low": np.float32,
+          "close": np.float64, "volume": np.int64}
+
+
+class Series:
+    """
+    One symbol's bars as contiguous NumPy arrays, ordered by date
+    (int64 nanoseconds since the epoch, tz-naive).
+
+    Range queries binary-search `dates` and return views, so slicing a
+    response never copies. Appends go into spare capacity (doubled when
+    full), making them amortized O(1); HistoryCache uses them to fold a
+    refresh's new bars into the cached series instead of rebuilding it.
+
+    A single writer may append while other threads read. The bar count and
+    the arrays live in one (size, arrays) tuple that is replaced in a single
+    assignment, after the new bar is written below the old size's view or
+    into freshly grown copies, so a reader that takes `_state` once always
+    sees equal-length arrays of whole bars. The one exception is the
+    in-progress last bar: replacing it writes in place, so a concurrent
+    reader may see its fields from two consecutive updates of that bar.
+    """
+
+    __slots__ = ("_state",)
+
+    def __init__(self, capacity=0):
+        self._state = (0, {field: np.empty(capacity, dtype=DTYPES[field]) for field in FIELDS})
+
+    @classmethod
+    def from_arrays(cls, dates, close, volume=None, open=None, high=None, low=None):
+        """Builds an exact-size series (copying the inputs); missing open/high/low default to close, volume to 0."""
+        arrays = {"dates": np.array(dates, dtype=np.int64), "close": np.array(close, dtype=np.float64)}
+        n = len(arrays["dates"])
+        arrays["volume"] = np.zeros(n, dtype=np.int64) if volume is None else np.array(volume, dtype=np.int64)
+        for field, values in (("open", open), ("high", high), ("low", low)):
+            arrays[field] = np.array(arrays["close"] if values is None else values, dtype=np.float32)
+        series = cls()
+        series._state = (n, arrays)
+        return series
+
+    @classmethod
+    def from_frame(cls, frame):
+        """From a DataFrame with a sorted, tz-naive DatetimeIndex and lowercase OHLCV columns."""
+        columns = {c: frame[c].to_numpy() for c in ("open", "high", "low", "volume") if c in frame.columns}
+        return cls.from_arrays(frame.index.values.astype("datetime64[ns]").view(np.int64),
+                               frame["close"].to_numpy(), **columns)
+
+    def __len__(self):
+        return self._state[0]
+
+    @property
+    def capacity(self):
+        return len(self._state[1]["dates"])
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self._state[1].values())
+
+    def columns(self):
+        """{field: view of the filled bars}, all from one state."""
+        size, arrays = self._state
+        return {field: arrays[field][:size] for field in FIELDS}
+
+    def append(self, date, close, volume=0, open=None, high=None, low=None):
+        """
+        Adds a bar at `date` (ns). A bar with the same date as the last one
+        replaces it (an in-progress bar being updated); an older date is a ValueError.
+        """
+        n, arrays = self._state
+        if n and date < arrays["dates"][n - 1]:
+            raise ValueError("Bars must be appended in date order")
+        i = n - 1 if n and date == arrays["dates"][n - 1] else n
+        if i == len(arrays["dates"]):
+            capacity = max(16, 2 * i)
+            grown = {}
+            for field in FIELDS:
+                grown[field] = np.empty(capacity, dtype=DTYPES[field])
+                grown[field][:n] = arrays[field][:n]
+            arrays = grown
+        arrays["dates"][i] = date
+        arrays["close"][i] = close
+        arrays["volume"][i] = volume
+        arrays["open"][i] = close if open is None else open
+        arrays["high"][i] = close if high is None else high
+        arrays["low"][i] = close if low is None else low
+        self._state = (max(n, i + 1), arrays)
+
+    def extend(self, other):
+        """
+        Folds the bars of `other` (a fresh fetch of the recent window) into
+        this series: the last bar is replaced and newer ones are appended.
+        `other` must contain the bar before our last one with the same close,
+        so there is no gap and no back-adjustment of closed bars (e.g. after a
+        dividend); otherwise returns False and leaves the series untouched.
+        """
+        n, arrays = self._state
+        new = other.columns()
+        if n < 2:
+            return False
+        anchor = arrays["dates"][n - 2]
+        at = int(np.searchsorted(new["dates"], anchor, side="left"))
+        if at == len(new["dates"]) or new["dates"][at] != anchor:
+            return False
+        if not np.isclose(new["close"][at], arrays["close"][n - 2], rtol=1e-9, atol=0):
+            return False
+        if at + 1 < len(new["dates"]) and new["dates"][at + 1] < arrays["dates"][n - 1]:
+            return False  # upstream has a bar we never saw
+        for j in range(at + 1, len(new["dates"])):
+            self.append(new["dates"][j], new["close"][j], new["volume"][j],
+                        new["open"][j], new["high"][j], new["low"][j])
+        return True
+
+    def bounds(self, start=None, end=None):
+        """(lo, hi) positions of bars with start <= date < end (ns, either may be None)."""
+        size, arrays = self._state
+        return self._bounds(arrays["dates"][:size], start, end)
+
+    @staticmethod
+    def _bounds(dates, start, end):
+        lo = 0 if start is None else int(np.searchsorted(dates, start, side="left"))
+        hi = len(dates) if end is None else int(np.searchsorted(dates, end, side="left"))
+        return lo, max(lo, hi)
+
+    def slice(self, start=None, end=None):
+        """{field: array view} for bars with start <= date < end."""
+        columns = self.columns()
+        lo, hi = self._bounds(columns["dates"], start, end)
+        return {field: array[lo:hi] for field, array in columns.items()}
+
+
+def to_ns(value):
+    return pd.Timestamp(value).value
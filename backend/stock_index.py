@@ -0,0 +1,72 @@
+import os
+import threading
+import numpy as np
+from processing.stage_format import read_frame
+
+
+class ProcessedDataIndex:
+    """
+    In-memory, per-symbol view of the processed stocks stage file.
+
+    The file is memory-mapped and converted once and split into one date-sorted frame per symbol.
+    Every lookup only stats the file (to pick up a rewrite by the pipeline)
+    and binary-searches the symbol's date array, so request cost no longer
+    grows with the total size of the dataset.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        # (file version, {symbol: frame}, {symbol: sorted date array})
+        self._snapshot = (None, {}, {})
+
+    def _file_version(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _build(self, version):
+        if version is None:
+            return (None, {}, {})
+
+        df = read_frame(self.path)
+        df = df.sort_values(['Stock_Symbol', 'Date'], kind='mergesort')
+
+        frames, dates = {}, {}
+        for symbol, group in df.groupby('Stock_Symbol', sort=False):
+            group = group.reset_index(drop=True)
+            frames[symbol] = group
+            # Dates are ISO 'YYYY-MM-DD' strings, so lexical order == time order
+            dates[symbol] = group['Date'].to_numpy(dtype=str)
+        print(f"📚 Indexed {len(df)} processed records for {len(frames)} symbols.")
+        return (version, frames, dates)
+
+    def refresh(self):
+        """Reloads the index if the file changed since the last load."""
+        version = self._file_version()
+        if version == self._snapshot[0]:
+            return self._snapshot
+        with self._lock:
+            # Another request may have reloaded while we waited for the lock
+            if version != self._snapshot[0]:
+                self._snapshot = self._build(version)
+            return self._snapshot
+
+    def symbols(self):
+        return sorted(self.refresh()[1])
+
+    def lookup(self, symbol, limit=10, before=None):
+        """Returns up to `limit` records for `symbol` dated strictly before `before`, newest first."""
+        _, frames, dates = self.refresh()
+        frame = frames.get(symbol)
+        if frame is None:
+            return []
+
+        symbol_dates = dates[symbol]
+        end = len(symbol_dates) if before is None else int(np.searchsorted(symbol_dates, before, side='left'))
+        start = max(0, end - limit)
+        if start >= end:
+            return []
+        return frame.iloc[start:end].iloc[::-1].to_dict(orient="records")
@@ -0,0 +1,85 @@
+import sys
+import os
+
+# --- FIX: Add project root to path ---
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+import random
+import argparse
+
+from ingestion.entity_tagger import EntityTagger, registry_tagger
+
+# Tagging throughput as the alias dictionary grows. With Aho-Corasick the cost
+# per headline should stay flat from a hundred to tens of thousands of aliases;
+# the naive "search every alias in every headline" baseline grows linearly.
+
+WORDS = ["shares", "rally", "after", "quarterly", "results", "beat", "estimates", "market", "update",
+         "analysts", "cut", "target", "price", "on", "weak", "demand", "and", "margin", "pressure"]
+
+
+def synthetic_aliases(count, rng):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    names = set()
+    while len(names) < count:
+        names.add(" ".join("".join(rng.choice(letters) for _ in range(rng.randint(4, 9)))
+                           for _ in range(rng.randint(1, 3))).title())
+    return [(name, f"SYM{i:05d}", False) for i, name in enumerate(sorted(names))]
+
+
+def headlines(aliases, count, rng):
+    out = []
+    for _ in range(count):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(10, 18))]
+        for _ in range(rng.randint(0, 3)):
+            words.insert(rng.randrange(len(words)), rng.choice(aliases)[0])
+        out.append(" ".join(words))
+    return out
+
+
+def check_registry():
+    tagger = registry_tagger()
+    assert tagger.tag("HDFC Bank, ICICI Bank and SBI lead gains; Airtel slips") == \
+        ["HDFCBANK", "ICICIBANK", "SBIN", "BHARTIARTL"]
+    assert tagger.tag("HDFC Bankers meet", "tcs wins deal") == []
+
+
+def naive_tag(patterns, text):
+    lowered = text.lower()
+    return [symbol for alias, symbol, _ in patterns if alias.lower() in lowered]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entity tagger throughput vs. alias dictionary size.")
+    parser.add_argument("--sizes", default="100,1000,10000,50000", help="Comma list of dictionary sizes.")
+    parser.add_argument("--headlines", type=int, default=5000)
+    parser.add_argument("--naive-limit", type=int, default=10000, help="Skip the naive baseline above this size.")
+    args = parser.parse_args()
+
+    check_registry()
+    rng = random.Random(42)
+    print(f"{'aliases':>8} {'build s':>8} {'tagger us/hl':>13} {'naive us/hl':>12}")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        patterns = synthetic_aliases(size, rng)
+        t0 = time.perf_counter()
+        tagger = EntityTagger(patterns)
+        build = time.perf_counter() - t0
+        texts = headlines(patterns, args.headlines, rng)
+
+        t0 = time.perf_counter()
+        for text in texts:
+            tagger.tag(text)
+        tagged = (time.perf_counter() - t0) / len(texts) * 1e6
+
+        naive = "-"
+        if size <= args.naive_limit:
+            sample = texts[:500]
+            t0 = time.perf_counter()
+            for text in sample:
+                naive_tag(patterns, text)
+            naive = f"{(time.perf_counter() - t0) / len(sample) * 1e6:.1f}"
+        print(f"{size:>8} {build:8.2f} {tagged:13.1f} {naive:>12}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
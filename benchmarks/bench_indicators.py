@@ -0,0 +1,89 @@
+import sys
+import os
+
+# --- FIX: Add project root to path ---
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+import tempfile
+import argparse
+import numpy as np
+import pandas as pd
+
+from ml_pipeline.indicators import IndicatorBook, SymbolIndicators
+
+# Per-bar cost of the incremental indicator engine against recomputing the
+# pandas rolling windows over each symbol's history, at 1-minute resolution.
+# The incremental cost should stay flat as history grows; the recompute grows with it.
+
+
+def check_against_pandas(rng, bars=2000):
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, bars)))
+    s = pd.Series(closes)
+    expected = {"ma_5": s.rolling(5).mean(), "ma_10": s.rolling(10).mean(),
+                "volatility": s.pct_change().rolling(5).std(), "ema_12": s.ewm(span=12, adjust=False).mean()}
+    state = SymbolIndicators()
+    for i, close in enumerate(closes):
+        state.update(i, close)
+        if i >= 10:
+            snap = state.snapshot()
+            for name, series in expected.items():
+                assert abs(snap[name] - series.iloc[i]) < 1e-9, (name, i)
+
+
+def recompute_latest(closes):
+    s = pd.Series(closes)
+    return s.rolling(5).mean().iloc[-1], s.rolling(10).mean().iloc[-1], s.pct_change().rolling(5).std().iloc[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental indicators vs. pandas recompute per bar.")
+    parser.add_argument("--symbols", type=int, default=2000)
+    parser.add_argument("--bars", type=int, default=375, help="Bars per symbol (375 = one NSE session of 1m bars).")
+    parser.add_argument("--history", default="100,1000,10000", help="Comma list of history lengths for the recompute baseline.")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    check_against_pandas(rng)
+
+    names = [f"SYM{i:05d}" for i in range(args.symbols)]
+    paths = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, (args.bars, args.symbols)), axis=0))
+    book = IndicatorBook()
+    t0 = time.perf_counter()
+    for bar, row in enumerate(paths.tolist()):
+        for name, close in zip(names, row):
+            book.update(name, bar, close)
+    elapsed = time.perf_counter() - t0
+    updates = args.bars * args.symbols
+    print(f"⚡ Incremental: {updates:,} bar updates in {elapsed:.2f}s ({elapsed / updates * 1e6:.2f} us/update, "
+          f"{updates / elapsed:,.0f} updates/s)")
+
+    t0 = time.perf_counter()
+    for name, close in zip(names, paths[-1].tolist()):
+        book[name].snapshot(close)
+    print(f"   Forming-bar snapshot: {(time.perf_counter() - t0) / args.symbols * 1e6:.2f} us/symbol")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "state", "indicators.json")
+        t0 = time.perf_counter()
+        book.save(path)
+        saved = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        restored = IndicatorBook.load(path)
+        loaded = time.perf_counter() - t0
+        assert restored[names[0]].snapshot() == book[names[0]].snapshot()
+        print(f"💾 Checkpoint of {args.symbols:,} symbols: {os.path.getsize(path) / 1024:.0f} KiB, "
+              f"save {saved * 1000:.0f} ms, load {loaded * 1000:.0f} ms")
+
+    print(f"{'history':>8} {'recompute us/bar':>17}")
+    for length in [int(h) for h in args.history.split(",")]:
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, length)))
+        reps = 200
+        t0 = time.perf_counter()
+        for _ in range(reps):
+            recompute_latest(closes)
+        print(f"{length:>8} {(time.perf_counter() - t0) / reps * 1e6:17.1f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
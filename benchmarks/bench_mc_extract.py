@@ -0,0 +1,90 @@
+import sys
+import os
+
+# --- FIX: Add project root to path ---
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import glob
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from bs4 import BeautifulSoup
+
+from benchmarks.stubs import moneycontrol_page
+from ingestion import mc_extract
+
+# Parse throughput on MoneyControl tag pages: the BeautifulSoup/html.parser
+# extraction the scraper used to do, against lxml and the early-stopping
+# streaming parser in ingestion/mc_extract.py, then lxml across a process pool.
+# Pass --pages with a folder of saved tag pages (*.html) to measure real markup;
+# otherwise the stub pages from benchmarks/stubs.py are used.
+
+
+def soup_extract(html, limit=2):
+    """The previous extraction: full BeautifulSoup tree, then find_all."""
+    soup = BeautifulSoup(html, 'html.parser')
+    stories = []
+    for item in soup.find_all('li', class_='clearfix'):
+        if len(stories) >= limit:
+            break
+        h2 = item.find('h2')
+        link = h2.find('a') if h2 else None
+        if not link:
+            continue
+        span = item.find('span')
+        stories.append((link.get_text().strip(), span.get_text() if span else None))
+    return stories
+
+
+def load_pages(folder, count):
+    if folder:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(folder, "*.html"))):
+            with open(path, "rb") as f:
+                pages.append(f.read())
+        return pages
+    return [moneycontrol_page(f"stock-{i}", items=20 + i % 10).encode("utf-8") for i in range(count)]
+
+
+def throughput(func, pages, limit):
+    t0 = time.perf_counter()
+    for page in pages:
+        func(page, limit)
+    return len(pages) / (time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MoneyControl page parse throughput.")
+    parser.add_argument("--pages", default=None, help="Folder of saved tag pages (*.html).")
+    parser.add_argument("--count", type=int, default=300, help="Stub pages to generate when --pages is not given.")
+    parser.add_argument("--limit", type=int, default=2, help="Headlines taken per page.")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages, args.count)
+    if not pages:
+        sys.exit(f"No *.html pages in {args.pages}")
+    extractors = {"bs4 html.parser": soup_extract, "streaming": mc_extract.extract_streaming}
+    if mc_extract.lxml:
+        extractors["lxml"] = mc_extract.extract_lxml
+    for name, func in extractors.items():
+        for page in pages:
+            assert func(page, args.limit) == soup_extract(page, args.limit), f"{name} disagrees with bs4"
+
+    size = sum(len(p) for p in pages) / len(pages)
+    print(f"📄 {len(pages)} pages, {size / 1024:.0f} KiB average, {args.limit} headlines each")
+    baseline = throughput(soup_extract, pages, args.limit)
+    for name, func in extractors.items():
+        rate = baseline if func is soup_extract else throughput(func, pages, args.limit)
+        print(f"{name:>16}: {rate:9,.0f} pages/s ({rate / baseline:5.1f}x)")
+
+    with ProcessPoolExecutor(args.workers) as pool:
+        list(pool.map(mc_extract.extract_headlines, pages[:args.workers]))  # warm the workers
+        t0 = time.perf_counter()
+        list(pool.map(mc_extract.extract_headlines, pages, [args.limit] * len(pages), chunksize=16))
+        rate = len(pages) / (time.perf_counter() - t0)
+    print(f"{'pool x' + str(args.workers):>16}: {rate:9,.0f} pages/s ({rate / baseline:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
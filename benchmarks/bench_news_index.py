@@ -0,0 +1,91 @@
+import sys
+import os
+
+# --- FIX: Add project root to path ---
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+from backend.stock_index import ProcessedDataIndex
+from processing.stage_format import PROCESSED_SCHEMA, write_stage
+
+
+def make_processed_csv(path, rows, symbols=50):
+    """Writes a synthetic processed_stocks.csv (and .arrow stage file) with the pipeline's columns."""
+    per_symbol = rows // symbols
+    dates = pd.bdate_range(end="2025-12-31", periods=per_symbol).strftime('%Y-%m-%d')
+    rng = np.random.default_rng(42)
+    n = per_symbol * symbols
+    close = rng.uniform(100, 3000, n)
+    df = pd.DataFrame({
+        "Date": np.tile(dates, symbols),
+        "Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+        "Volume": rng.integers(50_001, 5_000_000, n),
+        "Dividends": 0.0, "Stock_Splits": 0.0,
+        "Stock_Symbol": np.repeat([f"SYM{i:03d}" for i in range(symbols)], per_symbol),
+        "Sentiment_Score": rng.uniform(-0.8, 0.8, n),
+        "Title": "Synthetic headline",
+        "Target": rng.integers(0, 2, n),
+        "MA_10": close, "Prev_Day_Sentiment": 0.0, "Volatility": 0.02, "Daily_Return": 0.1,
+    })
+    df.to_csv(path, index=False)
+    write_stage(df, os.path.splitext(path)[0] + ".arrow", PROCESSED_SCHEMA, csv_export=False)
+    return df["Stock_Symbol"].unique().tolist()
+
+
+def legacy_lookup(path, stock):
+    """The previous /news/{stock} implementation: full parse per request."""
+    df = pd.read_csv(path)
+    return df[df['Stock_Symbol'] == stock].sort_values(by='Date', ascending=False).head(10).to_dict(orient="records")
+
+
+def percentiles(samples):
+    arr = np.array(samples) * 1000
+    return f"p50={np.percentile(arr, 50):.3f}ms p99={np.percentile(arr, 99):.3f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /news/{stock} lookup paths.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--legacy-runs", type=int, default=3)
+    parser.add_argument("--index-runs", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "processed_stocks.csv")
+        print(f"🧪 Generating {args.rows} synthetic rows...")
+        symbols = make_processed_csv(path, args.rows)
+
+        samples = []
+        for i in range(args.legacy_runs):
+            t0 = time.perf_counter()
+            legacy_lookup(path, symbols[i % len(symbols)])
+            samples.append(time.perf_counter() - t0)
+        print(f"⏱️ Legacy full-scan lookup: {percentiles(samples)}")
+
+        index = ProcessedDataIndex(os.path.splitext(path)[0] + ".arrow")
+        t0 = time.perf_counter()
+        index.refresh()
+        print(f"⏱️ Index cold load: {(time.perf_counter() - t0) * 1000:.1f}ms")
+
+        samples = []
+        for i in range(args.index_runs):
+            t0 = time.perf_counter()
+            index.lookup(symbols[i % len(symbols)], limit=10)
+            samples.append(time.perf_counter() - t0)
+        print(f"⏱️ Indexed lookup: {percentiles(samples)}")
+
+        samples = []
+        for i in range(args.index_runs):
+            t0 = time.perf_counter()
+            index.lookup(symbols[i % len(symbols)], limit=10, before="2020-06-01")
+            samples.append(time.perf_counter() - t0)
+        print(f"⏱️ Indexed lookup with `before`: {percentiles(samples)}")
+
+
+if __name__ == "__main__":
+    main()
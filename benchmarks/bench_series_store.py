@@ -0,0 +1,103 @@
+import sys
+import os
+
+# --- FIX: Add project root to path ---
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+from backend.series_store import Series, BAR_BYTES
+from backend.history_cache import history_bounds, history_columns
+
+# Documented target in backend/series_store.py: 2,000 symbols x 5 years of daily bars under 100 MB
+FOOTPRINT_TARGET_MB = 100
+
+
+def _rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def build_store(symbols, bars):
+    dates = pd.bdate_range(end="2025-12-31", periods=bars).values.view(np.int64)
+    rng = np.random.default_rng(7)
+    store = {}
+    for i in range(symbols):
+        close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.015, bars)))
+        store[f"SYM{i:04d}"] = Series.from_arrays(dates, close, rng.integers(100_000, 5_000_000, bars),
+                                                  open=close, high=close * 1.01, low=close * 0.99)
+    return store
+
+
+def check_append():
+    """Appends keep date order, replace an in-progress bar and grow amortized O(1)."""
+    series = Series()
+    for i in range(1000):
+        series.append(i, float(i), volume=i)
+    series.append(999, 5.0, volume=1)
+    assert len(series) == 1000 and series.columns()["close"][999] == 5.0 and series.capacity == 1024
+    assert series.bounds(10, 20) == (10, 20)
+    try:
+        series.append(3, 1.0)
+        raise AssertionError("out-of-order append accepted")
+    except ValueError:
+        pass
+
+
+def percentiles(samples):
+    arr = np.array(samples) * 1000
+    return f"p50={np.percentile(arr, 50):.3f}ms p99={np.percentile(arr, 99):.3f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Footprint and query cost of the per-symbol series store.")
+    parser.add_argument("--symbols", type=int, default=2000)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    check_append()
+    bars = args.years * 252
+    rss_before = _rss_mb()
+    store = build_store(args.symbols, bars)
+    total = sum(s.nbytes for s in store.values())
+    print(f"📦 {args.symbols} symbols x {bars} bars: arrays {total / 2**20:.1f} MB "
+          f"({BAR_BYTES} B/bar), RSS +{_rss_mb() - rss_before:.1f} MB")
+
+    symbols = list(store)
+    samples = []
+    for i in range(args.queries):
+        t0 = time.perf_counter()
+        history_columns(store[symbols[i % len(symbols)]], history_bounds("2025-01-01", "2025-03-31"))
+        samples.append(time.perf_counter() - t0)
+    print(f"⏱️ 3-month range query + serialization: {percentiles(samples)}")
+
+    # The previous representation: one DataFrame per symbol, sliced per request
+    columns = store[symbols[0]].columns()
+    frame = pd.DataFrame({"close": columns["close"], "volume": columns["volume"]},
+                         index=pd.DatetimeIndex(columns["dates"].view("datetime64[ns]")))
+    samples = []
+    for _ in range(args.queries // 10):
+        t0 = time.perf_counter()
+        window = frame.loc["2025-01-01":"2025-03-31"]
+        [{"date": d, "close": c, "volume": v} for d, (c, v) in zip(window.index.strftime("%Y-%m-%d"),
+                                                                 window.itertuples(index=False))]
+        samples.append(time.perf_counter() - t0)
+    print(f"⏱️ DataFrame slice + per-row dicts:     {percentiles(samples)}")
+
+    # Scale the target to the requested universe so smaller runs are checked too
+    target = FOOTPRINT_TARGET_MB * (args.symbols / 2000) * (args.years / 5)
+    if total / 2**20 > target:
+        print(f"❌ Footprint {total / 2**20:.1f} MB exceeds the {target:.1f} MB target")
+        sys.exit(1)
+    print(f"✅ Footprint within the {target:.1f} MB target.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import sys
+import os
+
+# --- FIX: Add project root to path ---
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import pandas as pd
+
+from benchmarks.bench_news_index import make_processed_csv
+from processing.stage_format import read_frame, iter_frames
+
+# What each downstream stage reads from the processed file
+STAGE_COLUMNS = {
+    "model_training": ['Stock_Symbol', 'Target', 'MA_10', 'Sentiment_Score', 'Volatility', 'Close', 'Daily_Return'],
+    "eda": ['Close', 'Volume', 'Sentiment_Score', 'MA_10', 'Volatility', 'Daily_Return'],
+    "backend_index": None,  # every column is served back to the client
+}
+CSV_CHUNK_ROWS = 250_000
+
+
+def _rss_mb():
+    # Peak RSS of this process image. Unlike ru_maxrss, VmHWM is not inherited from the parent across fork/exec.
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def measure(fmt, stage, path):
+    """Runs one stage's read in this (fresh) process and returns seconds and peak RSS growth."""
+    columns = STAGE_COLUMNS[stage]
+    baseline = _rss_mb()
+    t0 = time.perf_counter()
+    if stage == "eda":
+        # EDA streams chunks and only keeps running sums
+        chunks = pd.read_csv(path, usecols=columns, chunksize=CSV_CHUNK_ROWS) if fmt == "csv" else iter_frames(path, columns)
+        rows = sum(len(chunk) for chunk in chunks)
+    elif fmt == "csv":
+        rows = len(pd.read_csv(path, usecols=columns))
+    else:
+        rows = len(read_frame(path, columns))
+    return {"seconds": time.perf_counter() - t0, "peak_rss_mb": _rss_mb() - baseline, "rows": rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare CSV and Arrow stage files per downstream stage.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--measure", nargs=3, metavar=("FORMAT", "STAGE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(*args.measure)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "processed_stocks.csv")
+        print(f"🧪 Generating {args.rows} synthetic rows...")
+        make_processed_csv(csv_path, args.rows)
+        paths = {"csv": csv_path, "arrow": os.path.splitext(csv_path)[0] + ".arrow"}
+        for fmt, path in paths.items():
+            print(f"📦 {fmt:<6} {os.path.getsize(path) / 2**20:8.1f} MB")
+
+        print(f"\n{'stage':<16}{'format':<8}{'read':>10}{'peak RSS':>12}")
+        for stage in STAGE_COLUMNS:
+            for fmt, path in paths.items():
+                # A subprocess per measurement so peak RSS isn't inherited from earlier runs
+                out = subprocess.run([sys.executable, os.path.abspath(__file__), "--measure", fmt, stage, path],
+                                     capture_output=True, text=True, check=True).stdout
+                result = json.loads(out.strip().splitlines()[-1])
+                print(f"{stage:<16}{fmt:<8}{result['seconds'] * 1000:8.0f}ms{result['peak_rss_mb']:9.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+import sys
+import os
+
+# --- FIX: Add project root to path ---
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import time
+import random
+import socket
+import shutil
+import asyncio
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+
+from benchmarks.suite import stage_records, scored, write_partitions, make_raw_frame
+from processing.stage_format import PROCESSED_SCHEMA, write_stage
+
+# HTTP load generator for the FastAPI backend. It starts uvicorn locally against
+# a synthetic data folder, with yfinance replaced by benchmarks/stubs.py. It then
+# drives the dashboard routes from keep-alive connections and sweeps uvicorn
+# worker counts x client concurrency to find where throughput stops scaling.
+#
+#   python benchmarks/load_test.py --workers 1,2,4 --concurrency 1,8,32,128 --duration 10
+
+# --- CONFIGURATION ---
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(ROOT_DIR, "backend")
+
+ROUTES = {
+    "predictions": "/predictions",
+    "news": "/news/{symbol}?limit=20",
+    "history": "/history/{symbol}",
+    "plots": "/plots/correlation_heatmap.png",
+}
+# A step counts as "still scaling" while it adds at least this much RPS over the previous concurrency
+SATURATION_GAIN = 1.10
+REQUEST_TIMEOUT_SECONDS = 30
+
+
+def prepare_data(data_dir, symbols):
+    """Synthetic predictions, processed news partitions and the processed stage file."""
+    scale = {"symbols": symbols, "days": 500}
+    names = [f"SYM{i:03d}" for i in range(symbols)]
+    os.makedirs(data_dir, exist_ok=True)
+    with open(os.path.join(data_dir, "latest_predictions.json"), "w") as f:
+        json.dump([{"stock": s, "current_price": 100.0, "prediction": "UP", "confidence": 60.0,
+                    "sentiment_score": 0.1, "timestamp": "2025-01-01T00:00:00"} for s in names], f, indent=4)
+    write_partitions(os.path.join(data_dir, "processed_news"),
+                     scored(stage_records(scale, "news", symbols * 200)))
+    processed = make_raw_frame(scale)
+    for column in ("MA_10", "Prev_Day_Sentiment", "Volatility", "Daily_Return"):
+        processed[column] = 0.0
+    write_stage(processed, os.path.join(data_dir, "processed_data", "processed_stocks.arrow"),
+                PROCESSED_SCHEMA, csv_export=False)
+    return names
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers, data_dir, port, env_overrides):
+    env = {**os.environ, "DATA_DIR": data_dir, "HISTORY_FETCHER": "benchmarks.stubs:yfinance_fetcher",
+           "METRICS_DIR": os.path.join(data_dir, "metrics"), "PYTHONPATH": ROOT_DIR, **env_overrides}
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+                             "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+                            cwd=BACKEND_DIR, env=env)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with {proc.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5) as s:
+                s.sendall(b"GET / HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+                if s.recv(12).startswith(b"HTTP/1.1 200"):
+                    return proc
+        except OSError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("uvicorn did not become ready")
+
+
+def stop_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+class Connection:
+    """Minimal HTTP/1.1 keep-alive client; cheap enough that the generator isn't the bottleneck."""
+
+    def __init__(self, port):
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection("127.0.0.1", self.port)
+        self.writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nAccept-Encoding: identity\r\n\r\n".encode())
+        await self.writer.drain()
+
+        status = int((await self.reader.readuntil(b"\r\n")).split(b" ", 2)[1])
+        headers = {}
+        while True:
+            line = await self.reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if "content-length" in headers:
+            await self.reader.readexactly(int(headers["content-length"]))
+        elif headers.get("transfer-encoding") == "chunked":
+            while True:
+                size = int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        if headers.get("connection") == "close":
+            self.close()
+        return status
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def run_load(port, routes, symbols, concurrency, duration, warmup):
+    """Closed-loop load: `concurrency` clients each issue requests back to back. Returns per-route samples."""
+    samples = {route: [] for route in routes}  # route -> [(latency, ok)]
+    measuring = False
+    stop_at = time.monotonic() + warmup + duration
+
+    async def client(seed):
+        rng = random.Random(seed)
+        conn = Connection(port)
+        i = seed
+        while time.monotonic() < stop_at:
+            route = routes[i % len(routes)]
+            i += 1
+            path = ROUTES[route].format(symbol=rng.choice(symbols))
+            t0 = time.perf_counter()
+            try:
+                status = await asyncio.wait_for(conn.request(path), REQUEST_TIMEOUT_SECONDS)
+                ok = 200 <= status < 400
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError):
+                conn.close()
+                ok = False
+            if measuring:
+                samples[route].append((time.perf_counter() - t0, ok))
+        conn.close()
+
+    async def start_measuring():
+        nonlocal measuring
+        await asyncio.sleep(warmup)
+        measuring = True
+
+    await asyncio.gather(start_measuring(), *(client(i) for i in range(concurrency)))
+    return samples
+
+
+def summarize(samples, duration):
+    def stats(rows):
+        if not rows:
+            return {"requests": 0, "rps": 0.0, "error_rate": 0.0, "p50_ms": None, "p95_ms": None, "p99_ms": None}
+        latencies = np.array([r[0] for r in rows]) * 1000
+        errors = sum(1 for r in rows if not r[1])
+        return {
+            "requests": len(rows),
+            "rps": len(rows) / duration,
+            "error_rate": errors / len(rows),
+            **{f"p{p}_ms": float(np.percentile(latencies, p)) for p in (50, 95, 99)},
+        }
+    everything = [row for rows in samples.values() for row in rows]
+    return {"total": stats(everything), "routes": {route: stats(rows) for route, rows in samples.items()}}
+
+
+def find_saturation(levels):
+    """Lowest concurrency after which adding clients no longer raises RPS by SATURATION_GAIN."""
+    for prev, cur in zip(levels, levels[1:]):
+        if cur["total"]["rps"] < prev["total"]["rps"] * SATURATION_GAIN:
+            return prev
+    return None
+
+
+def _fmt_ms(value):
+    return f"{value:8.1f}" if value is not None else "       -"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the FastAPI backend with stubbed upstreams.")
+    parser.add_argument("--workers", default="1,2,4", help="Comma list of uvicorn worker counts to sweep.")
+    parser.add_argument("--concurrency", default="1,8,32,64,128", help="Comma list of concurrent clients to sweep.")
+    parser.add_argument("--routes", default=",".join(ROUTES), help=f"Comma list from {', '.join(ROUTES)}.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per level.")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds before each level.")
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--upstream-latency-ms", type=float, default=0.0,
+                        help="Simulated yfinance latency inside the stub.")
+    parser.add_argument("--history-ttl", type=int, default=None,
+                        help="Override HISTORY_TTL_SECONDS (low values force upstream fetches).")
+    parser.add_argument("--output", default=None, help="Write the full results as JSON here.")
+    args = parser.parse_args()
+
+    routes = [r.strip() for r in args.routes.split(",") if r.strip()]
+    unknown = [r for r in routes if r not in ROUTES]
+    if unknown:
+        parser.error(f"unknown routes {unknown}")
+    env_overrides = {"STUB_UPSTREAM_LATENCY_MS": str(args.upstream_latency_ms)}
+    if args.history_ttl is not None:
+        env_overrides["HISTORY_TTL_SECONDS"] = str(args.history_ttl)
+
+    data_dir = tempfile.mkdtemp(prefix="loadtest-data-")
+    results = []
+    try:
+        print(f"🧪 Preparing synthetic data for {args.symbols} symbols in {data_dir}...")
+        symbols = prepare_data(data_dir, args.symbols)
+        for workers in [int(w) for w in args.workers.split(",")]:
+            port = _free_port()
+            server = start_server(workers, data_dir, port, env_overrides)
+            print(f"\n🚀 uvicorn workers={workers} routes={','.join(routes)}")
+            print(f"{'clients':>8} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+            levels = []
+            try:
+                for concurrency in [int(c) for c in args.concurrency.split(",")]:
+                    samples = asyncio.run(run_load(port, routes, symbols, concurrency, args.duration, args.warmup))
+                    level = {"workers": workers, "concurrency": concurrency, **summarize(samples, args.duration)}
+                    levels.append(level)
+                    total = level["total"]
+                    print(f"{concurrency:>8} {total['rps']:9.1f} {_fmt_ms(total['p50_ms'])} {_fmt_ms(total['p95_ms'])} "
+                          f"{_fmt_ms(total['p99_ms'])} {total['error_rate']:7.2%}", flush=True)
+            finally:
+                stop_server(server)
+
+            for route in routes:
+                best = max(levels, key=lambda lv: lv["routes"][route]["rps"])["routes"][route]
+                print(f"   {route:<12} best {best['rps']:8.1f} rps  p95 {_fmt_ms(best['p95_ms'])} ms")
+            saturated = find_saturation(levels)
+            if saturated:
+                print(f"📈 Saturates at ~{saturated['concurrency']} clients "
+                      f"({saturated['total']['rps']:.0f} rps, p95 {saturated['total']['p95_ms']:.1f} ms)")
+            else:
+                print("📈 Still scaling at the highest concurrency tested.")
+            results.extend(levels)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"created": time.time(), "args": vars(args), "levels": results}, f, indent=2)
+        print(f"💾 Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
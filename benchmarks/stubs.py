@@ -0,0 +1,133 @@
+import os
+import re
+import sys
+import json
+import time
+import types
+import zlib
+import numpy as np
+import pandas as pd
+
+# Offline stand-ins for the upstream services the pipeline talks to, so the
+# benchmark suite measures our code and not Yahoo/NewsAPI/MoneyControl latency.
+# Data is deterministic per ticker (seeded from its name).
+
+PERIOD_DAYS = {"d": 1, "wk": 7, "mo": 30, "y": 365}
+# Simulated network round trip for the yfinance stand-in (0 = instant)
+UPSTREAM_LATENCY_MS = float(os.getenv("STUB_UPSTREAM_LATENCY_MS", "0"))
+
+
+def _rng(*parts):
+    return np.random.default_rng(zlib.crc32(":".join(map(str, parts)).encode()))
+
+
+def _period_days(period):
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period or "1y")
+    return int(match.group(1)) * PERIOD_DAYS[match.group(2)] if match else 365
+
+
+def fake_bars(ticker, period=None, start=None, end=None, interval="1d"):
+    """Business-day OHLCV random walk shaped like a yfinance frame."""
+    end_ts = pd.Timestamp(end) if end else pd.Timestamp.now().normalize()
+    start_ts = pd.Timestamp(start) if start else end_ts - pd.Timedelta(days=_period_days(period))
+    index = pd.bdate_range(start_ts, end_ts, name="Date")
+    rng = _rng(ticker, interval)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.015, len(index))))
+    return pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, 0.003, len(index))),
+        "High": close * 1.01,
+        "Low": close * 0.99,
+        "Close": close,
+        "Volume": rng.integers(100_000, 5_000_000, len(index)),
+    }, index=index)
+
+
+class FakeTicker:
+    def __init__(self, ticker):
+        self.ticker = ticker
+
+    def history(self, period="1y", auto_adjust=True, interval="1d", **kwargs):
+        df = fake_bars(self.ticker, period=period, interval=interval)
+        df["Dividends"] = 0.0
+        df["Stock Splits"] = 0.0
+        df.index = df.index.tz_localize("Asia/Kolkata")
+        return df
+
+    @property
+    def news(self):
+        return [{"title": f"{self.ticker} headline {i}"} for i in range(10)]
+
+
+def fake_download(tickers, period=None, start=None, end=None, interval="1d", group_by="column", **kwargs):
+    """Mimics yf.download: MultiIndex columns, (Ticker, Price) with group_by='ticker' else (Price, Ticker)."""
+    if isinstance(tickers, str):
+        tickers = tickers.split()
+    if UPSTREAM_LATENCY_MS:
+        time.sleep(UPSTREAM_LATENCY_MS / 1000)
+    frames = {t: fake_bars(t, period, start, end, interval) for t in tickers}
+    df = pd.concat(frames, axis=1)
+    return df if group_by == "ticker" else df.swaplevel(0, 1, axis=1)
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, text="", payload=None):
+        self.status_code = status_code
+        self.text = text if payload is None else json.dumps(payload)
+        self.content = self.text.encode("utf-8")
+        self._payload = payload
+
+    def json(self):
+        return self._payload if self._payload is not None else json.loads(self.text)
+
+
+def moneycontrol_page(slug, items=20):
+    """A MoneyControl tag page with the markup producer_moneycontrol scrapes."""
+    rows = "".join(
+        f'<li class="clearfix" id="newslist-{i}"><a href="/news/{slug}-{i}.html"><img src="x.jpg"/></a>'
+        f'<span>October 1{i % 10}, 2025 10:{i:02d} AM IST</span>'
+        f'<h2><a href="/news/{slug}-{i}.html" title="t">{slug.replace("-", " ").title()} shares move on update {i}</a></h2>'
+        f'<p>Summary paragraph for story {i} with some filler text.</p></li>'
+        for i in range(items)
+    )
+    nav = "".join(f'<li><a href="/section/{i}">Section {i}</a></li>' for i in range(200))
+    return (f"<html><head><title>{slug} news</title></head><body><ul class='nav'>{nav}</ul>"
+            f"<div id='cagetory'><ul id='cagetory'>{rows}</ul></div><footer>{'x' * 5000}</footer></body></html>")
+
+
+def fake_requests_get(url, params=None, headers=None, timeout=None, **kwargs):
+    """Serves NewsAPI 'everything' JSON and MoneyControl tag pages."""
+    if "newsapi.org" in url:
+        query = (params or {}).get("q", "")
+        size = int((params or {}).get("pageSize", 5))
+        rng = _rng("news", query)
+        articles = [{
+            "title": f"{query} {rng.choice(['beats', 'misses', 'meets'])} estimates in quarter {i}",
+            "description": f"Analysts react to {query} results.",
+            "source": {"name": "Benchmark Wire"},
+            "publishedAt": (pd.Timestamp.now(tz="UTC") - pd.Timedelta(minutes=i)).isoformat(),
+            "url": f"https://example.invalid/{query}/{i}",
+        } for i in range(size)]
+        return FakeResponse(payload={"status": "ok", "totalResults": size, "articles": articles})
+    match = re.search(r"moneycontrol\.com/news/tags/([\w-]+)\.html", url)
+    if match:
+        return FakeResponse(text=moneycontrol_page(match.group(1)))
+    return FakeResponse(status_code=404, text="not found")
+
+
+def install():
+    """Replaces yfinance and requests.get for this process. Call before importing pipeline modules."""
+    yf = types.ModuleType("yfinance")
+    yf.download = fake_download
+    yf.Ticker = FakeTicker
+    sys.modules["yfinance"] = yf
+
+    import requests
+    requests.get = fake_requests_get
+
+
+def yfinance_fetcher(symbols, interval, period):
+    """The backend's real yfinance fetcher running against the stand-in (HISTORY_FETCHER=benchmarks.stubs:yfinance_fetcher)."""
+    if getattr(sys.modules.get("yfinance"), "download", None) is not fake_download:
+        install()
+    from backend.history_cache import yfinance_fetcher as real_fetcher
+    return real_fetcher(symbols, interval, period)
@@ -0,0 +1,531 @@
+import sys
+import os
+
+# --- FIX: Add project root to path ---
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import contextlib
+import numpy as np
+import pandas as pd
+
+# Offline benchmark suite: every pipeline stage against local stand-ins (benchmarks/stubs.py)
+# and synthetic data. Each stage runs in its own process, inside a scratch working directory,
+# so peak memory is per stage and nothing touches the real data/ or models/ folders.
+#
+#   python benchmarks/suite.py --scale small                                 # run, save results/<sha>-small.json
+#   python benchmarks/suite.py --baseline benchmarks/results/abc123-small.json  # ...and fail on regressions
+
+# --- CONFIGURATION ---
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+
+SCALES = {
+    "small":  {"symbols": 10,  "staged": 500,    "days": 1000, "mc_rows": 2_000,   "requests": 200},
+    "medium": {"symbols": 50,  "staged": 5_000,  "days": 2000, "mc_rows": 20_000,  "requests": 1_000},
+    "large":  {"symbols": 200, "staged": 20_000, "days": 5000, "mc_rows": 100_000, "requests": 2_000},
+}
+
+# Relative change that counts as a regression (0.25 = 25% slower / more memory / less throughput)
+REGRESSION_THRESHOLD = float(os.getenv("BENCH_REGRESSION_THRESHOLD", "0.25"))
+# metric -> (direction, noise floor). Values under the floor on both sides are not compared.
+COMPARED_METRICS = {
+    "seconds": ("lower", 0.05),
+    "p95_ms": ("lower", 0.5),
+    "throughput": ("higher", 0.0),
+    "peak_rss_mb": ("lower", 20.0),
+}
+
+
+def _status_mb(key):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(key):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _reset_peak_rss():
+    # Resets VmHWM to the current RSS (Linux >= 4.0) so setup allocations don't count
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _symbols(scale):
+    return [f"SYM{i:03d}" for i in range(scale["symbols"])]
+
+
+# --- SYNTHETIC DATA ---
+
+def make_raw_frame(scale):
+    dates = pd.bdate_range(end="2025-12-31", periods=scale["days"]).strftime("%Y-%m-%d")
+    symbols = _symbols(scale)
+    rng = np.random.default_rng(1)
+    n = len(dates) * len(symbols)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        "Date": np.tile(dates, len(symbols)),
+        "Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+        "Volume": rng.integers(10_000, 5_000_000, n),
+        "Dividends": 0.0, "Stock_Splits": 0.0,
+        "Stock_Symbol": np.repeat(symbols, len(dates)),
+        "Sentiment_Score": rng.uniform(-0.8, 0.8, n),
+        "Title": "Synthetic headline",
+        "Target": rng.integers(0, 2, n),
+    })
+
+
+def stage_records(scale, kind, count):
+    rng = np.random.default_rng(2)
+    symbols = _symbols(scale)
+    words = ["profit", "loss", "growth", "decline", "record", "weak", "strong", "deal", "probe", "upgrade"]
+    now = pd.Timestamp.now(tz="UTC")
+    for i in range(count):
+        symbol = symbols[i % len(symbols)]
+        title = f"{symbol} " + " ".join(rng.choice(words, 6))
+        ts = (now - pd.Timedelta(minutes=int(rng.integers(0, 60 * 24 * 5)))).isoformat()
+        if kind == "moneycontrol":
+            yield {"id": str(i), "text": title, "created_at": ts, "stock_tag": symbol, "source": "MoneyControl"}
+        else:
+            yield {"stock": symbol, "title": title, "description": "Synthetic", "source": "Bench",
+                   "published_at": ts, "url": f"https://example.invalid/{i}"}
+
+
+def scored(records):
+    """Adds the sentiment_score the stream processor would have attached."""
+    rng = np.random.default_rng(4)
+    return [{**r, "sentiment_score": float(rng.uniform(-1, 1))} for r in records]
+
+
+def write_partitions(root, records):
+    df = pd.DataFrame(records)
+    ts_column = "created_at" if "created_at" in df.columns else "published_at"
+    df["date"] = df[ts_column].str[:10]
+    for date_key, group in df.groupby("date"):
+        part_dir = os.path.join(root, f"date={date_key}")
+        os.makedirs(part_dir, exist_ok=True)
+        group.to_parquet(os.path.join(part_dir, "part-0.parquet"), index=False)
+
+
+def _stage_staging(scale, count):
+    from ingestion import config
+    for kind, path in (("moneycontrol", config.STAGING_MONEYCONTROL), ("news", config.STAGING_NEWS)):
+        os.makedirs(path, exist_ok=True)
+        for i, record in enumerate(stage_records(scale, kind, count // 2)):
+            with open(os.path.join(path, f"{kind}_{i}.json"), "w") as f:
+                json.dump(record, f)
+
+
+# --- STAGES ---
+# Each takes the scale dict and returns (setup, run). setup() builds inputs (untimed);
+# run() does the work and returns (items processed, [per-item latencies in seconds]).
+
+def _redirect_staging():
+    from ingestion import config
+    config.STAGING_MONEYCONTROL = os.path.join(os.getcwd(), "data", "staging", "moneycontrol")
+    config.STAGING_NEWS = os.path.join(os.getcwd(), "data", "staging", "news")
+    os.makedirs(config.STAGING_MONEYCONTROL, exist_ok=True)
+    os.makedirs(config.STAGING_NEWS, exist_ok=True)
+
+
+def stage_ingest_write(scale):
+    from ingestion import producer_news, producer_moneycontrol
+    records = {"news": list(stage_records(scale, "news", scale["staged"] // 2)),
+               "moneycontrol": list(stage_records(scale, "moneycontrol", scale["staged"] // 2))}
+
+    def run():
+        latencies = []
+        for module, kind in ((producer_news, "news"), (producer_moneycontrol, "moneycontrol")):
+            for record in records[kind]:
+                t0 = time.perf_counter()
+                module.write_to_staging(record)
+                latencies.append(time.perf_counter() - t0)
+        return len(latencies), latencies
+    return _redirect_staging, run
+
+
+def stage_ingest_cycle(scale):
+    from ingestion import config, producer_news, producer_moneycontrol
+    from ingestion.symbols import Symbol
+    symbols = _symbols(scale)
+    entries = [Symbol(s, ".NS", s.lower(), "General", ()) for s in symbols]
+
+    def setup():
+        _redirect_staging()
+        config.NEWS_API_KEY = "offline"
+        producer_moneycontrol.REQUEST_DELAY_SECONDS = 0
+
+    def run():
+        latencies = []
+        for cycle, argument in ((producer_news.produce_cycle, symbols), (producer_moneycontrol.scrape_cycle, entries)):
+            t0 = time.perf_counter()
+            cycle(argument)
+            latencies.append(time.perf_counter() - t0)
+        written = sum(len(os.listdir(d)) for d in (config.STAGING_NEWS, config.STAGING_MONEYCONTROL))
+        return written, latencies
+    return setup, run
+
+
+def stage_stream_process(scale):
+    def setup():
+        _redirect_staging()
+        _stage_staging(scale, scale["staged"])
+
+    def run():
+        from processing import spark_streaming
+        from ingestion import config
+        latencies = []
+        for source, output, kind in ((config.STAGING_MONEYCONTROL, spark_streaming.MC_OUTPUT_PATH, "moneycontrol"),
+                                     (config.STAGING_NEWS, spark_streaming.NEWS_OUTPUT_PATH, "news")):
+            t0 = time.perf_counter()
+            spark_streaming.process_files(source, output, kind)
+            latencies.append(time.perf_counter() - t0)
+        return scale["staged"], latencies
+    return setup, run
+
+
+def stage_archive_replay(scale):
+    def setup():
+        from processing import archive, records, spark_streaming
+        _redirect_staging()
+        packed = archive.SegmentArchive(spark_streaming.ARCHIVE_PATH)
+        for kind in ("moneycontrol", "news"):
+            packed.append(kind, [(*records.event_time(r, kind), r)
+                                 for r in stage_records(scale, kind, scale["staged"])])
+
+    def run():
+        from processing import archive, spark_streaming
+        replayed = archive.replay(root=spark_streaming.ARCHIVE_PATH,
+                                  output_root=os.path.join(os.getcwd(), "data", "replay"))
+        return replayed, []
+    return setup, run
+
+
+def stage_stream_commit(scale):
+    # Per-batch cost of the checkpoint log: fsynced begin + commit lines
+    def run():
+        from processing.checkpoint import BatchLog
+        log = BatchLog(os.path.join(os.getcwd(), "data", "checkpoints", "bench.wal"))
+        inputs = [os.path.join(os.getcwd(), "data", "staging", "news", f"news_{i}.json") for i in range(50)]
+        outputs = [os.path.join(os.getcwd(), "data", "processed_news", f"date=2025-01-0{d}", "part-0.parquet") for d in (1, 2)]
+        latencies = []
+        for _ in range(scale["requests"]):
+            t0 = time.perf_counter()
+            log.commit(log.begin(inputs, outputs))
+            latencies.append(time.perf_counter() - t0)
+            log.finish([])
+        return len(latencies), latencies
+    return (lambda: None), run
+
+
+def stage_stream_recovery(scale):
+    # Restart after a crash mid-batch: a log of committed batches plus one open batch to roll back
+    def setup():
+        from processing.checkpoint import BatchLog, COMPACT_EVERY
+        from processing import archive
+        _redirect_staging()
+        root = os.path.join(os.getcwd(), "data")
+        packed = archive.SegmentArchive(os.path.join(root, "archive"))
+        records = [("2025-01-01", 0.0, r) for r in stage_records(scale, "news", scale["staged"])]
+        packed.append("news", records)
+        log = BatchLog(os.path.join(root, "checkpoints", "news.wal"))
+        inputs = [os.path.join(root, "staging", "news", f"news_{i}.json") for i in range(50)]
+        for _ in range(COMPACT_EVERY - 2):
+            log.commit(log.begin(inputs, []))
+        outputs = [os.path.join(root, "processed_news", f"date=2025-01-{d:02d}", "part-open.parquet") for d in range(1, 11)]
+        log.begin(inputs, outputs, packed.snapshot("news", ["2025-01-01"]))
+        for path in outputs:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(b"x" * 4096)
+        packed.append("news", records)
+
+    def run():
+        from processing.checkpoint import BatchLog
+        from processing import archive
+        root = os.path.join(os.getcwd(), "data")
+        t0 = time.perf_counter()
+        log = BatchLog(os.path.join(root, "checkpoints", "news.wal"))
+        outcome = log.recover(archive.SegmentArchive(os.path.join(root, "archive")).rollback)
+        elapsed = time.perf_counter() - t0
+        if outcome != "rolled_back":
+            raise RuntimeError(f"expected a rollback, got {outcome}")
+        return 1, [elapsed]
+    return setup, run
+
+
+def stage_batch_ingestion(scale):
+    from ingestion import load_data
+
+    def setup():
+        load_data.STOCKS = [f"{s}.NS" for s in _symbols(scale)]
+        load_data.RAW_FILE = os.path.join(os.getcwd(), "data", "raw_stocks.arrow")
+
+    def run():
+        load_data.run_ingestion()
+        from processing.stage_format import read_stage
+        return read_stage(load_data.RAW_FILE).num_rows, []
+    return setup, run
+
+
+def stage_batch_processing(scale):
+    from processing import pyspark_processor
+    from processing.stage_format import RAW_SCHEMA, write_stage
+
+    def setup():
+        pyspark_processor.RAW_FILE = os.path.join(os.getcwd(), "data", "raw_stocks.arrow")
+        pyspark_processor.PROCESSED_FILE = os.path.join(os.getcwd(), "data", "processed_data", "processed_stocks.arrow")
+        write_stage(make_raw_frame(scale), pyspark_processor.RAW_FILE, RAW_SCHEMA, csv_export=False)
+
+    def run():
+        pyspark_processor.run_big_data_processing()
+        return scale["symbols"] * scale["days"], []
+    return setup, run
+
+
+def stage_train(scale):
+    from ml_pipeline import train_model
+
+    def setup():
+        train_model.STOCKS = [f"{s}.NS" for s in _symbols(scale)]
+        write_partitions(train_model.MC_PATH, scored(stage_records(scale, "moneycontrol", scale["mc_rows"])))
+
+    def run():
+        train_model.train_pipeline()
+        return len(train_model.STOCKS), []
+    return setup, run
+
+
+def stage_predict(scale):
+    from ml_pipeline import daily_prediction
+
+    def setup():
+        import xgboost as xgb
+        daily_prediction.STOCKS = [f"{s}.NS" for s in _symbols(scale)]
+        write_partitions(daily_prediction.MC_PATH, scored(stage_records(scale, "moneycontrol", scale["mc_rows"])))
+        rng = np.random.default_rng(3)
+        X = pd.DataFrame(rng.normal(size=(2000, 5)), columns=['mc_sentiment', 'close', 'ma_5', 'ma_10', 'volatility'])
+        model = xgb.XGBClassifier(n_estimators=50, eval_metric='logloss')
+        model.fit(X, rng.integers(0, 2, 2000))
+        os.makedirs(daily_prediction.MODELS_DIR, exist_ok=True)
+        model.save_model(os.path.join(daily_prediction.MODELS_DIR, "xgboost_stock_model.json"))
+
+    def run():
+        daily_prediction.generate_predictions()
+        return len(daily_prediction.STOCKS), []
+    return setup, run
+
+
+API_ROUTES = {
+    "predictions": "/predictions",
+    "records": "/records/{symbol}?limit=20",
+    "news": "/news/{symbol}?limit=20",
+    "news_bulk": "/news?symbols={symbols}&limit=10",
+    "history": "/history/{symbol}",
+    "history_bulk": "/history?symbols={symbols}",
+}
+
+
+def stage_api(scale, route):
+    def setup():
+        import functools
+        from backend import main, database
+        from backend.history_cache import HistoryCache, synthetic_fetcher
+        from backend.predictions_cache import PredictionsPayload
+        from backend.stock_index import ProcessedDataIndex
+        from processing.stage_format import PROCESSED_SCHEMA, write_stage
+
+        data_dir = os.path.join(os.getcwd(), "data")
+        news_root = os.path.join(data_dir, "processed_news")
+        write_partitions(news_root, scored(stage_records(scale, "news", scale["mc_rows"])))
+        main.query_news = functools.partial(database.query_news, root=news_root)
+        main.query_news_bulk = functools.partial(database.query_news_bulk, root=news_root)
+
+        predictions_file = os.path.join(data_dir, "latest_predictions.json")
+        with open(predictions_file, "w") as f:
+            json.dump([{"stock": s, "current_price": 100.0, "prediction": "UP", "confidence": 60.0,
+                        "sentiment_score": 0.1, "timestamp": "2025-01-01T00:00:00"} for s in _symbols(scale)], f)
+        main.PREDICTIONS = PredictionsPayload(predictions_file)
+
+        processed = make_raw_frame(scale)
+        for column in ("MA_10", "Prev_Day_Sentiment", "Volatility", "Daily_Return"):
+            processed[column] = 0.0
+        processed_file = os.path.join(data_dir, "processed_stocks.arrow")
+        write_stage(processed, processed_file, PROCESSED_SCHEMA, csv_export=False)
+        main.PROCESSED_INDEX = ProcessedDataIndex(processed_file)
+        main.HISTORY_CACHE = HistoryCache(fetcher=synthetic_fetcher)
+
+    def run():
+        from fastapi.testclient import TestClient
+        from backend import main
+        client = TestClient(main.app)
+        symbols = _symbols(scale)
+        bulk = ",".join(symbols[:20])
+        # Warm caches and indexes; steady-state latency is what's being tracked
+        for symbol in symbols:
+            client.get(API_ROUTES[route].format(symbol=symbol, symbols=bulk))
+        latencies = []
+        for i in range(scale["requests"]):
+            url = API_ROUTES[route].format(symbol=symbols[i % len(symbols)], symbols=bulk)
+            t0 = time.perf_counter()
+            response = client.get(url)
+            latencies.append(time.perf_counter() - t0)
+            if response.status_code != 200:
+                raise RuntimeError(f"{url} returned {response.status_code}")
+        return len(latencies), latencies
+    return setup, run
+
+
+STAGES = {
+    "ingest_write": stage_ingest_write,
+    "ingest_cycle": stage_ingest_cycle,
+    "stream_process": stage_stream_process,
+    "archive_replay": stage_archive_replay,
+    "stream_commit": stage_stream_commit,
+    "stream_recovery": stage_stream_recovery,
+    "batch_ingestion": stage_batch_ingestion,
+    "batch_processing": stage_batch_processing,
+    "train": stage_train,
+    "predict": stage_predict,
+    **{f"api_{route}": (lambda scale, route=route: stage_api(scale, route)) for route in API_ROUTES},
+}
+
+
+# --- RUNNER ---
+
+def run_stage(name, scale_name):
+    """Runs one stage in this process (cwd is its scratch dir) and returns its measurements."""
+    from benchmarks import stubs
+    stubs.install()
+    scale = SCALES[scale_name]
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        setup, run = STAGES[name](scale)
+        setup()
+        rss_before = _status_mb("VmRSS:")
+        _reset_peak_rss()
+        t0 = time.perf_counter()
+        items, latencies = run()
+        seconds = time.perf_counter() - t0
+    result = {
+        "seconds": seconds,
+        "items": items,
+        "throughput": items / seconds if seconds else None,
+        "peak_rss_mb": _status_mb("VmHWM:") - rss_before,
+    }
+    if latencies:
+        ms = np.array(latencies) * 1000
+        result.update({f"p{p}_ms": float(np.percentile(ms, p)) for p in (50, 95, 99)})
+    return result
+
+
+def run_suite(scale_name, stages):
+    results = {}
+    for name in stages:
+        workdir = tempfile.mkdtemp(prefix=f"bench-{name}-")
+        env = {**os.environ, "METRICS_DIR": os.path.join(workdir, "metrics"), "PYTHONPATH": ROOT_DIR}
+        try:
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--run-stage", name, "--scale", scale_name],
+                                  cwd=workdir, env=env, capture_output=True, text=True)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        if proc.returncode != 0:
+            print(f"❌ {name} failed:\n{proc.stderr[-2000:]}")
+            results[name] = {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"}
+            continue
+        results[name] = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(format_row(name, results[name]), flush=True)
+    return results
+
+
+def format_row(name, r):
+    latency = f"p50 {r['p50_ms']:8.2f}ms  p95 {r['p95_ms']:8.2f}ms  p99 {r['p99_ms']:8.2f}ms" if "p50_ms" in r else " " * 45
+    return (f"{name:<18} {r['seconds']:8.2f}s  {r['throughput'] or 0:10.1f}/s  {latency}  "
+            f"peak +{r['peak_rss_mb']:.0f}MB")
+
+
+def compare(current, baseline, threshold=REGRESSION_THRESHOLD):
+    """Returns a list of human-readable regressions of `current` against `baseline`."""
+    regressions = []
+    for name, now in current["stages"].items():
+        before = baseline.get("stages", {}).get(name)
+        if not before or "error" in before or "error" in now:
+            continue
+        for metric, (better, floor) in COMPARED_METRICS.items():
+            old, new = before.get(metric), now.get(metric)
+            if old is None or new is None or max(old, new) <= floor or old <= 0:
+                continue
+            change = (new - old) / old
+            if (better == "lower" and change > threshold) or (better == "higher" and -change > threshold):
+                regressions.append(f"{name}.{metric}: {old:.3f} -> {new:.3f} ({change:+.0%})")
+    return regressions
+
+
+def git_label():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return time.strftime("%Y%m%d-%H%M%S")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite for every pipeline stage.")
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--stage", action="append", choices=STAGES, help="Run only these stages (repeatable).")
+    parser.add_argument("--label", default=None, help="Results name (default: git short sha).")
+    parser.add_argument("--baseline", default=None, help="Results JSON to compare against.")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Relative change that fails the run (default %(default)s).")
+    parser.add_argument("--run-stage", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_stage:
+        print(json.dumps(run_stage(args.run_stage, args.scale)))
+        return
+
+    label = args.label or git_label()
+    print(f"🏁 Benchmark suite: scale={args.scale} label={label}")
+    results = {
+        "label": label,
+        "created": time.time(),
+        "scale": args.scale,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "stages": run_suite(args.scale, args.stage or list(STAGES)),
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(RESULTS_DIR, f"{label}-{args.scale}.json")
+    with open(out_path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Results saved to {out_path}")
+
+    failed = [name for name, r in results["stages"].items() if "error" in r]
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("scale") != args.scale:
+            print(f"⚠️ Baseline was run at scale '{baseline.get('scale')}', comparing anyway.")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.threshold:.0%} against {baseline.get('label')}.")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,37 @@
+import sys
 import os
+
+# --- FIX: Add project root to path ---
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+from matplotlib.colors import LogNorm
 import seaborn as sns
+from monitoring import metrics
+from eda.eda_stats import CORR_COLUMNS, artifact_config, new_stats
+from processing.stage_format import PROCESSED_FILE, stage_columns, iter_frames
 
 # --- CONFIGURATION ---
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-INPUT_FILE = os.path.join(BASE_DIR, "data", "processed_data", "processed_stocks.csv")
+INPUT_FILE = PROCESSED_FILE
 OUTPUT_DIR = os.path.join(BASE_DIR, "eda", "plots")
 
+# Columns, sentiment bins and return range are shared with the EDA artifact (eda/eda_stats.py);
+# only the 2-D histogram is finer here, since the plot is drawn once for all symbols
+JOINT_BINS = 60
+
+def compute_stats(path):
+    """Streams the processed file once and returns the accumulated StreamingStats."""
+    header = stage_columns(path)
+    columns = [c for c in CORR_COLUMNS if c in header]
+    stats = new_stats({**artifact_config(columns), "joint_bins": JOINT_BINS})
+    # One memory-mapped record batch at a time, projected to the needed columns
+    for chunk in iter_frames(path, columns):
+        stats.update(chunk)
+    return stats
+
 def run_eda():
     print("🚀 Starting Step 5 & 6: Exploratory Data Analysis and Insights...")
     
@@ -15,8 +39,9 @@ def run_eda():
         print(f"❌ Error: Processed data not found at {INPUT_FILE}")
         return
 
-    # Load the big data processed file
-    df = pd.read_csv(INPUT_FILE)
+    # Stream the big data processed file batch by batch; memory stays bounded by the batch size
+    stats = compute_stats(INPUT_FILE)
+    print(f"📥 Streamed {stats.n} rows.")
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
     # Use a basic style that doesn't depend on specific seaborn versions
@@ -24,7 +49,8 @@ def run_eda():
 
     # --- PLOT 1: Histogram (Sentiment Distribution) ---
     plt.figure(figsize=(10, 6))
-    sns.histplot(df['Sentiment_Score'], bins=30, kde=True, color='skyblue')
+    edges = stats.hist_edges['Sentiment_Score']
+    plt.stairs(stats.hist_counts['Sentiment_Score'], edges, fill=True, color='skyblue', edgecolor='steelblue')
     plt.title("Distribution of Market Sentiment Scores", fontsize=15)
     plt.xlabel("Sentiment Score (-1 to 1)")
     plt.ylabel("Frequency")
@@ -36,9 +62,7 @@ def run_eda():
 
     # --- PLOT 2: Correlation Heatmap ---
     plt.figure(figsize=(12, 8))
-    # Select numerical columns that we KNOW exist in the new processed data
-    available_cols = [c for c in ['Close', 'Volume', 'Sentiment_Score', 'MA_10', 'Volatility', 'Daily_Return'] if c in df.columns]
-    correlation_matrix = df[available_cols].corr()
+    correlation_matrix = pd.DataFrame(stats.correlation(), index=stats.columns, columns=stats.columns)
     sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', fmt=".2f")
     plt.title("Feature Correlation Heatmap", fontsize=15)
     plt.savefig(os.path.join(OUTPUT_DIR, "correlation_heatmap.png"))
@@ -47,17 +71,19 @@ def run_eda():
     print("\n📊 Plot 2: Correlation Heatmap Generated.")
     print("INTERPRETATION: Close and MA_10 show high correlation, confirming trend-following behavior.")
 
-    # --- PLOT 3: Scatter Plot (Sentiment vs Daily Return) ---
-    plt.figure(figsize=(10, 6))
-    if 'Daily_Return' in df.columns:
-        sns.scatterplot(data=df, x='Sentiment_Score', y='Daily_Return', alpha=0.3, color='green')
+    # --- PLOT 3: Binned Density (Sentiment vs Daily Return) ---
+    if stats.joint:
+        plt.figure(figsize=(10, 6))
+        counts = np.ma.masked_equal(stats.joint_counts.T, 0)
+        mesh = plt.pcolormesh(stats.joint_x_edges, stats.joint_y_edges, counts, cmap='Greens', norm=LogNorm())
+        plt.colorbar(mesh, label="Trading days")
         plt.axhline(0, color='red', linestyle='--')
         plt.title("Sentiment Score vs. Daily Price Return", fontsize=15)
         plt.xlabel("Sentiment Score")
         plt.ylabel("Daily Return (%)")
         plt.savefig(os.path.join(OUTPUT_DIR, "sentiment_vs_return.png"))
         plt.close()
-        print("\n📊 Plot 3: Sentiment vs Return Scatter Plot Generated.")
+        print("\n📊 Plot 3: Sentiment vs Return Density Plot Generated.")
     else:
         print("\n⚠️ Warning: Daily_Return column missing, skipping Plot 3.")
 
@@ -72,4 +98,6 @@ def run_eda():
     print(f"\n✨ EDA Complete. Plots saved in: {OUTPUT_DIR}")
 
 if __name__ == "__main__":
-    run_eda()
\ No newline at end of file
+    with metrics.timer("batch_stage_seconds", "Wall time of batch pipeline stages", {"stage": "eda"}):
+        run_eda()
+    metrics.flush("batch_eda")
\ No newline at end of file
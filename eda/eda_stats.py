@@ -0,0 +1,284 @@
+import sys
+import os
+
+# --- FIX: Add project root to path ---
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import re
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from eda.streaming_stats import StreamingStats
+from processing.stage_format import PROCESSED_FILE, stage_columns, iter_frames
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INPUT_FILE = PROCESSED_FILE
+ARTIFACT_DIR = os.path.join(BASE_DIR, "data", "eda_stats")
+MANIFEST_FILE = os.path.join(ARTIFACT_DIR, "manifest.json")
+
+CORR_COLUMNS = ['Close', 'Volume', 'Sentiment_Score', 'MA_10', 'Volatility', 'Daily_Return']
+SENTIMENT_BINS = (-1.0, 1.0, 30)
+# Daily returns beyond ±10% are folded into the edge bins
+RETURN_RANGE = (-10.0, 10.0)
+# Coarser than the PNG plot: one 2-D histogram is stored per symbol per month
+ARTIFACT_JOINT_BINS = 20
+FORMAT_VERSION = 1
+
+# Artifact layout (every file is immutable once written; the manifest is swapped atomically):
+#   manifest.json              version, config, {symbol: fingerprint + file}, retired files
+#   symbols/<SYM>-<fp>.json    {month: StreamingStats state} for one symbol
+#   global-v<version>.json     the same, merged across all symbols
+# Files dropped by a publish are listed as `retired` and only deleted by the next
+# publish, so a reader still holding the previous manifest can finish its query.
+
+
+def artifact_config(columns):
+    return {
+        "format": FORMAT_VERSION,
+        "columns": list(columns),
+        "sentiment_bins": list(SENTIMENT_BINS),
+        "return_range": list(RETURN_RANGE),
+        "joint_bins": ARTIFACT_JOINT_BINS,
+    }
+
+
+def new_stats(config):
+    lo, hi, bins = config["sentiment_bins"]
+    joint = None
+    if "Daily_Return" in config["columns"]:
+        joint = ("Sentiment_Score", "Daily_Return", (lo, hi), tuple(config["return_range"]), config["joint_bins"])
+    return StreamingStats(config["columns"], histograms={"Sentiment_Score": (lo, hi, int(bins))}, joint=joint)
+
+
+def _read_chunks(path, columns):
+    return iter_frames(path, ["Stock_Symbol", "Date"] + list(columns))
+
+
+def fingerprint_symbols(path, columns):
+    """
+    One streaming pass returning {symbol: 'rows:hash'}. The hash is the
+    wrapping sum of per-row hashes, so it doesn't depend on row order.
+    """
+    sums, counts = {}, {}
+    for chunk in _read_chunks(path, columns):
+        hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        codes, uniques = pd.factorize(chunk["Stock_Symbol"])
+        order = np.argsort(codes, kind="stable")
+        order = order[codes[order] >= 0]
+        if not len(order):
+            continue
+        sorted_codes = codes[order]
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        group_sums = np.add.reduceat(hashes[order], starts)
+        group_counts = np.diff(np.r_[starts, len(order)])
+        for code, total, count in zip(sorted_codes[starts], group_sums, group_counts):
+            symbol = uniques[code]
+            sums[symbol] = (sums.get(symbol, 0) + int(total)) % 2**64
+            counts[symbol] = counts.get(symbol, 0) + int(count)
+    return {s: f"{counts[s]}:{sums[s]:016x}" for s in sums}
+
+
+def build_symbol_stats(path, symbols, config):
+    """Worker: streams the file and returns {symbol: {month: stats state}} for `symbols`."""
+    wanted = set(symbols)
+    stats = {}
+    for chunk in _read_chunks(path, config["columns"]):
+        chunk = chunk[chunk["Stock_Symbol"].isin(wanted)]
+        if chunk.empty:
+            continue
+        months = chunk["Date"].astype(str).str[:7]
+        for (symbol, month), group in chunk.groupby([chunk["Stock_Symbol"], months], sort=False):
+            stats.setdefault(symbol, {}).setdefault(month, new_stats(config)).update(group)
+    return {s: {m: st.to_dict() for m, st in by_month.items()} for s, by_month in stats.items()}
+
+
+def _safe_name(symbol):
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", symbol)
+
+
+def _write_json(path, payload):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def load_manifest(path=MANIFEST_FILE):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except Exception:
+        return {"version": 0, "config": None, "symbols": {}}
+
+
+def build_artifact(path=INPUT_FILE, artifact_dir=ARTIFACT_DIR, workers=None, force=False):
+    """Rebuilds stats for symbols whose rows changed, in parallel, and publishes a new manifest version."""
+    header = stage_columns(path)
+    config = artifact_config([c for c in CORR_COLUMNS if c in header])
+    manifest_path = os.path.join(artifact_dir, "manifest.json")
+    manifest = load_manifest(manifest_path)
+    previous = manifest["symbols"] if manifest.get("config") == config and not force else {}
+
+    fingerprints = fingerprint_symbols(path, config["columns"])
+    changed = sorted(s for s, fp in fingerprints.items() if previous.get(s, {}).get("fingerprint") != fp)
+    removed = [s for s in previous if s not in fingerprints]
+    if not changed and not removed and manifest.get("global"):
+        print(f"✅ EDA stats up to date (version {manifest['version']}).")
+        return manifest
+
+    print(f"🔄 Rebuilding EDA stats for {len(changed)} of {len(fingerprints)} symbols...")
+    symbol_dir = os.path.join(artifact_dir, "symbols")
+    os.makedirs(symbol_dir, exist_ok=True)
+    entries = {s: previous[s] for s in fingerprints if s not in changed}
+
+    if changed:
+        workers = max(1, min(workers or os.cpu_count() or 1, len(changed)))
+        groups = [changed[i::workers] for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(build_symbol_stats, [path] * workers, groups, [config] * workers)
+            for result in results:
+                for symbol, months in result.items():
+                    fingerprint = fingerprints[symbol]
+                    name = f"{_safe_name(symbol)}-{fingerprint.split(':')[1][:12]}.json"
+                    _write_json(os.path.join(symbol_dir, name), {"symbol": symbol, "months": months})
+                    entries[symbol] = {"fingerprint": fingerprint, "rows": int(fingerprint.split(":")[0]),
+                                       "file": f"symbols/{name}"}
+
+    # Global view = every symbol merged month by month
+    merged = {}
+    for symbol, entry in entries.items():
+        with open(os.path.join(artifact_dir, entry["file"])) as f:
+            months = json.load(f)["months"]
+        for month, state in months.items():
+            merged.setdefault(month, new_stats(config)).merge(new_stats(config).load_dict(state))
+
+    version = manifest.get("version", 0) + 1
+    global_name = f"global-v{version}.json"
+    _write_json(os.path.join(artifact_dir, global_name),
+                {"symbol": None, "months": {m: st.to_dict() for m, st in sorted(merged.items())}})
+
+    old_files = ({e["file"] for e in manifest["symbols"].values()} | {manifest.get("global")}) - {None}
+    live = {e["file"] for e in entries.values()} | {global_name}
+    new_manifest = {"version": version, "generated_at": time.time(), "config": config,
+                    "global": global_name, "symbols": dict(sorted(entries.items())),
+                    "retired": sorted(old_files - live)}
+    _write_json(manifest_path, new_manifest)
+
+    # Files the previous publish retired: no current or previous manifest references them now
+    for rel in set(manifest.get("retired", [])) - live - old_files:
+        try:
+            os.remove(os.path.join(artifact_dir, rel))
+        except FileNotFoundError:
+            pass
+
+    print(f"✨ EDA stats version {version} written to {artifact_dir}")
+    return new_manifest
+
+
+def _clean(values):
+    return [None if isinstance(v, float) and not np.isfinite(v) else v for v in values]
+
+
+class EdaStatsStore:
+    """Read side of the artifact: merges month-level stats for the requested slice on demand."""
+
+    def __init__(self, artifact_dir=ARTIFACT_DIR):
+        self.artifact_dir = artifact_dir
+        self._lock = threading.Lock()
+        self._manifest_version = None
+        self._manifest = None
+        self._files = {}  # versioned file name -> {month: state}
+
+    def manifest(self):
+        path = os.path.join(self.artifact_dir, "manifest.json")
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        version = (st.st_mtime_ns, st.st_size)
+        if version != self._manifest_version:
+            with self._lock:
+                self._manifest = load_manifest(path)
+                self._manifest_version = version
+                live = {e["file"] for e in self._manifest["symbols"].values()} | {self._manifest.get("global")}
+                self._files = {k: v for k, v in self._files.items() if k in live}
+        return self._manifest
+
+    def _months(self, rel_path):
+        months = self._files.get(rel_path)
+        if months is None:
+            with open(os.path.join(self.artifact_dir, rel_path)) as f:
+                months = json.load(f)["months"]
+            self._files[rel_path] = months
+        return months
+
+    def query(self, symbols=None, start=None, end=None):
+        """Aggregates for `symbols` (all when None) over months in [start, end] (YYYY-MM or dates)."""
+        try:
+            return self._query(symbols, start, end)
+        except FileNotFoundError:
+            # A file of a manifest two publishes old was deleted under us: reload and retry once
+            self._manifest_version = None
+            return self._query(symbols, start, end)
+
+    def _query(self, symbols, start, end):
+        manifest = self.manifest()
+        if manifest is None:
+            return None
+        config = manifest["config"]
+        if symbols:
+            files = [manifest["symbols"][s]["file"] for s in symbols if s in manifest["symbols"]]
+        else:
+            files = [manifest["global"]]
+
+        total = new_stats(config)
+        monthly = {}
+        for rel_path in files:
+            for month, state in self._months(rel_path).items():
+                if (start and month < start[:7]) or (end and month > end[:7]):
+                    continue
+                stats = new_stats(config).load_dict(state)
+                total.merge(stats)
+                monthly.setdefault(month, new_stats(config)).merge(stats)
+
+        columns = config["columns"]
+        result = {
+            "version": manifest["version"],
+            "symbols": symbols or sorted(manifest["symbols"]),
+            "rows": total.n,
+            "means": dict(zip(columns, _clean(total.mean.tolist()))) if total.n else {},
+            "correlation": {"columns": columns, "matrix": [_clean(r) for r in total.correlation().tolist()]},
+            "sentiment_hist": {"edges": total.hist_edges["Sentiment_Score"].tolist(),
+                               "counts": total.hist_counts["Sentiment_Score"].tolist()},
+            "monthly": {
+                "month": sorted(monthly),
+                "rows": [monthly[m].n for m in sorted(monthly)],
+                "mean_sentiment": _clean([float(monthly[m].mean[columns.index("Sentiment_Score")])
+                                          for m in sorted(monthly)]),
+            },
+        }
+        if total.joint:
+            result["sentiment_vs_return"] = {
+                "x_edges": total.joint_x_edges.tolist(),
+                "y_edges": total.joint_y_edges.tolist(),
+                "counts": total.to_dict()["joint_counts"],  # sparse [x_bin, y_bin, count]
+            }
+        return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the precomputed EDA statistics artifact.")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true", help="Rebuild every symbol.")
+    args = parser.parse_args()
+
+    if not os.path.exists(INPUT_FILE):
+        print(f"❌ Error: Processed data not found at {INPUT_FILE}")
+        sys.exit(1)
+    build_artifact(workers=args.workers, force=args.force)
@@ -0,0 +1,121 @@
+import numpy as np
+
+
+class StreamingStats:
+    """
+    Single-pass, mergeable statistics over a stream of DataFrame chunks.
+
+    Keeps fixed-edge histograms per column, the count/mean/co-moment matrix of
+    a set of numeric columns (combined chunk by chunk with Chan's parallel
+    update, so the covariance is exact without holding the data), and an
+    optional 2-D histogram of a column pair. Memory is O(columns² + bins)
+    no matter how many rows are streamed through.
+    """
+
+    def __init__(self, columns, histograms=None, joint=None):
+        """
+        columns:    numeric columns for mean/covariance
+        histograms: {column: (low, high, bins)}; out-of-range values land in the edge bins
+        joint:      (x, y, (x_low, x_high), (y_low, y_high), bins) for the 2-D histogram
+        """
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.n = 0
+        self.mean = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+
+        self.hist_edges = {c: np.linspace(lo, hi, bins + 1) for c, (lo, hi, bins) in (histograms or {}).items()}
+        self.hist_counts = {c: np.zeros(len(e) - 1, dtype=np.int64) for c, e in self.hist_edges.items()}
+
+        self.joint = joint
+        if joint:
+            x, y, (x_lo, x_hi), (y_lo, y_hi), bins = joint
+            self.joint_x_edges = np.linspace(x_lo, x_hi, bins + 1)
+            self.joint_y_edges = np.linspace(y_lo, y_hi, bins + 1)
+            self.joint_counts = np.zeros((bins, bins), dtype=np.int64)
+
+    @staticmethod
+    def _bin(values, edges):
+        # Clip into the outer bins instead of dropping outliers
+        idx = np.searchsorted(edges, values, side="right") - 1
+        return np.clip(idx, 0, len(edges) - 2)
+
+    def update(self, chunk):
+        """Folds one DataFrame chunk into the accumulators."""
+        block = chunk[self.columns].to_numpy(dtype=np.float64)
+        block = block[~np.isnan(block).any(axis=1)]
+        if len(block):
+            n_b = len(block)
+            mean_b = block.mean(axis=0)
+            centered = block - mean_b
+            self._combine(n_b, mean_b, centered.T @ centered)
+
+        for column, edges in self.hist_edges.items():
+            values = chunk[column].to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)]
+            self.hist_counts[column] += np.bincount(self._bin(values, edges), minlength=len(edges) - 1)
+
+        if self.joint:
+            x, y = self.joint[0], self.joint[1]
+            pair = chunk[[x, y]].to_numpy(dtype=np.float64)
+            pair = pair[~np.isnan(pair).any(axis=1)]
+            xi = self._bin(pair[:, 0], self.joint_x_edges)
+            yi = self._bin(pair[:, 1], self.joint_y_edges)
+            bins = self.joint_counts.shape[0]
+            self.joint_counts += np.bincount(xi * bins + yi, minlength=bins * bins).reshape(bins, bins)
+        return self
+
+    def _combine(self, n_b, mean_b, comoment_b):
+        n_a = self.n
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        self.comoment += comoment_b + np.outer(delta, delta) * (n_a * n_b / n)
+        self.mean += delta * (n_b / n)
+        self.n = n
+
+    def merge(self, other):
+        """Adds another StreamingStats built with the same configuration (e.g. from a worker)."""
+        if other.n:
+            self._combine(other.n, other.mean, other.comoment)
+        for column in self.hist_counts:
+            self.hist_counts[column] += other.hist_counts[column]
+        if self.joint:
+            self.joint_counts += other.joint_counts
+        return self
+
+    def to_dict(self):
+        """JSON-friendly state; histogram edges are config and are not stored."""
+        state = {
+            "n": self.n,
+            "mean": self.mean.tolist(),
+            "comoment": self.comoment.tolist(),
+            "hist_counts": {c: v.tolist() for c, v in self.hist_counts.items()},
+        }
+        if self.joint:
+            xi, yi = np.nonzero(self.joint_counts)
+            state["joint_counts"] = [[int(i), int(j), int(self.joint_counts[i, j])] for i, j in zip(xi, yi)]
+        return state
+
+    def load_dict(self, state):
+        """Restores state saved by to_dict() into an instance with the same configuration."""
+        self.n = state["n"]
+        self.mean = np.array(state["mean"], dtype=np.float64)
+        self.comoment = np.array(state["comoment"], dtype=np.float64)
+        for column, counts in state["hist_counts"].items():
+            self.hist_counts[column] = np.array(counts, dtype=np.int64)
+        if self.joint:
+            self.joint_counts[:] = 0
+            for i, j, count in state.get("joint_counts", []):
+                self.joint_counts[i, j] = count
+        return self
+
+    def covariance(self):
+        if self.n < 2:
+            return np.full_like(self.comoment, np.nan)
+        return self.comoment / (self.n - 1)
+
+    def correlation(self):
+        cov = self.covariance()
+        std = np.sqrt(np.diag(cov))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return cov / np.outer(std, std)
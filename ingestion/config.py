@@ -1,5 +1,6 @@
 import os
 from dotenv import load_dotenv
+from ingestion.symbols import symbol_names
 
 # Load .env
 env_path = os.path.join(os.path.dirname(__file__), '..', '.env')
@@ -19,6 +20,9 @@ os.makedirs(STAGING_NEWS, exist_ok=True)
 # API Keys
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
 
-# Stock List
-STOCKS_STR = os.getenv("STOCKS", "RELIANCE,TCS,INFY,HDFCBANK,ICICIBANK,TATAMOTORS,AXISBANK,HCLTECH,BHARTIARTL,WIPRO")
-STOCKS_LIST = [s.strip() for s in STOCKS_STR.split(",")]
\ No newline at end of file
+# Optional market-wide NewsAPI query (e.g. "Sensex OR Nifty") fetched once per cycle;
+# its articles are attributed to every company they mention by the stream processor
+NEWS_MARKET_QUERY = os.getenv("NEWS_MARKET_QUERY", "")
+
+# Stock List (from ingestion/symbols.csv; the STOCKS env var narrows it to a subset)
+STOCKS_LIST = symbol_names()
\ No newline at end of file
@@ -0,0 +1,104 @@
+from ingestion.symbols import load_registry
+
+# Tags a headline with every registry symbol it mentions, in one pass over the
+# text. All company names and aliases are compiled into a single Aho-Corasick
+# automaton, so tagging cost grows with the text (plus the matches found), not
+# with the size of the alias dictionary.
+#
+# Aliases match case-insensitively on word boundaries ("HDFC Bank" matches
+# "hdfc bank's", not "HDFC Bankers"). Bare tickers only match when written in
+# capitals, so tickers that are also ordinary words don't tag every headline.
+
+
+class EntityTagger:
+    def __init__(self, patterns):
+        """`patterns`: iterable of (text, symbol, case_sensitive)."""
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]  # state -> ((length, symbol, exact pattern or None), ...)
+        for text, symbol, case_sensitive in patterns:
+            self._add(text, symbol, case_sensitive)
+        self._link()
+
+    def _add(self, text, symbol, case_sensitive):
+        key = text.lower()
+        if not key.strip():
+            return
+        state = 0
+        for ch in key:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        self._out[state] += ((len(key), symbol, text if case_sensitive else None),)
+
+    def _link(self):
+        # Breadth-first so a state's failure target is final before its children use it.
+        # Each state also inherits the outputs of its failure chain, so a match never
+        # needs to walk that chain while scanning.
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] += self._out[self._fail[child]]
+                queue.append(child)
+
+    def tag(self, *texts):
+        """Symbols mentioned in any of `texts`, in order of first mention."""
+        found = {}
+        for text in texts:
+            if not text:
+                continue
+            lowered = text.lower()
+            # Case-sensitive patterns are checked against the original slice; that only
+            # lines up when lower() kept the length (true for everything but a few scripts).
+            aligned = len(lowered) == len(text)
+            goto, fail, out = self._goto, self._fail, self._out
+            state = 0
+            for i, ch in enumerate(lowered):
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(ch, 0)
+                if not out[state]:
+                    continue
+                end = i + 1
+                if end < len(lowered) and lowered[end].isalnum():
+                    continue
+                for length, symbol, exact in out[state]:
+                    start = end - length
+                    if symbol in found or (start > 0 and lowered[start - 1].isalnum()):
+                        continue
+                    if exact is not None and (not aligned or text[start:end] != exact):
+                        continue
+                    found[symbol] = None
+        return list(found)
+
+
+def registry_patterns(registry):
+    for entry in registry:
+        yield entry.symbol, entry.symbol, True
+        for alias in entry.aliases:
+            yield alias, entry.symbol, False
+
+
+_tagger = (None, None)  # (registry list it was built from, EntityTagger)
+
+
+def registry_tagger(path=None):
+    """Tagger over the active registry, rebuilt only when the registry file changes."""
+    global _tagger
+    registry = load_registry(path)
+    if _tagger[0] is not registry and _tagger[0] != registry:
+        _tagger = (registry, EntityTagger(registry_patterns(registry)))
+    return _tagger[1]
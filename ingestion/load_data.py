@@ -1,40 +1,26 @@
+import sys
 import os
+
+# --- FIX: Add project root to path ---
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
 import sqlite3
 import pandas as pd
 import yfinance as yf
-import numpy as np
-import random
 from datetime import datetime, timedelta
+from monitoring import metrics
+from processing.stage_format import RAW_FILE, RAW_SCHEMA, write_stage
+from ingestion.symbols import tickers
+from processing.sentiment_backfill import read_daily_sentiment, attach_sentiment
 
 BASE_DIR = os.getcwd()
 DATA_DIR = os.path.join(BASE_DIR, "data")
 DB_PATH = os.path.join(DATA_DIR, "stocks_data.db")
-CSV_PATH = os.path.join(DATA_DIR, "raw_stocks_10000.csv")
-
-STOCKS = ["RELIANCE.NS", "TCS.NS", "INFY.NS", "HDFCBANK.NS", "ICICIBANK.NS", 
-          "SBIN.NS", "AXISBANK.NS", "HCLTECH.NS", "BHARTIARTL.NS", "WIPRO.NS"]
-
-# Contextual mapping for realistic fallback news
-SECTOR_NEWS = {
-    "Banking": ["{s} reports growth in retail loan book", "RBI policy impact on {s} margins", "{s} expands digital banking footprint", "Asset quality improves for {s} in Q3"],
-    "IT": ["{s} wins multi-year digital transformation deal", "AI adoption drives growth for {s}", "{s} expands operations in European markets", "Attrition rates stabilize at {s}"],
-    "Energy": ["{s} announces investment in green energy", "Global oil prices impact {s} refining margins", "{s} reaches new production milestone", "New regulatory norms for energy sector impact {s}"],
-    "Telecom": ["{s} leads 5G rollout in major cities", "ARPU growth boosts {s} revenue", "{s} adds 2 million new subscribers", "Spectrum auction strategy for {s} unveiled"]
-}
-
-STOCK_TO_SECTOR = {
-    "RELIANCE": "Energy", "TCS": "IT", "INFY": "IT", "HCLTECH": "IT", "WIPRO": "IT",
-    "HDFCBANK": "Banking", "ICICIBANK": "Banking", "SBIN": "Banking", "AXISBANK": "Banking",
-    "BHARTIARTL": "Telecom"
-}
 
-def get_smart_headlines(symbol, count):
-    sector = STOCK_TO_SECTOR.get(symbol, "General")
-    templates = SECTOR_NEWS.get(sector, ["Market performance update for {s}", "{s} stock analysis and outlook"])
-    return [random.choice(templates).format(s=symbol) + f" (Ref: {random.randint(100,999)})" for _ in range(count)]
+STOCKS = tickers()
 
 def run_ingestion():
-    print("🚀 Starting Step 2: Data Ingestion with Smart Headlines...")
+    print("🚀 Starting Step 2: Data Ingestion with Backfilled Sentiment...")
     os.makedirs(DATA_DIR, exist_ok=True)
     all_rows = []
 
@@ -46,24 +32,8 @@ def run_ingestion():
             
             if df.empty: continue
 
-            # Attempt live news
-            try:
-                live_news = stock_obj.news
-                headlines = [n.get('title') for n in live_news if n.get('title')]
-            except:
-                headlines = []
-
-            # If live news fails or is insufficient, use Smart Generator
-            if len(headlines) < 5:
-                headlines = get_smart_headlines(ticker.replace(".NS",""), 20)
-
             df = df.reset_index()
             df['Stock_Symbol'] = ticker.replace(".NS", "")
-            df['Sentiment_Score'] = np.random.uniform(-0.8, 0.8, len(df))
-            
-            # Match headlines to data rows
-            df['Title'] = [headlines[i % len(headlines)] for i in range(len(df))]
-            
             all_rows.append(df)
             print(f"✅ Loaded {len(df)} records for {ticker}")
         except Exception as e:
@@ -75,11 +45,21 @@ def run_ingestion():
     full_df.columns = [str(c).replace(" ", "_") for c in full_df.columns]
     full_df = full_df.dropna(subset=['Target'])
 
-    full_df.to_csv(CSV_PATH, index=False)
+    # Real per-day sentiment and headlines from processing/sentiment_backfill.py
+    daily = read_daily_sentiment()
+    if daily.empty:
+        print("⚠️ No backfilled sentiment yet (run processing/sentiment_backfill.py); using neutral 0.0.")
+    full_df = attach_sentiment(full_df, daily)
+    print(f"📰 {int((full_df['Title'] != '').sum())} rows carry sentiment from earlier headlines.")
+
+    rows = write_stage(full_df, RAW_FILE, RAW_SCHEMA)
+    print(f"💾 Wrote {rows} rows to {RAW_FILE}")
     conn = sqlite3.connect(DB_PATH)
     full_df.to_sql("historical_stocks", conn, if_exists="replace", index=False)
     conn.close()
     print(f"✨ Ingestion complete. {len(full_df)} records saved.")
 
 if __name__ == "__main__":
-    run_ingestion()
\ No newline at end of file
+    with metrics.timer("batch_stage_seconds", "Wall time of batch pipeline stages", {"stage": "ingestion"}):
+        run_ingestion()
+    metrics.flush("batch_ingestion")
\ No newline at end of file
@@ -0,0 +1,132 @@
+from html.parser import HTMLParser
+
+try:
+    import lxml.html
+except ImportError:  # the streaming parser below needs only the standard library
+    lxml = None
+
+# Headline extraction from MoneyControl tag pages. A story is an
+# <li class="clearfix">, its headline is the first <a> inside its first <h2>,
+# and its display date is the text of its first <span>. Items without a
+# headline link are skipped. These are the same rules the BeautifulSoup
+# version used, but without building a Python object per tag:
+#
+#   - lxml (C) parses the page and only the <li> elements are walked;
+#   - without lxml, a streaming parser keeps no tree and stops as soon as
+#     `limit` stories have been read, so the rest of the page is never tokenized.
+#
+# Both are plain functions of the page bytes, so a producer can also hand them
+# to a process pool (MC_PARSE_WORKERS) when parsing without lxml.
+# tests/fixtures holds a saved tag page; bench_mc_extract.py --pages tests/fixtures measures it.
+
+
+_UTF8_PARSER = None
+
+
+class _StopParsing(Exception):
+    pass
+
+
+class _StoryParser(HTMLParser):
+    def __init__(self, limit):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.stories = []
+        self._item_depth = 0      # <li> nesting inside the current story
+        self._headline = None     # text parts of the headline link, once found
+        self._date = None         # text parts of the first <span>, once found
+        self._capture = []        # [tag, depth, parts] of elements whose text is being collected
+        self._in_h2 = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "li":
+            if self._item_depth:
+                self._item_depth += 1
+            elif "clearfix" in (dict(attrs).get("class") or "").split():
+                self._item_depth, self._headline, self._date, self._capture, self._in_h2 = 1, None, None, [], 0
+            return
+        if not self._item_depth:
+            return
+        for entry in self._capture:
+            if entry[0] == tag:
+                entry[1] += 1
+        if tag == "span" and self._date is None:
+            self._date = []
+            self._capture.append(["span", 1, self._date])
+        elif tag == "h2":
+            self._in_h2 += 1
+        elif tag == "a" and self._in_h2 and self._headline is None:
+            self._headline = []
+            self._capture.append(["a", 1, self._headline])
+
+    def handle_endtag(self, tag):
+        if not self._item_depth:
+            return
+        if tag == "li":
+            self._item_depth -= 1
+            if not self._item_depth:
+                self._finish_item()
+            return
+        if tag == "h2" and self._in_h2:
+            self._in_h2 -= 1
+        for entry in list(self._capture):
+            if entry[0] == tag:
+                entry[1] -= 1
+                if not entry[1]:
+                    self._capture.remove(entry)
+
+    def handle_data(self, data):
+        for entry in self._capture:
+            entry[2].append(data)
+
+    def _finish_item(self):
+        self._capture = []
+        if self._headline is not None:
+            self.stories.append(("".join(self._headline).strip(), None if self._date is None else "".join(self._date)))
+            if len(self.stories) >= self.limit:
+                raise _StopParsing()
+
+
+def extract_streaming(html, limit=2):
+    """[(headline, display date or None)] for the first `limit` stories, via the early-stopping parser."""
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", errors="replace")
+    parser = _StoryParser(limit)
+    try:
+        parser.feed(html)
+        parser.close()
+    except _StopParsing:
+        pass
+    return parser.stories
+
+
+def _utf8_parser():
+    global _UTF8_PARSER
+    if _UTF8_PARSER is None:
+        _UTF8_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+    return _UTF8_PARSER
+
+
+def extract_lxml(html, limit=2):
+    """[(headline, display date or None)] for the first `limit` stories, via lxml."""
+    try:
+        # Without a meta charset libxml2 would read bytes as Latin-1; MoneyControl serves UTF-8
+        doc = lxml.html.fromstring(html, parser=_utf8_parser() if isinstance(html, bytes) else None)
+    except Exception:  # empty or non-HTML body
+        return []
+    stories = []
+    for item in doc.iter("li"):
+        if "clearfix" not in (item.get("class") or "").split():
+            continue
+        h2 = next(item.iter("h2"), None)
+        link = next(h2.iter("a"), None) if h2 is not None else None
+        if link is None:
+            continue
+        span = next(item.iter("span"), None)
+        stories.append((link.text_content().strip(), span.text_content() if span is not None else None))
+        if len(stories) >= limit:
+            break
+    return stories
+
+
+extract_headlines = extract_lxml if lxml else extract_streaming
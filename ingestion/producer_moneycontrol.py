@@ -5,26 +5,27 @@ import time
 import requests
 import uuid
 import datetime
-from bs4 import BeautifulSoup
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
 
 # --- FIX: Add project root to path so 'ingestion.config' can be imported ---
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from ingestion import config
+from ingestion.symbols import shard_symbols, add_shard_arguments
+from ingestion.mc_extract import extract_headlines
+from monitoring import metrics
 
-# Mapping Stock Codes to MoneyControl URL Slugs
-MC_SLUGS = {
-    "RELIANCE": "reliance-industries",
-    "TCS": "tcs",
-    "INFY": "infosys",
-    "HDFCBANK": "hdfc-bank",
-    "ICICIBANK": "icici-bank",
-    "TATAMOTORS": "tata-motors",
-    "AXISBANK": "axis-bank",
-    "HCLTECH": "hcl-technologies",
-    "BHARTIARTL": "bharti-airtel",
-    "WIPRO": "wipro"
-}
+# Every symbol is polled once per cycle; with shards, each worker covers its slice in that time
+CYCLE_SECONDS = 180
+# Pause between requests from one worker, to stay polite to MoneyControl
+REQUEST_DELAY_SECONDS = 1
+# Newest headlines staged per stock per cycle
+HEADLINES_PER_PAGE = 2
+# Processes parsing pages while the next one downloads. Off by default: with lxml a
+# page parses faster than it can be shipped to a worker (benchmarks/bench_mc_extract.py)
+PARSE_WORKERS = int(os.getenv("MC_PARSE_WORKERS", "0"))
 
 # User-Agent is crucial for scraping to avoid 403 Forbidden errors
 HEADERS = {
@@ -40,73 +41,94 @@ def write_to_staging(data):
         
         with open(filepath, 'w') as f:
             json.dump(data, f)
+        metrics.counter("ingest_records_total", "Records written to staging", {"source": "moneycontrol"}).inc()
             
     except Exception as e:
+        metrics.counter("ingest_errors_total", "Ingestion failures", {"source": "moneycontrol"}).inc()
         print(f"❌ Error writing file: {e}")
 
-def scrape_moneycontrol():
-    print(f"🚀 Starting MoneyControl Scraper...")
-    print(f"📂 Writing to: {config.STAGING_MONEYCONTROL}")
+def stage_headlines(stock_code, headlines):
+    for headline, date_str in headlines:
+        # We use 'text' field to match the schema Spark expects
+        msg = {
+            "id": str(uuid.uuid4()),
+            "text": headline,
+            "created_at": datetime.datetime.utcnow().isoformat(),
+            "stock_tag": stock_code,
+            "source": "MoneyControl",
+            "display_date": date_str if date_str is not None else datetime.datetime.now().strftime("%B %d, %Y %I:%M %p IST")
+        }
 
-    while True:
-        for stock_code in config.STOCKS_LIST:
-            slug = MC_SLUGS.get(stock_code)
-            if not slug:
-                continue
+        write_to_staging(msg)
+        print(f"[{stock_code}] Scraped: {headline[:50]}...")
 
-            url = f"https://www.moneycontrol.com/news/tags/{slug}.html"
-            
-            try:
+def drain(pending, wait=False):
+    """Stages the parsed pages in `pending` [(stock_code, future)]; returns those still parsing."""
+    left = []
+    for stock_code, future in pending:
+        if not wait and not future.done():
+            left.append((stock_code, future))
+            continue
+        try:
+            stage_headlines(stock_code, future.result())
+        except Exception as e:
+            metrics.counter("ingest_errors_total", "Ingestion failures", {"source": "moneycontrol"}).inc()
+            print(f"❌ Parse Error for {stock_code}: {e}")
+    return left
+
+def scrape_cycle(symbols, pool=None):
+    """
+    Scrapes the tag page of each registry symbol once and stages the newest
+    headlines. With a `pool`, pages are parsed there while the next one downloads.
+    """
+    pending = []
+    for entry in symbols:
+        stock_code, slug = entry.symbol, entry.mc_slug
+        if not slug:
+            continue
+
+        url = f"https://www.moneycontrol.com/news/tags/{slug}.html"
+
+        try:
+            with metrics.timer("ingest_fetch_seconds", "Upstream fetch latency", {"source": "moneycontrol"}):
                 response = requests.get(url, headers=HEADERS)
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    
-                    # MoneyControl News Structure: <li> with class 'clearfix' inside a specific ID/div
-                    news_items = soup.find_all('li', class_='clearfix')
-                    
-                    count = 0
-                    for item in news_items:
-                        if count >= 2: break # Grab top 2 latest headlines per stock per cycle
-                        
-                        # Extract Headline
-                        h2 = item.find('h2')
-                        if not h2: continue
-                        
-                        link = h2.find('a')
-                        if not link: continue
-                        
-                        headline = link.get_text().strip()
-                        
-                        # Extract Time (if available)
-                        time_span = item.find('span')
-                        date_str = time_span.get_text() if time_span else datetime.datetime.now().strftime("%B %d, %Y %I:%M %p IST")
-                        
-                        # Create Message
-                        # We use 'text' field to match the schema Spark expects
-                        msg = {
-                            "id": str(uuid.uuid4()),
-                            "text": headline,
-                            "created_at": datetime.datetime.utcnow().isoformat(),
-                            "stock_tag": stock_code,
-                            "source": "MoneyControl",
-                            "display_date": date_str
-                        }
-                        
-                        write_to_staging(msg)
-                        print(f"[{stock_code}] Scraped: {headline[:50]}...")
-                        count += 1
-                        
+            if response.status_code == 200:
+                if pool is None:
+                    with metrics.timer("ingest_parse_seconds", "Page parse time", {"source": "moneycontrol"}):
+                        headlines = extract_headlines(response.content, HEADLINES_PER_PAGE)
+                    stage_headlines(stock_code, headlines)
                 else:
-                    print(f"⚠️ Failed to fetch {url}: Status {response.status_code}")
-                    
-            except Exception as e:
-                print(f"❌ Scrape Error for {stock_code}: {e}")
-                
-            # Short sleep between stocks to be polite
-            time.sleep(1) 
+                    pending.append((stock_code, pool.submit(extract_headlines, response.content, HEADLINES_PER_PAGE)))
+            else:
+                print(f"⚠️ Failed to fetch {url}: Status {response.status_code}")
+
+        except Exception as e:
+            metrics.counter("ingest_errors_total", "Ingestion failures", {"source": "moneycontrol"}).inc()
+            print(f"❌ Scrape Error for {stock_code}: {e}")
+
+        pending = drain(pending)
+        # Short sleep between stocks to be polite
+        time.sleep(REQUEST_DELAY_SECONDS)
+    drain(pending, wait=True)
+
+def scrape_moneycontrol(shard=0, shards=1):
+    symbols = shard_symbols(shard, shards)
+    print(f"🚀 Starting MoneyControl Scraper shard {shard + 1}/{shards} for {len(symbols)} stocks...")
+    print(f"📂 Writing to: {config.STAGING_MONEYCONTROL}")
+    metrics.start_flusher("producer_moneycontrol" if shards == 1 else f"producer_moneycontrol_{shard}")
+    metrics.gauge("ingest_shard_symbols", "Symbols owned by this producer shard", {"source": "moneycontrol"}).set(len(symbols))
 
-        print("⏳ Waiting 3 minutes before next scrape cycle...")
-        time.sleep(180)
+    with ProcessPoolExecutor(PARSE_WORKERS) if PARSE_WORKERS else contextlib.nullcontext() as pool:
+        while True:
+            started = time.monotonic()
+            with metrics.timer("ingest_cycle_seconds", "Wall time of one pass over the shard's symbols", {"source": "moneycontrol"}):
+                scrape_cycle(symbols, pool)
+            elapsed = time.monotonic() - started
+            if elapsed > CYCLE_SECONDS:
+                print(f"⚠️ Cycle took {elapsed:.0f}s (> {CYCLE_SECONDS}s); run more shards to keep up.")
+            print(f"⏳ Waiting {max(0, CYCLE_SECONDS - elapsed):.0f} seconds before next scrape cycle...")
+            time.sleep(max(0, CYCLE_SECONDS - elapsed))
 
 if __name__ == "__main__":
-    scrape_moneycontrol()
\ No newline at end of file
+    args = add_shard_arguments(argparse.ArgumentParser(description="MoneyControl scraper")).parse_args()
+    scrape_moneycontrol(args.shard, args.shards)
\ No newline at end of file
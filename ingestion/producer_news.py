@@ -6,9 +6,16 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import json
 import time
+import argparse
 import requests
 import uuid
 from ingestion import config
+from ingestion.symbols import shard_symbols, add_shard_arguments
+from monitoring import metrics
+
+# Every symbol is polled once per cycle; with shards, each worker covers its slice in that time
+CYCLE_SECONDS = 60
+BASE_URL = "https://newsapi.org/v2/everything"
 
 def write_to_staging(data):
     """Writes a single news record as a JSON file in the staging folder."""
@@ -18,56 +25,78 @@ def write_to_staging(data):
         
         with open(filepath, 'w') as f:
             json.dump(data, f)
+        metrics.counter("ingest_records_total", "Records written to staging", {"source": "news"}).inc()
             
     except Exception as e:
+        metrics.counter("ingest_errors_total", "Ingestion failures", {"source": "news"}).inc()
         print(f"❌ Error writing file: {e}")
 
-def fetch_and_produce_news():
+def fetch_articles(query, stock=None):
+    """Stages the latest articles for one NewsAPI query. `stock` is None for market-wide queries."""
+    params = {
+        "q": query,
+        "apiKey": config.NEWS_API_KEY,
+        "language": "en",
+        "sortBy": "publishedAt",
+        "pageSize": 5
+    }
+    label = stock or "MARKET"
+
+    try:
+        with metrics.timer("ingest_fetch_seconds", "Upstream fetch latency", {"source": "news"}):
+            response = requests.get(BASE_URL, params=params)
+        data = response.json()
+
+        if data.get("status") == "ok":
+            articles = data.get("articles", [])
+            for article in articles:
+                news_message = {
+                    "stock": stock,
+                    "title": article.get("title"),
+                    "description": article.get("description"),
+                    "source": article.get("source", {}).get("name"),
+                    "published_at": article.get("publishedAt"),
+                    "url": article.get("url")
+                }
+
+                write_to_staging(news_message)
+                print(f"[{label}] Saved news: {article.get('title')[:50]}...")
+        else:
+            print(f"⚠️ API Error for {label}: {data.get('message')}")
+
+    except Exception as e:
+        metrics.counter("ingest_errors_total", "Ingestion failures", {"source": "news"}).inc()
+        print(f"❌ Error fetching news for {label}: {e}")
+
+def produce_cycle(stocks, market_query=None):
+    """Fetches the latest articles for each stock (and the market-wide query, if any) once and stages them."""
+    if market_query:
+        fetch_articles(market_query)
+    for stock in stocks:
+        fetch_articles(stock, stock)
+
+def fetch_and_produce_news(shard=0, shards=1):
     if not config.NEWS_API_KEY:
         print("❌ ERROR: NEWS_API_KEY is missing in .env file.")
         return
 
-    base_url = "https://newsapi.org/v2/everything"
-    
-    print(f"🚀 Starting Real News Producer for stocks: {config.STOCKS_LIST}")
+    stocks = [s.symbol for s in shard_symbols(shard, shards)]
+    print(f"🚀 Starting Real News Producer shard {shard + 1}/{shards} for {len(stocks)} stocks")
     print(f"📂 Writing to: {config.STAGING_NEWS}")
+    metrics.start_flusher("producer_news" if shards == 1 else f"producer_news_{shard}")
+    metrics.gauge("ingest_shard_symbols", "Symbols owned by this producer shard", {"source": "news"}).set(len(stocks))
 
     while True:
-        for stock in config.STOCKS_LIST:
-            params = {
-                "q": stock,
-                "apiKey": config.NEWS_API_KEY,
-                "language": "en",
-                "sortBy": "publishedAt",
-                "pageSize": 5
-            }
-
-            try:
-                response = requests.get(base_url, params=params)
-                data = response.json()
-
-                if data.get("status") == "ok":
-                    articles = data.get("articles", [])
-                    for article in articles:
-                        news_message = {
-                            "stock": stock,
-                            "title": article.get("title"),
-                            "description": article.get("description"),
-                            "source": article.get("source", {}).get("name"),
-                            "published_at": article.get("publishedAt"),
-                            "url": article.get("url")
-                        }
-                        
-                        write_to_staging(news_message)
-                        print(f"[{stock}] Saved news: {article.get('title')[:50]}...")
-                else:
-                    print(f"⚠️ API Error for {stock}: {data.get('message')}")
-
-            except Exception as e:
-                print(f"❌ Error fetching news for {stock}: {e}")
-
-        print("⏳ Waiting 60 seconds before next fetch cycle...")
-        time.sleep(60)
+        started = time.monotonic()
+        with metrics.timer("ingest_cycle_seconds", "Wall time of one pass over the shard's symbols", {"source": "news"}):
+            # The market-wide feed is fetched by the first shard only
+            produce_cycle(stocks, config.NEWS_MARKET_QUERY if shard == 0 else None)
+        elapsed = time.monotonic() - started
+        if elapsed > CYCLE_SECONDS:
+            print(f"⚠️ Cycle took {elapsed:.0f}s (> {CYCLE_SECONDS}s); run more shards to keep up.")
+        print(f"⏳ Waiting {max(0, CYCLE_SECONDS - elapsed):.0f} seconds before next fetch cycle...")
+        time.sleep(max(0, CYCLE_SECONDS - elapsed))
 
 if __name__ == "__main__":
-    fetch_and_produce_news()
\ No newline at end of file
+    args = add_shard_arguments(argparse.ArgumentParser(description="NewsAPI producer")).parse_args()
+    fetch_and_produce_news(args.shard, args.shards)
\ No newline at end of file
@@ -0,0 +1,92 @@
+import os
+import csv
+import hashlib
+from collections import namedtuple
+
+# Single source of truth for the symbol universe (ingestion, batch load, training, prediction).
+# Add a row to symbols.csv to track a new name; set active=0 to stop polling it without losing its metadata.
+
+# --- CONFIGURATION ---
+REGISTRY_FILE = os.getenv("SYMBOLS_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "symbols.csv"))
+
+Symbol = namedtuple("Symbol", ["symbol", "exchange_suffix", "mc_slug", "sector", "aliases"])
+
+_cache = {}  # (path, mtime_ns) -> [Symbol]
+
+
+def _read(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = []
+        for row in csv.DictReader(f):
+            if row.get("active", "1").strip() not in ("1", "true", "yes"):
+                continue
+            rows.append(Symbol(
+                symbol=row["symbol"].strip().upper(),
+                exchange_suffix=row.get("exchange_suffix", "").strip(),
+                mc_slug=row.get("mc_slug", "").strip() or None,
+                sector=row.get("sector", "").strip() or "General",
+                aliases=tuple(a.strip() for a in row.get("aliases", "").split("|") if a.strip()),
+            ))
+    return rows
+
+
+def load_registry(path=None):
+    """
+    Active symbols from the registry file, in file order. The STOCKS env var
+    (comma list) narrows it to a subset, e.g. for a quick local run.
+    """
+    path = path or REGISTRY_FILE
+    key = (path, os.stat(path).st_mtime_ns)
+    if key not in _cache:
+        _cache.clear()
+        _cache[key] = _read(path)
+    registry = _cache[key]
+
+    only = os.getenv("STOCKS")
+    if only:
+        wanted = {s.strip().upper() for s in only.split(",") if s.strip()}
+        registry = [s for s in registry if s.symbol in wanted]
+    return registry
+
+
+def symbol_names(path=None):
+    return [s.symbol for s in load_registry(path)]
+
+
+def tickers(path=None):
+    """Exchange tickers as Yahoo Finance expects them, e.g. 'TCS.NS'."""
+    return [s.symbol + s.exchange_suffix for s in load_registry(path)]
+
+
+def by_symbol(path=None):
+    return {s.symbol: s for s in load_registry(path)}
+
+
+# --- SHARDING ---
+# Rendezvous (highest-random-weight) hashing: each symbol goes to the shard with
+# the highest hash(symbol, shard). Changing the shard count only moves the
+# symbols whose winner changed (about 1/N of them), and every worker computes
+# the same assignment independently, with no coordination.
+
+def _weight(symbol, shard):
+    return int.from_bytes(hashlib.blake2b(f"{symbol}:{shard}".encode(), digest_size=8).digest(), "big")
+
+
+def shard_of(symbol, shards):
+    return max(range(shards), key=lambda shard: _weight(symbol, shard))
+
+
+def shard_symbols(shard, shards, path=None):
+    """The registry entries owned by `shard` (0-based) out of `shards` workers."""
+    if not 0 <= shard < shards:
+        raise ValueError(f"shard must be in [0, {shards}), got {shard}")
+    return [s for s in load_registry(path) if shards == 1 or shard_of(s.symbol, shards) == shard]
+
+
+def add_shard_arguments(parser):
+    """Adds --shard/--shards (defaults from INGEST_SHARD / INGEST_SHARDS) to a producer's argparse parser."""
+    parser.add_argument("--shard", type=int, default=int(os.getenv("INGEST_SHARD", "0")),
+                        help="This worker's shard index (0-based).")
+    parser.add_argument("--shards", type=int, default=int(os.getenv("INGEST_SHARDS", "1")),
+                        help="Total number of producer workers.")
+    return parser
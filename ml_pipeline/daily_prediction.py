@@ -6,21 +6,30 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import json
 import glob
+import math
 import pandas as pd
 import numpy as np
 import xgboost as xgb
 import yfinance as yf
 from datetime import datetime, timedelta
+from monitoring import metrics
+from ingestion.symbols import tickers
+from processing.near_dup import cluster_mean
+from ml_pipeline.indicators import IndicatorBook
+from ml_pipeline.explanations import FEATURES, explain_batch, model_version, write_explanations
 
 # --- CONFIGURATION ---
 BASE_PATH = os.path.join(os.getcwd(), "data")
 MC_PATH = os.path.join(BASE_PATH, "processed_moneycontrol")
 MODELS_DIR = os.path.join(os.getcwd(), "models")
 PREDICTIONS_FILE = os.path.join(BASE_PATH, "latest_predictions.json")
+EXPLANATIONS_FILE = os.path.join(BASE_PATH, "latest_explanations.json")
+# Per-ticker indicator state as of the last closed daily bar; delete it to rebuild from 3 months of history
+INDICATOR_STATE = os.path.join(BASE_PATH, "cache", "indicators_daily.json")
+# The checkpointed close must match the re-fetched bar this closely, as in backend Series.extend
+ANCHOR_RTOL = 1e-9
 
-# UPDATED STOCK LIST
-STOCKS = ["RELIANCE.NS", "TCS.NS", "INFY.NS", "HDFCBANK.NS", "ICICIBANK.NS", 
-          "SBIN.NS", "AXISBANK.NS", "HCLTECH.NS", "BHARTIARTL.NS", "WIPRO.NS"]
+STOCKS = tickers()
 
 def get_latest_sentiment(stock_symbol):
     try:
@@ -52,14 +61,41 @@ def get_latest_sentiment(stock_symbol):
         if stock_df.empty:
             return 0.0
             
-        avg_score = stock_df['sentiment_score'].mean()
+        avg_score = cluster_mean(stock_df, [])
         return float(avg_score) if not pd.isna(avg_score) else 0.0
         
     except Exception as e:
         print(f"⚠️ Error reading sentiment for {stock_symbol}: {e}")
         return 0.0
 
+def download_closes(ticker, **kwargs):
+    """Adjusted daily bars with lower-case columns."""
+    df = yf.download(ticker, progress=False, auto_adjust=True, **kwargs)
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    df.columns = [str(c).lower() for c in df.columns]
+    return df
+
+def continues_checkpoint(df, state):
+    """
+    Whether bars fetched from state.last_ts on still agree with the checkpoint.
+    A split or dividend re-adjusts every past close, so the re-fetched close of
+    the last committed bar no longer matches and the state must be rebuilt.
+    An empty download proves nothing, so the state is kept.
+    """
+    if df.empty or 'close' not in df.columns:
+        return True
+    anchor = df['close'][df.index.strftime("%Y-%m-%d") == state.last_ts]
+    return len(anchor) == 1 and math.isclose(float(anchor.iloc[0]), state.last_close, rel_tol=ANCHOR_RTOL)
+
 def generate_predictions():
+    try:
+        with metrics.timer("ml_prediction_cycle_seconds", "Wall time of generate_predictions"):
+            _run_predictions()
+    finally:
+        metrics.flush("daily_prediction")
+
+def _run_predictions():
     print("🔮 Starting Daily Prediction Pipeline...")
     
     model_path = os.path.join(MODELS_DIR, "xgboost_stock_model.json")
@@ -71,66 +107,84 @@ def generate_predictions():
     model.load_model(model_path)
     
     predictions = []
+    stocks, rows = [], []
     
+    book = IndicatorBook.load(INDICATOR_STATE)
+    today = datetime.now().strftime("%Y-%m-%d")
+
     for ticker in STOCKS:
         try:
-            df = yf.download(ticker, period="3mo", progress=False, auto_adjust=True)
+            state = book[ticker]
+            df = None
+            if state.last_ts is not None:
+                # Only the bars since the checkpoint; the indicators carry the rest
+                df = download_closes(ticker, start=state.last_ts)
+                if not continues_checkpoint(df, state):
+                    metrics.counter("ml_indicator_rebuilds_total", "Checkpointed indicator states rebuilt after an adjustment").inc()
+                    print(f"🔁 {ticker}: history was re-adjusted since the checkpoint, rebuilding indicators")
+                    state, df = book.reset(ticker), None
+            if df is None:
+                df = download_closes(ticker, period="3mo")
             
-            if df.empty:
+            if df.empty and state.last_close is None:
                 print(f"⚠️ No price data for {ticker}")
                 continue
-                
-            if isinstance(df.columns, pd.MultiIndex):
-                df.columns = df.columns.get_level_values(0)
-            
-            df.columns = [str(c).lower() for c in df.columns]
 
-            if 'close' not in df.columns:
+            if not df.empty and 'close' not in df.columns:
                 print(f"⚠️ 'close' column missing for {ticker}")
                 continue
-            
-            df['ma_5'] = df['close'].rolling(window=5).mean()
-            df['ma_10'] = df['close'].rolling(window=10).mean()
-            df['volatility'] = df['close'].pct_change().rolling(window=5).std()
-            
-            df = df.dropna()
 
-            if df.empty:
+            # Closed bars advance the state; today's bar may still be trading, so it is only peeked at
+            forming = None
+            for day, close in zip(df.index.strftime("%Y-%m-%d"), df['close'] if not df.empty else []):
+                if pd.isna(close):
+                    continue
+                if day < today:
+                    state.update(day, close)
+                else:
+                    forming = close
+            latest = state.snapshot(forming)
+
+            if latest['ma_10'] is None or latest['volatility'] is None:
                 print(f"⚠️ Not enough data to calculate indicators for {ticker}")
                 continue
 
-            latest = df.iloc[-1].copy()
             sentiment = get_latest_sentiment(ticker)
-            
-            features = pd.DataFrame([{
-                'mc_sentiment': sentiment,
-                'close': float(latest['close']),
-                'ma_5': float(latest['ma_5']),
-                'ma_10': float(latest['ma_10']),
-                'volatility': float(latest['volatility'])
-            }])
-            
-            features.fillna(0, inplace=True)
-            
-            prob = model.predict_proba(features)[0][1]
-            prediction = "UP" if prob > 0.5 else "DOWN"
-            
-            result = {
-                "stock": ticker.replace(".NS", ""),
-                "current_price": round(float(latest['close']), 2),
-                "prediction": prediction,
-                "confidence": round(float(prob) * 100, 2),
-                "sentiment_score": round(sentiment, 4),
-                "timestamp": datetime.now().isoformat()
-            }
-            predictions.append(result)
-            print(f"✅ {ticker}: {prediction} ({prob:.2f})")
+            stocks.append(ticker.replace(".NS", ""))
+            rows.append({'mc_sentiment': sentiment, **{f: latest[f] for f in FEATURES if f != 'mc_sentiment'}})
             
         except Exception as e:
+            metrics.counter("ml_prediction_errors_total", "Symbols that failed to predict").inc()
             print(f"❌ Failed to predict for {ticker}: {e}")
 
-    with open(PREDICTIONS_FILE, "w") as f:
+    # One batched booster pass scores every symbol and computes its TreeSHAP contributions
+    with metrics.timer("ml_explain_seconds", "Wall time of the batched predict + pred_contribs call"):
+        explanations = explain_batch(model, stocks, rows)
+
+    now = datetime.now().isoformat()
+    for stock, row in zip(stocks, rows):
+        result = explanations[stock]
+        predictions.append({
+            "stock": stock,
+            "current_price": round(float(row['close']), 2),
+            "prediction": result["prediction"],
+            "confidence": result["confidence"],
+            "sentiment_score": round(row['mc_sentiment'], 4),
+            "timestamp": now
+        })
+        print(f"✅ {stock}: {result['prediction']} ({result['confidence'] / 100:.2f})")
+
+    book.save()
+
+    # Explanations first, so a client reacting to the new predictions can already fetch them
+    write_explanations(EXPLANATIONS_FILE, model_version(model_path), now, explanations)
+
+    # Write-then-rename so the API never reads a half-written file
+    tmp_path = PREDICTIONS_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
         json.dump(predictions, f, indent=4)
+    os.replace(tmp_path, PREDICTIONS_FILE)
+    metrics.gauge("ml_predictions_published", "Symbols in the last predictions snapshot").set(len(predictions))
         
     print(f"💾 Predictions saved to {PREDICTIONS_FILE}")
 
@@ -0,0 +1,73 @@
+import os
+import json
+import hashlib
+import xgboost as xgb
+
+from ml_pipeline.indicators import SymbolIndicators
+
+# Per-feature contributions (TreeSHAP) behind each prediction. All symbols go
+# through one batched booster.predict(pred_contribs=True) call, so a snapshot
+# costs a single tree traversal pass. Contributions are in log-odds: base_value
+# plus the contributions is the model's margin, and sigmoid(margin) is the
+# probability of UP.
+
+# --- CONFIGURATION ---
+FEATURES = ['mc_sentiment', 'close', 'ma_5', 'ma_10', 'volatility']
+# Closed daily bars needed to fill every feature window (ma_10)
+WARMUP_BARS = 11
+
+
+def model_version(model_path):
+    """Content hash of the saved model, so explanations are tied to the exact trees that made them."""
+    with open(model_path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()[:12]
+
+
+def _value(row, feature):
+    value = row.get(feature)
+    return 0.0 if value is None or value != value else float(value)  # missing / NaN -> 0, as in training
+
+
+def explain_batch(model, stocks, rows):
+    """
+    {stock: {prediction, confidence, base_value, contributions, features}} for
+    feature dicts `rows` (aligned with `stocks`), from one probability pass and
+    one pred_contribs pass over a single DMatrix. `model` is an XGBClassifier or a Booster.
+    """
+    if not rows:
+        return {}
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    matrix = xgb.DMatrix([[_value(row, f) for f in FEATURES] for row in rows], feature_names=FEATURES)
+    probs = booster.predict(matrix)
+    contribs = booster.predict(matrix, pred_contribs=True)
+
+    out = {}
+    for stock, row, prob, contrib in zip(stocks, rows, probs.tolist(), contribs.tolist()):
+        out[stock] = {
+            "prediction": "UP" if prob > 0.5 else "DOWN",
+            "confidence": round(prob * 100, 2),
+            "base_value": contrib[-1],
+            "contributions": dict(zip(FEATURES, contrib[:-1])),
+            "features": {f: _value(row, f) for f in FEATURES},
+        }
+    return out
+
+
+def price_features(closes):
+    """close / ma_5 / ma_10 / volatility after the last of `closes` (oldest first), or None if too short."""
+    state = SymbolIndicators()
+    for i, close in enumerate(closes[-WARMUP_BARS:]):
+        state.update(i, close)
+    snap = state.snapshot()
+    if snap["ma_10"] is None or snap["volatility"] is None:
+        return None
+    return {f: snap[f] for f in ("close", "ma_5", "ma_10", "volatility")}
+
+
+def write_explanations(path, version, generated_at, explanations):
+    """Write-then-rename, like the predictions snapshot the API serves beside it."""
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"model_version": version, "generated_at": generated_at, "features": FEATURES,
+                   "explanations": explanations}, f, separators=(",", ":"))
+    os.replace(tmp, path)
@@ -0,0 +1,288 @@
+import os
+import json
+import math
+
+# Incremental technical indicators: each new bar updates a symbol's state in
+# constant time, instead of recomputing rolling windows over the full history.
+# That keeps per-bar cost flat at 1-minute resolution across thousands of symbols.
+#
+# Every component has push(x), which commits a finished bar, and peek(x), which
+# returns the value as if x were pushed without changing state. peek() serves
+# a bar that is still forming: every tick can be scored and the bar is pushed
+# once it closes. Values match pandas rolling(...).mean() / .std() (ddof=1)
+# and Wilder's RSI.
+
+# --- CONFIGURATION ---
+STATE_VERSION = 1
+
+
+class RollingMean:
+    """Mean of the last `size` values: ring buffer + running sum."""
+    __slots__ = ("size", "buf", "pos", "count", "total")
+
+    def __init__(self, size):
+        self.size = size
+        self.buf = [0.0] * size
+        self.pos = 0
+        self.count = 0
+        self.total = 0.0
+
+    def push(self, x):
+        outgoing = self.buf[self.pos] if self.count == self.size else 0.0
+        self.buf[self.pos] = x
+        self.pos = (self.pos + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+        self.total += x - outgoing
+        if self.pos == 0:
+            self.total = math.fsum(self.buf)  # once per lap, so float drift never accumulates
+
+    def peek(self, x):
+        if self.count + 1 < self.size:
+            return None
+        outgoing = self.buf[self.pos] if self.count == self.size else 0.0
+        return (self.total - outgoing + x) / self.size
+
+    @property
+    def value(self):
+        return self.total / self.size if self.count == self.size else None
+
+    def state(self):
+        return [self.buf, self.pos, self.count]
+
+    @classmethod
+    def restore(cls, size, state):
+        obj = cls(size)
+        obj.buf, obj.pos, obj.count = list(state[0]), state[1], state[2]
+        obj.total = math.fsum(obj.buf)  # unfilled slots are 0.0
+        return obj
+
+
+class RollingStd:
+    """Sample standard deviation of the last `size` values (sliding-window Welford)."""
+    __slots__ = ("size", "buf", "pos", "count", "mean", "m2")
+
+    def __init__(self, size):
+        self.size = size
+        self.buf = [0.0] * size
+        self.pos = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def _next(self, x):
+        if self.count < self.size:
+            n = self.count + 1
+            delta = x - self.mean
+            mean = self.mean + delta / n
+            return n, mean, self.m2 + delta * (x - mean)
+        old = self.buf[self.pos]
+        mean = self.mean + (x - old) / self.size
+        return self.size, mean, self.m2 + (x - old) * (x - mean + old - self.mean)
+
+    def push(self, x):
+        self.count, self.mean, self.m2 = self._next(x)
+        self.buf[self.pos] = x
+        self.pos = (self.pos + 1) % self.size
+        if self.pos == 0 and self.count == self.size:
+            # Once per lap, re-derive from the window so removal round-off can't pile up
+            self.mean = math.fsum(self.buf) / self.size
+            self.m2 = math.fsum((v - self.mean) ** 2 for v in self.buf)
+
+    def peek(self, x):
+        n, _, m2 = self._next(x)
+        return math.sqrt(max(m2, 0.0) / (n - 1)) if n == self.size else None
+
+    @property
+    def value(self):
+        return math.sqrt(max(self.m2, 0.0) / (self.count - 1)) if self.count == self.size else None
+
+    def state(self):
+        return [self.buf, self.pos, self.count, self.mean, self.m2]
+
+    @classmethod
+    def restore(cls, size, state):
+        obj = cls(size)
+        obj.buf, obj.pos, obj.count, obj.mean, obj.m2 = list(state[0]), *state[1:]
+        return obj
+
+
+class Ema:
+    __slots__ = ("span", "alpha", "value")
+
+    def __init__(self, span):
+        self.span = span
+        self.alpha = 2.0 / (span + 1)
+        self.value = None
+
+    def peek(self, x):
+        return x if self.value is None else self.value + self.alpha * (x - self.value)
+
+    def push(self, x):
+        self.value = self.peek(x)
+
+    def state(self):
+        return self.value
+
+    @classmethod
+    def restore(cls, span, state):
+        obj = cls(span)
+        obj.value = state
+        return obj
+
+
+class Rsi:
+    """Wilder's RSI: simple average of the first `period` changes, then Wilder smoothing."""
+    __slots__ = ("period", "count", "avg_gain", "avg_loss")
+
+    def __init__(self, period):
+        self.period = period
+        self.count = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    def _next(self, change):
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        n = self.count + 1
+        if n <= self.period:
+            return n, self.avg_gain + (gain - self.avg_gain) / n, self.avg_loss + (loss - self.avg_loss) / n
+        k = self.period
+        return n, (self.avg_gain * (k - 1) + gain) / k, (self.avg_loss * (k - 1) + loss) / k
+
+    @staticmethod
+    def _rsi(n, period, gain, loss):
+        if n < period:
+            return None
+        return 100.0 if loss == 0 else 100.0 - 100.0 / (1.0 + gain / loss)
+
+    def push(self, change):
+        self.count, self.avg_gain, self.avg_loss = self._next(change)
+
+    def peek(self, change):
+        n, gain, loss = self._next(change)
+        return self._rsi(n, self.period, gain, loss)
+
+    @property
+    def value(self):
+        return self._rsi(self.count, self.period, self.avg_gain, self.avg_loss)
+
+    def state(self):
+        return [self.count, self.avg_gain, self.avg_loss]
+
+    @classmethod
+    def restore(cls, period, state):
+        obj = cls(period)
+        obj.count, obj.avg_gain, obj.avg_loss = state
+        return obj
+
+
+class SymbolIndicators:
+    """All indicator state for one symbol. `update` commits a closed bar; `snapshot` scores a forming one."""
+    __slots__ = ("last_ts", "last_close", "bars", "ma_5", "ma_10", "volatility", "ema_12", "rsi_14")
+
+    def __init__(self):
+        self.last_ts = None
+        self.last_close = None
+        self.bars = 0
+        self.ma_5 = RollingMean(5)
+        self.ma_10 = RollingMean(10)
+        self.volatility = RollingStd(5)  # of simple returns, like close.pct_change().rolling(5).std()
+        self.ema_12 = Ema(12)
+        self.rsi_14 = Rsi(14)
+
+    def update(self, ts, close):
+        """Commits the bar closing at `ts` (any sortable value, e.g. epoch seconds). Older bars are ignored."""
+        if self.last_ts is not None and ts <= self.last_ts:
+            return False
+        close = float(close)
+        if self.last_close is not None:
+            self.volatility.push(close / self.last_close - 1.0)
+            self.rsi_14.push(close - self.last_close)
+        self.ma_5.push(close)
+        self.ma_10.push(close)
+        self.ema_12.push(close)
+        self.last_ts, self.last_close = ts, close
+        self.bars += 1
+        return True
+
+    def snapshot(self, close=None):
+        """
+        Indicator values after the last committed bar, or, given `close`, as if a
+        bar closing at that price were appended (state is left unchanged).
+        """
+        if close is None:
+            return {"close": self.last_close, "ma_5": self.ma_5.value, "ma_10": self.ma_10.value,
+                    "volatility": self.volatility.value, "ema_12": self.ema_12.value, "rsi_14": self.rsi_14.value}
+        close = float(close)
+        has_prev = self.last_close is not None
+        return {
+            "close": close,
+            "ma_5": self.ma_5.peek(close),
+            "ma_10": self.ma_10.peek(close),
+            "volatility": self.volatility.peek(close / self.last_close - 1.0) if has_prev else None,
+            "ema_12": self.ema_12.peek(close),
+            "rsi_14": self.rsi_14.peek(close - self.last_close) if has_prev else None,
+        }
+
+    def state(self):
+        return {"last_ts": self.last_ts, "last_close": self.last_close, "bars": self.bars,
+                "ma_5": self.ma_5.state(), "ma_10": self.ma_10.state(), "volatility": self.volatility.state(),
+                "ema_12": self.ema_12.state(), "rsi_14": self.rsi_14.state()}
+
+    @classmethod
+    def restore(cls, state):
+        obj = cls()
+        obj.last_ts, obj.last_close, obj.bars = state["last_ts"], state["last_close"], state["bars"]
+        obj.ma_5 = RollingMean.restore(5, state["ma_5"])
+        obj.ma_10 = RollingMean.restore(10, state["ma_10"])
+        obj.volatility = RollingStd.restore(5, state["volatility"])
+        obj.ema_12 = Ema.restore(12, state["ema_12"])
+        obj.rsi_14 = Rsi.restore(14, state["rsi_14"])
+        return obj
+
+
+class IndicatorBook:
+    """Per-symbol indicator state for one bar interval, checkpointed to a JSON file."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.symbols = {}
+
+    def __getitem__(self, symbol):
+        state = self.symbols.get(symbol)
+        if state is None:
+            state = self.symbols[symbol] = SymbolIndicators()
+        return state
+
+    def __contains__(self, symbol):
+        return symbol in self.symbols
+
+    def update(self, symbol, ts, close):
+        return self[symbol].update(ts, close)
+
+    def reset(self, symbol):
+        """Drops the symbol's state (e.g. after a split re-based its history) and returns a fresh one."""
+        self.symbols.pop(symbol, None)
+        return self[symbol]
+
+    def save(self, path=None):
+        """Atomic checkpoint (write-then-rename)."""
+        path = path or self.path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": STATE_VERSION,
+                       "symbols": {s: ind.state() for s, ind in self.symbols.items()}}, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """The checkpoint at `path`, or an empty book if there is none (or it has another version)."""
+        book = cls(path)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return book
+        if data.get("version") == STATE_VERSION:
+            book.symbols = {s: SymbolIndicators.restore(st) for s, st in data["symbols"].items()}
+        return book
@@ -1,13 +1,19 @@
+import sys
 import os
-import pandas as pd
+
+# --- FIX: Add project root to path ---
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
 import xgboost as xgb
 import json
 from datetime import datetime
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
+from monitoring import metrics
+from processing.stage_format import PROCESSED_FILE, read_frame
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-INPUT_FILE = os.path.join(BASE_DIR, "data", "processed_data", "processed_stocks.csv")
+INPUT_FILE = PROCESSED_FILE
 MODELS_DIR = os.path.join(BASE_DIR, "models")
 PREDICTIONS_FILE = os.path.join(BASE_DIR, "data", "latest_predictions.json")
 
@@ -18,9 +24,9 @@ def train_and_predict():
         print(f"❌ Error: Processed data not found at {INPUT_FILE}")
         return
 
-    df = pd.read_csv(INPUT_FILE)
-    
     features = ['MA_10', 'Sentiment_Score', 'Volatility', 'Close', 'Daily_Return']
+    # Memory-mapped; only the columns the model uses are materialized
+    df = read_frame(INPUT_FILE, columns=['Stock_Symbol', 'Target'] + features)
     X = df[features]
     y = df['Target']
 
@@ -53,10 +59,15 @@ def train_and_predict():
             "timestamp": datetime.now().isoformat()
         })
 
-    with open(PREDICTIONS_FILE, "w") as f:
+    # Write-then-rename so the API never reads a half-written file
+    tmp_path = PREDICTIONS_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
         json.dump(latest_preds, f, indent=4)
+    os.replace(tmp_path, PREDICTIONS_FILE)
     
     print(f"💾 Dashboard predictions saved to {PREDICTIONS_FILE}")
 
 if __name__ == "__main__":
-    train_and_predict()
\ No newline at end of file
+    with metrics.timer("batch_stage_seconds", "Wall time of batch pipeline stages", {"stage": "model_training"}):
+        train_and_predict()
+    metrics.flush("batch_model_training")
\ No newline at end of file
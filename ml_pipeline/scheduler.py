@@ -0,0 +1,209 @@
+import sys
+import os
+
+# --- FIX: Add project root to path ---
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import pyarrow.parquet as pq
+
+from monitoring import metrics
+from processing.parquet_store import list_partitions, partition_files
+
+# --- CONFIGURATION ---
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MC_PATH = os.path.join(ROOT_DIR, "data", "processed_moneycontrol")
+MODEL_PATH = os.path.join(ROOT_DIR, "models", "xgboost_stock_model.json")
+STATE_FILE = os.path.join(ROOT_DIR, "data", "ml_scheduler_state.json")
+
+POLL_SECONDS = int(os.getenv("ML_POLL_SECONDS", "30"))
+# Retrain once this many sentiment rows have landed since the last training run
+MIN_NEW_SENTIMENT_ROWS = int(os.getenv("ML_MIN_NEW_SENTIMENT_ROWS", "50"))
+# ...or, if any new rows exist at all, once the model is this old
+MAX_MODEL_AGE_SECONDS = int(os.getenv("ML_MAX_MODEL_AGE_SECONDS", str(24 * 3600)))
+# While NSE is open prices move continuously, so predictions are refreshed this often
+PRICE_REFRESH_SECONDS = int(os.getenv("ML_PRICE_REFRESH_SECONDS", "600"))
+# A failed step is not retried before this, so a broken upstream can't cause a retrain loop
+RETRY_SECONDS = int(os.getenv("ML_RETRY_SECONDS", "600"))
+
+IST = timezone(timedelta(hours=5, minutes=30))
+MARKET_OPEN = (9, 15)
+MARKET_CLOSE = (15, 30)
+
+
+def market_is_open(now):
+    return now.weekday() < 5 and MARKET_OPEN <= (now.hour, now.minute) < MARKET_CLOSE
+
+
+def last_session_date(now):
+    """Date of the most recent completed NSE session (weekends skipped, holidays not modelled)."""
+    day = now.date()
+    if now.weekday() >= 5 or (now.hour, now.minute) < MARKET_CLOSE:
+        day -= timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+
+def scan_sentiment(since_ns):
+    """
+    Returns (watermark_ns, new_rows) for MoneyControl part files modified after
+    `since_ns`. Only partitions whose directory changed are listed and row
+    counts come from Parquet footers, so an idle check is a few stat() calls.
+    """
+    mark, rows = since_ns, 0
+    for _, path in list_partitions(MC_PATH):
+        try:
+            if os.stat(path).st_mtime_ns <= since_ns:
+                continue
+        except FileNotFoundError:
+            continue
+        for f in partition_files(path):
+            try:
+                mtime = os.stat(f).st_mtime_ns
+                if mtime > since_ns:
+                    rows += pq.ParquetFile(f).metadata.num_rows
+                    mark = max(mark, mtime)
+            except Exception:
+                continue
+    return mark, rows
+
+
+# --- WARM WORKER ---
+# Training and prediction run in one long-lived child process so pandas,
+# xgboost and yfinance are imported once instead of on every cycle.
+
+def _warm_worker():
+    os.chdir(ROOT_DIR)
+    import ml_pipeline.train_model  # noqa: F401
+    import ml_pipeline.daily_prediction  # noqa: F401
+
+def _run_training():
+    from ml_pipeline import train_model
+    train_model.train_pipeline()
+
+def _run_prediction():
+    from ml_pipeline import daily_prediction
+    daily_prediction.generate_predictions()
+
+
+def load_state():
+    try:
+        with open(STATE_FILE) as f:
+            return json.load(f)
+    except Exception:
+        return {"train": {"sentiment_mark": 0, "session": ""},
+                "predict": {"sentiment_mark": 0, "session": "", "model_mtime": 0, "at": 0}}
+
+def save_state(state):
+    tmp_path = STATE_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, STATE_FILE)
+
+
+class MLScheduler:
+    """Runs training and prediction only when their input watermarks have moved."""
+
+    def __init__(self, poll_seconds=POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self.state = load_state()
+        self.pool = None
+        self._last_skip = None
+        self._retry_after = {}  # step -> monotonic time
+
+    def _submit(self, fn, step):
+        if time.monotonic() < self._retry_after.get(step, 0):
+            print(f"⏭️ ML {step} skipped: last attempt failed, retrying in "
+                  f"{self._retry_after[step] - time.monotonic():.0f}s")
+            return False
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=1, initializer=_warm_worker)
+        try:
+            with metrics.timer("ml_scheduler_step_seconds", "Wall time of scheduled ML steps", {"step": step}):
+                self.pool.submit(fn).result()
+            metrics.counter("ml_scheduler_runs_total", "Scheduled ML steps executed", {"step": step}).inc()
+            return True
+        except BrokenProcessPool:
+            print(f"❌ ML worker died during {step}; restarting it next cycle.")
+            self.pool = None
+        except Exception as e:
+            print(f"❌ ML {step} failed: {e}")
+        self._retry_after[step] = time.monotonic() + RETRY_SECONDS
+        return False
+
+    def _model_mtime(self):
+        try:
+            return os.stat(MODEL_PATH).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def run_once(self, now=None):
+        now = now or datetime.now(IST)
+        session = last_session_date(now).isoformat()
+        train, predict = self.state["train"], self.state["predict"]
+        mark, new_rows = scan_sentiment(train["sentiment_mark"])
+
+        model_mtime = self._model_mtime()
+        model_age = time.time() - model_mtime / 1e9 if model_mtime else None
+        train_reasons = []
+        if not model_mtime:
+            train_reasons.append("no trained model")
+        if session != train["session"]:
+            train_reasons.append(f"new price session {session}")
+        if new_rows >= MIN_NEW_SENTIMENT_ROWS:
+            train_reasons.append(f"{new_rows} new sentiment rows")
+        elif new_rows and model_age is not None and model_age > MAX_MODEL_AGE_SECONDS:
+            train_reasons.append(f"model is {model_age / 3600:.1f}h old with {new_rows} new sentiment rows")
+
+        if train_reasons:
+            print(f"\n🧠 Training ({'; '.join(train_reasons)})")
+            if self._submit(_run_training, "train"):
+                train.update(sentiment_mark=mark, session=session)
+                save_state(self.state)
+            model_mtime = self._model_mtime()
+
+        predict_reasons = []
+        if model_mtime and model_mtime != predict["model_mtime"]:
+            predict_reasons.append("model updated")
+        if mark > predict["sentiment_mark"]:
+            predict_reasons.append("new sentiment")
+        if session != predict["session"]:
+            predict_reasons.append(f"new price session {session}")
+        if market_is_open(now) and time.time() - predict["at"] >= PRICE_REFRESH_SECONDS:
+            predict_reasons.append("intraday price refresh")
+
+        if predict_reasons and model_mtime:
+            print(f"🔮 Predicting ({'; '.join(predict_reasons)})")
+            if self._submit(_run_prediction, "predict"):
+                predict.update(sentiment_mark=mark, session=session, model_mtime=model_mtime, at=time.time())
+                save_state(self.state)
+
+        if not train_reasons and not predict_reasons:
+            reason = (f"{new_rows} new sentiment rows (< {MIN_NEW_SENTIMENT_ROWS}), "
+                      f"session {session} already processed, market {'open' if market_is_open(now) else 'closed'}")
+            metrics.counter("ml_scheduler_skips_total", "Scheduler checks with nothing to do").inc()
+            # Log only when the reason changes so an idle system stays quiet
+            if reason != self._last_skip:
+                print(f"⏭️ ML cycle skipped: {reason}")
+                self._last_skip = reason
+        else:
+            self._last_skip = None
+
+    def run_forever(self):
+        print(f"⏳ ML Scheduler watching data watermarks every {self.poll_seconds}s...")
+        metrics.start_flusher("ml_scheduler")
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"❌ ML Scheduler Error: {e}")
+            time.sleep(self.poll_seconds)
+
+
+if __name__ == "__main__":
+    MLScheduler().run_forever()
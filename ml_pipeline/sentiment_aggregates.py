@@ -0,0 +1,108 @@
+import os
+import json
+import pandas as pd
+import pyarrow.parquet as pq
+
+from processing.parquet_store import list_partitions, partition_files
+
+# Daily per-stock sentiment from the streaming Parquet output, for training.
+#
+# Only the partitions inside the training window are visited, and only the
+# stock / score / cluster columns are read, one row group at a time. Each
+# partition's aggregate is cached with the part files it was built from, so a
+# retrain only reads partitions that gained (or lost) files since the last one.
+# Means count each near-duplicate story once, as processing/near_dup.cluster_mean does.
+
+# --- CONFIGURATION ---
+CACHE_DIR = os.path.join(os.getcwd(), "data", "cache")
+
+
+def _fingerprint(files):
+    out = []
+    for path in files:
+        st = os.stat(path)
+        out.append([os.path.basename(path), st.st_size, st.st_mtime_ns])
+    return out
+
+
+def aggregate_partition(files, symbol_column="stock_tag"):
+    """[(stock, mean sentiment, stories)] for one date partition, streamed by row group."""
+    clustered = {}  # (stock, cluster id) -> [sum, count]
+    singles = {}    # stock -> [sum, count] for rows written before clustering existed
+    for path in files:
+        parquet = pq.ParquetFile(path)
+        names = set(parquet.schema_arrow.names)
+        if symbol_column not in names or "sentiment_score" not in names:
+            continue
+        columns = [symbol_column, "sentiment_score"] + (["cluster_id"] if "cluster_id" in names else [])
+        for batch in parquet.iter_batches(columns=columns):
+            part = batch.to_pandas()
+            part = part[part[symbol_column].notna() & part["sentiment_score"].notna()]
+            if "cluster_id" in part.columns:
+                has_cluster = part["cluster_id"].notna()
+                grouped = part[has_cluster].groupby([symbol_column, "cluster_id"])["sentiment_score"].agg(["sum", "count"])
+                for key, (total, count) in zip(grouped.index, grouped.to_numpy()):
+                    acc = clustered.setdefault(key, [0.0, 0])
+                    acc[0] += total
+                    acc[1] += count
+                part = part[~has_cluster]
+            grouped = part.groupby(symbol_column)["sentiment_score"].agg(["sum", "count"])
+            for stock, (total, count) in zip(grouped.index, grouped.to_numpy()):
+                acc = singles.setdefault(stock, [0.0, 0])
+                acc[0] += total
+                acc[1] += count
+
+    # Each cluster contributes its own mean once; each unclustered row is a cluster of one
+    per_stock = {stock: [total, count] for stock, (total, count) in singles.items()}
+    for (stock, _), (total, count) in clustered.items():
+        acc = per_stock.setdefault(stock, [0.0, 0])
+        acc[0] += total / count
+        acc[1] += 1
+    return [(stock, total / stories, stories) for stock, (total, stories) in per_stock.items()]
+
+
+def daily_sentiment(root, start=None, end=None, cache_name=None, symbol_column="stock_tag"):
+    """
+    DataFrame[date, stock, sentiment, stories] for partitions of `root` in
+    [start, end]. With `cache_name`, per-partition aggregates are kept in
+    data/cache/<cache_name>.parquet (+ .json manifest) and reused while a
+    partition's part files are unchanged; partitions outside the window are dropped.
+    """
+    manifest_path = os.path.join(CACHE_DIR, f"{cache_name}.json") if cache_name else None
+    table_path = os.path.join(CACHE_DIR, f"{cache_name}.parquet") if cache_name else None
+    manifest, cached = {}, pd.DataFrame(columns=["date", "stock", "sentiment", "stories"])
+    if manifest_path and os.path.exists(manifest_path) and os.path.exists(table_path):
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            cached = pd.read_parquet(table_path)
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable sentiment cache: {e}")
+            manifest = {}
+
+    frames, new_manifest, rebuilt = [], {}, 0
+    for date, path in list_partitions(root, start, end, newest_first=False):
+        files = partition_files(path)
+        if not files:
+            continue
+        fingerprint = _fingerprint(files)
+        new_manifest[date] = fingerprint
+        if manifest.get(date) == fingerprint:
+            continue
+        rebuilt += 1
+        rows = aggregate_partition(files, symbol_column)
+        frames.append(pd.DataFrame([(date, *row) for row in rows], columns=["date", "stock", "sentiment", "stories"]))
+
+    reused = cached[cached["date"].isin([d for d in new_manifest if manifest.get(d) == new_manifest[d]])]
+    result = pd.concat([reused] + frames, ignore_index=True) if frames else reused.reset_index(drop=True)
+    result = result.astype({"date": str, "stock": str, "sentiment": "float64", "stories": "int64"})
+    print(f"📊 Sentiment aggregates: {len(new_manifest)} partitions in window, {rebuilt} read from Parquet.")
+
+    if manifest_path and (rebuilt or set(manifest) != set(new_manifest)):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        result.to_parquet(table_path + ".tmp", index=False)
+        os.replace(table_path + ".tmp", table_path)
+        with open(manifest_path + ".tmp", "w") as f:
+            json.dump(new_manifest, f)
+        os.replace(manifest_path + ".tmp", manifest_path)
+    return result
@@ -4,7 +4,6 @@ import os
 # --- FIX: Add project root to path ---
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-import glob
 import pandas as pd
 import numpy as np
 import xgboost as xgb
@@ -13,6 +12,9 @@ from datetime import datetime, timedelta
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
 import joblib
+from monitoring import metrics
+from ingestion.symbols import tickers
+from ml_pipeline.sentiment_aggregates import daily_sentiment
 
 # --- CONFIGURATION ---
 BASE_PATH = os.path.join(os.getcwd(), "data")
@@ -20,28 +22,13 @@ MC_PATH = os.path.join(BASE_PATH, "processed_moneycontrol")
 NEWS_PATH = os.path.join(BASE_PATH, "processed_news")
 MODELS_DIR = os.path.join(os.getcwd(), "models")
 
-# UPDATED STOCK LIST (Replaced TATAMOTORS.NS with SBIN.NS)
-STOCKS = ["RELIANCE.NS", "TCS.NS", "INFY.NS", "HDFCBANK.NS", "ICICIBANK.NS", 
-          "SBIN.NS", "AXISBANK.NS", "HCLTECH.NS", "BHARTIARTL.NS", "WIPRO.NS"]
-
-def load_parquet_data(path):
-    """Loads parquet data from the directory if it exists."""
-    try:
-        files = glob.glob(os.path.join(path, "**/*.parquet"), recursive=True)
-        if not files:
-            return pd.DataFrame()
-        
-        df_list = [pd.read_parquet(f) for f in files]
-        full_df = pd.concat(df_list, ignore_index=True)
-        return full_df
-    except Exception as e:
-        print(f"⚠️ Could not load data from {path}: {e}")
-        return pd.DataFrame()
+STOCKS = tickers()
+TRAINING_DAYS = 730
 
 def download_stock_prices():
     """Downloads last 2 years of stock prices."""
     print("📉 Downloading historical stock prices...")
-    start_date = (datetime.now() - timedelta(days=730)).strftime('%Y-%m-%d')
+    start_date = (datetime.now() - timedelta(days=TRAINING_DAYS)).strftime('%Y-%m-%d')
     end_date = datetime.now().strftime('%Y-%m-%d')
     
     all_data = []
@@ -92,15 +79,23 @@ def generate_synthetic_data():
     return pd.DataFrame(data)
 
 def train_pipeline():
+    try:
+        with metrics.timer("ml_training_seconds", "Wall time of train_pipeline"):
+            _run_training()
+    finally:
+        metrics.flush("train_model")
+
+def _run_training():
     print("🚀 Starting ML Training Pipeline...")
     
-    mc_df = load_parquet_data(MC_PATH)
+    # Daily means from the partitions in the training window only; unchanged partitions come from data/cache
+    # (each near-duplicate story counts once, however many outlets carried it)
+    window_start = (datetime.now() - timedelta(days=TRAINING_DAYS)).strftime('%Y-%m-%d')
+    mc_agg = daily_sentiment(MC_PATH, start=window_start, cache_name="mc_daily_sentiment")
     sentiment_df = pd.DataFrame()
-    
-    if not mc_df.empty and 'date' in mc_df.columns:
-         mc_agg = mc_df.groupby(['date', 'stock_tag'])['sentiment_score'].mean().reset_index()
-         mc_agg.rename(columns={'stock_tag': 'stock', 'sentiment_score': 'mc_sentiment'}, inplace=True)
-         sentiment_df = mc_agg
+
+    if not mc_agg.empty:
+         sentiment_df = mc_agg[['date', 'stock', 'sentiment']].rename(columns={'sentiment': 'mc_sentiment'})
 
     prices_df = download_stock_prices()
     
@@ -149,6 +144,8 @@ def train_pipeline():
     preds = model.predict(X_test)
     acc = accuracy_score(y_test, preds)
     print(f"✅ Model Trained. Accuracy: {acc:.4f}")
+    metrics.gauge("ml_model_accuracy", "Hold-out accuracy of the last trained model").set(acc)
+    metrics.gauge("ml_training_rows", "Rows in the last training set").set(len(final_df))
     
     if not os.path.exists(MODELS_DIR):
         os.makedirs(MODELS_DIR)
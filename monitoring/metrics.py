@@ -0,0 +1,205 @@
+import os
+import json
+import time
+import atexit
+import bisect
+import threading
+import contextlib
+
+# --- CONFIGURATION ---
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Batch jobs and background workers drop JSON snapshots here; the backend aggregates them
+METRICS_DIR = os.getenv("METRICS_DIR", os.path.join(ROOT_DIR, "data", "metrics"))
+
+# Seconds; covers sub-millisecond API hits through multi-minute training runs
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900)
+
+
+class Counter:
+    __slots__ = ("_lock", "value")
+    kind = "counter"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self):
+        return {"value": self.value}
+
+
+class Gauge(Counter):
+    __slots__ = ()
+    kind = "gauge"
+
+    def set(self, value):
+        self.value = float(value)
+
+
+class Histogram:
+    __slots__ = ("_lock", "buckets", "counts", "sum", "count")
+    kind = "histogram"
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self._lock = threading.Lock()
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {"buckets": list(self.buckets), "counts": list(self.counts), "sum": self.sum, "count": self.count}
+
+
+class Registry:
+    """
+    Process-local metric store. Series are keyed by (name, sorted labels);
+    lookups after the first are a dict hit, and updates take one small lock,
+    so instrumentation is cheap enough to leave on everywhere.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}  # (name, labels tuple) -> metric
+        self._help = {}
+
+    def _get(self, cls, name, help_text, labels, **kwargs):
+        key = (name, tuple(sorted(labels.items())) if labels else ())
+        metric = self._series.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._series.get(key)
+                if metric is None:
+                    metric = cls(**kwargs)
+                    self._series[key] = metric
+                    self._help.setdefault(name, help_text)
+        return metric
+
+    def counter(self, name, help_text="", labels=None):
+        return self._get(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text="", labels=None):
+        return self._get(Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text="", labels=None, buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, help_text, labels, buckets=buckets)
+
+    @contextlib.contextmanager
+    def timer(self, name, help_text="", labels=None):
+        """Observes the wall time of the block (seconds) into a histogram."""
+        histogram = self.histogram(name, help_text, labels)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            histogram.observe(time.perf_counter() - start)
+
+    def snapshot(self):
+        return [
+            {"name": name, "type": metric.kind, "help": self._help.get(name, ""),
+             "labels": dict(labels), **metric.snapshot()}
+            for (name, labels), metric in list(self._series.items())
+        ]
+
+    def flush(self, job):
+        """Atomically writes this process's metrics to METRICS_DIR/<job>.json."""
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        path = os.path.join(METRICS_DIR, f"{job}.json")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"job": job, "pid": os.getpid(), "updated": time.time(), "metrics": self.snapshot()}, f)
+        os.replace(tmp_path, path)
+
+    def start_flusher(self, job, interval=15):
+        """Flushes every `interval` seconds from a daemon thread and once more at exit."""
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.flush(job)
+                except Exception as e:
+                    print(f"⚠️ Metrics flush failed: {e}")
+
+        threading.Thread(target=loop, daemon=True, name=f"metrics-{job}").start()
+        atexit.register(self.flush, job)
+
+
+REGISTRY = Registry()
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+timer = REGISTRY.timer
+flush = REGISTRY.flush
+start_flusher = REGISTRY.start_flusher
+
+
+# --- PROMETHEUS EXPOSITION ---
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items())) + "}"
+
+def _format_value(value):
+    return repr(float(value)) if value != float("inf") else "+Inf"
+
+def render_prometheus(series):
+    """Renders snapshot dicts (see Registry.snapshot) in the Prometheus text format."""
+    by_name = {}
+    for s in series:
+        by_name.setdefault(s["name"], []).append(s)
+
+    lines = []
+    for name in sorted(by_name):
+        family = by_name[name]
+        lines.append(f"# HELP {name} {family[0]['help']}")
+        lines.append(f"# TYPE {name} {family[0]['type']}")
+        for s in family:
+            labels = s["labels"]
+            if s["type"] == "histogram":
+                cumulative = 0
+                for bound, count in zip(list(s["buckets"]) + [float("inf")], s["counts"]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(s['sum'])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {s['count']}")
+            else:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(s['value'])}")
+    return "\n".join(lines) + "\n"
+
+
+def collect_snapshots():
+    """Series from every job snapshot in METRICS_DIR, labelled with their job, plus snapshot age."""
+    series = []
+    now = time.time()
+    try:
+        names = [n for n in os.listdir(METRICS_DIR) if n.endswith(".json")]
+    except FileNotFoundError:
+        return series
+    for name in names:
+        try:
+            with open(os.path.join(METRICS_DIR, name)) as f:
+                snap = json.load(f)
+        except Exception:
+            continue
+        job = snap.get("job", name[:-5])
+        for s in snap.get("metrics", []):
+            series.append({**s, "labels": {**s["labels"], "job": job}})
+        series.append({"name": "metrics_snapshot_age_seconds", "type": "gauge",
+                       "help": "Seconds since the job last flushed its metrics",
+                       "labels": {"job": job}, "value": now - snap.get("updated", now)})
+    return series
@@ -0,0 +1,290 @@
+import os
+import sys
+
+# --- FIX: Add project root to path ---
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import json
+import glob
+import gzip
+import time
+import argparse
+import importlib
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import zstandard
+except ImportError:  # gzip keeps the archive working without it, at a worse ratio
+    zstandard = None
+
+# Processed staging records are packed into compressed, append-only JSONL
+# segments instead of one archived JSON file per record:
+#
+#   data/archive/<source>/<YYYY-MM-DD>/seg-00000.jsonl.zst
+#   data/archive/index.json    one entry per segment: source, day, records, event-time range, bytes
+#
+# Each processed batch appends one compressed frame (zstd and gzip both allow
+# concatenated frames), fsyncs it, then records the new length in the index.
+# Readers stop at the indexed length, so a frame being written is never seen,
+# and a frame left behind by a crash before the index update is cut off by the
+# next append.
+
+# --- CONFIGURATION ---
+ARCHIVE_PATH = os.path.join(os.getcwd(), "data", "archive")
+REPLAY_PATH = os.path.join(os.getcwd(), "data", "replay")
+SEGMENT_EXT = ".jsonl.zst" if zstandard else ".jsonl.gz"
+SEGMENT_MAX_BYTES = 64 * 2**20
+REPLAY_CHUNK_ROWS = 20_000  # rows a replay worker buffers before writing them out
+COMPRESSION_LEVEL = 6
+DEFAULT_SCORER = "processing.records:get_sentiment"
+SOURCES = ("moneycontrol", "news")
+
+
+def _compress(payload):
+    if zstandard:
+        return zstandard.ZstdCompressor(level=COMPRESSION_LEVEL).compress(payload)
+    return gzip.compress(payload, compresslevel=COMPRESSION_LEVEL)
+
+
+class _Prefix(io.RawIOBase):
+    """Read-only view of the first `limit` bytes of `f` (the indexed length of a segment)."""
+
+    def __init__(self, f, limit):
+        self.f, self.left = f, limit
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self.left)
+        if size <= 0:
+            return 0
+        n = self.f.readinto(memoryview(buffer)[:size])
+        self.left -= n
+        return n
+
+
+def _open_decompressed(f, limit, path):
+    """Binary stream over the decompressed frames in the first `limit` bytes of `f`."""
+    raw = _Prefix(f, limit)
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"{path} needs the 'zstandard' package")
+        return zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+    return gzip.GzipFile(fileobj=raw, mode="rb")
+
+
+class SegmentArchive:
+    """Single-writer archive of raw staging records, bucketed by source and event day."""
+
+    def __init__(self, root=ARCHIVE_PATH):
+        self.root = root
+        self.index_path = os.path.join(root, "index.json")
+        self.segments = load_index(root)
+
+    def _segment_for(self, source, day):
+        for entry in reversed(self.segments):
+            if entry["source"] == source and entry["day"] == day:
+                if entry["bytes"] < SEGMENT_MAX_BYTES:
+                    return entry
+                break
+        seq = sum(1 for e in self.segments if e["source"] == source and e["day"] == day)
+        entry = {"source": source, "day": day, "path": f"{source}/{day}/seg-{seq:05d}{SEGMENT_EXT}",
+                 "records": 0, "bytes": 0, "min_ts": None, "max_ts": None}
+        self.segments.append(entry)
+        return entry
+
+    def append(self, source, records):
+        """`records`: iterable of (day 'YYYY-MM-DD', event ts, raw record dict)."""
+        by_day = {}
+        for day, ts, record in records:
+            by_day.setdefault(day, []).append((ts, record))
+        if not by_day:
+            return
+
+        for day, items in sorted(by_day.items()):
+            entry = self._segment_for(source, day)
+            path = os.path.join(self.root, entry["path"])
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            frame = _compress("".join(json.dumps(r, default=str) + "\n" for _, r in items).encode("utf-8"))
+            with open(path, "ab") as f:
+                f.truncate(entry["bytes"])  # drop a frame orphaned by a crash before its index update
+                f.write(frame)
+                f.flush()
+                os.fsync(f.fileno())
+            stamps = [ts for ts, _ in items]
+            entry["records"] += len(items)
+            entry["bytes"] += len(frame)
+            entry["min_ts"] = min(stamps + ([entry["min_ts"]] if entry["min_ts"] is not None else []))
+            entry["max_ts"] = max(stamps + ([entry["max_ts"]] if entry["max_ts"] is not None else []))
+        self._save_index()
+
+    def snapshot(self, source, days):
+        """Index state of the (source, day) buckets a batch is about to append to, for rollback()."""
+        days = sorted(set(days))
+        return {"source": source, "days": days,
+                "segments": [dict(e) for e in self.segments if e["source"] == source and e["day"] in days]}
+
+    def rollback(self, snapshot):
+        """Restores the buckets in `snapshot`: later frames are cut off and segments it didn't know are removed."""
+        source, days = snapshot["source"], set(snapshot["days"])
+        known = {e["path"]: e for e in snapshot["segments"]}
+        for entry in self.segments:
+            if entry["source"] != source or entry["day"] not in days:
+                continue
+            path = os.path.join(self.root, entry["path"])
+            try:
+                if entry["path"] in known:
+                    with open(path, "r+b") as f:
+                        f.truncate(known[entry["path"]]["bytes"])
+                else:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
+        self.segments = [e for e in self.segments if e["source"] != source or e["day"] not in days] \
+            + sorted(known.values(), key=lambda e: e["path"])
+        self._save_index()
+
+    def _save_index(self):
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"segments": self.segments}, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.index_path)
+
+
+def load_index(root=ARCHIVE_PATH):
+    try:
+        with open(os.path.join(root, "index.json")) as f:
+            return json.load(f)["segments"]
+    except FileNotFoundError:
+        return []
+
+
+def select_segments(segments, sources=SOURCES, start=None, end=None):
+    """Index entries for `sources` whose day falls in [start, end] (inclusive 'YYYY-MM-DD' strings)."""
+    return [e for e in segments
+            if e["source"] in sources and e["records"]
+            and (start is None or e["day"] >= start) and (end is None or e["day"] <= end)]
+
+
+def read_segment(entry, root=ARCHIVE_PATH):
+    """Yields the records of a segment, decompressing it a block at a time."""
+    path = os.path.join(root, entry["path"])
+    with open(path, "rb") as f:
+        stream = _open_decompressed(f, entry["bytes"], path)
+        for line in io.TextIOWrapper(io.BufferedReader(stream), encoding="utf-8"):
+            if line.strip():
+                yield json.loads(line)
+
+
+# --- REPLAY ---
+
+def load_scorer(spec):
+    """'package.module:function' -> the text -> score callable."""
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def _replay_segment(job):
+    entry, root, output_root, scorer_spec = job
+    from ingestion.entity_tagger import registry_tagger
+    from processing.near_dup import NearDupIndex
+    from processing import records
+
+    scorer = load_scorer(scorer_spec)
+    tagger, near_dups = registry_tagger(), NearDupIndex()
+    output_dir = os.path.join(output_root, f"processed_{entry['source']}")
+    rows, written = [], 0
+    for record in read_segment(entry, root):
+        _, _, record_rows = records.prepare_record(record, entry["source"], tagger, near_dups, scorer)
+        rows.extend(record_rows)
+        if len(rows) >= REPLAY_CHUNK_ROWS:
+            records.write_partitions(rows, output_dir)
+            written, rows = written + len(rows), []
+    records.write_partitions(rows, output_dir)
+    return entry["records"], written + len(rows)
+
+
+def replay(start=None, end=None, sources=SOURCES, workers=None, scorer=DEFAULT_SCORER,
+           root=ARCHIVE_PATH, output_root=REPLAY_PATH):
+    """
+    Re-runs archived records from [start, end] through tagging, clustering,
+    sentiment and the Parquet writer, one segment per task across `workers`
+    processes. Output lands in <output_root>/processed_<source>, laid out like
+    the live folders, so a backfill can be checked before it replaces them.
+    Near-duplicate clustering restarts per segment (one source-day).
+    """
+    segments = select_segments(load_index(root), sources, start, end)
+    if not segments:
+        print(f"⚠️ No archived segments for {', '.join(sources)} in [{start or '…'}, {end or '…'}]")
+        return 0
+    total = sum(e["records"] for e in segments)
+    print(f"⏪ Replaying {total:,} records from {len(segments)} segments with {workers or os.cpu_count()} workers...")
+
+    started = time.perf_counter()
+    replayed = written = 0
+    jobs = [(e, root, output_root, scorer) for e in sorted(segments, key=lambda e: -e["bytes"])]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for records, rows in pool.map(_replay_segment, jobs):
+            replayed += records
+            written += rows
+    elapsed = time.perf_counter() - started
+    print(f"✅ Replayed {replayed:,} records ({written:,} rows) in {elapsed:.1f}s "
+          f"({replayed / max(elapsed, 1e-9):,.0f} records/s) into {output_root}")
+    return replayed
+
+
+def pack_loose_files(root=ARCHIVE_PATH, batch=5000):
+    """
+    Moves pre-segment archives (one JSON file per record under <root>/<source>/)
+    into segments. Run it with the stream processor stopped: the archive has one writer.
+    """
+    from processing.records import event_time
+    archive = SegmentArchive(root)
+    for source in SOURCES:
+        files = sorted(glob.glob(os.path.join(root, source, "*.json")))
+        for i in range(0, len(files), batch):
+            chunk, records = files[i:i + batch], []
+            for path in chunk:
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        record = json.load(f)
+                except Exception as e:
+                    print(f"⚠️ Skipping unreadable {path}: {e}")
+                    continue
+                day, ts = event_time(record, source)
+                records.append((day, ts, record))
+            archive.append(source, records)
+            for path in chunk:
+                os.remove(path)
+        if files:
+            print(f"📦 Packed {len(files):,} {source} files into segments")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Segment archive of processed staging records.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rp = commands.add_parser("replay", help="Re-score an archived time range into Parquet.")
+    rp.add_argument("--from", dest="start", default=None, help="First day, YYYY-MM-DD (inclusive).")
+    rp.add_argument("--to", dest="end", default=None, help="Last day, YYYY-MM-DD (inclusive).")
+    rp.add_argument("--source", action="append", choices=SOURCES, help="Repeatable; default both.")
+    rp.add_argument("--workers", type=int, default=None, help="Processes (default: all cores).")
+    rp.add_argument("--scorer", default=DEFAULT_SCORER, help="Sentiment function as module:function.")
+    rp.add_argument("--output", default=REPLAY_PATH, help="Root for processed_<source> output folders.")
+
+    commands.add_parser("pack", help="Move one-file-per-record archives into segments.")
+    args = parser.parse_args()
+
+    if args.command == "replay":
+        replay(args.start, args.end, tuple(args.source or SOURCES), args.workers, args.scorer,
+               output_root=args.output)
+    else:
+        pack_loose_files()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import os
+import json
+
+# Write-ahead log of the stream processor's batches, one file per source:
+#
+#   {"op": "begin",  "batch": 7, "inputs": [...staging files], "outputs": [...part files], "archive": {...}}
+#   {"op": "commit", "batch": 7}
+#
+# A batch logs (and fsyncs) what it is about to consume and produce before it
+# writes anything, and is committed by a single fsynced line once the part
+# files and archive frames are durable. Staging files are deleted only after
+# the commit. On restart, recover() settles the last batch from the log alone:
+#
+#   - begun but not committed: its part files are deleted and the archive is
+#     rolled back, so the untouched staging files are processed exactly once;
+#   - committed: any of its staging files still present are deleted.
+#
+# The log is compacted to a single checkpoint line every COMPACT_EVERY batches.
+
+# --- CONFIGURATION ---
+COMPACT_EVERY = 500
+
+
+def _fsync_dir(path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class BatchLog:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.next_batch = 1
+        self.open_batch = None    # begin entry of a batch that never committed
+        self.committed = []       # begin entries committed since the last checkpoint line
+        self.stuck = set()        # consumed staging files that could not be deleted
+        self._entries = 0
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as f:
+                lines = f.read().split(b"\n")
+        except FileNotFoundError:
+            return
+        begun = {}
+        valid_bytes = 0
+        for raw in lines:
+            if not raw.strip():
+                valid_bytes += len(raw) + 1
+                continue
+            try:
+                entry = json.loads(raw)
+            except ValueError:
+                break  # torn final write: everything after it is discarded below
+            valid_bytes += len(raw) + 1
+            self._entries += 1
+            op = entry["op"]
+            if op == "checkpoint":
+                self.next_batch = entry["next_batch"]
+            elif op == "begin":
+                begun[entry["batch"]] = entry
+                self.next_batch = max(self.next_batch, entry["batch"] + 1)
+                self.open_batch = entry
+            elif op == "commit":
+                if entry["batch"] in begun:
+                    self.committed.append(begun.pop(entry["batch"]))
+                self.open_batch = None
+            elif op == "abort":
+                begun.pop(entry["batch"], None)
+                self.open_batch = None
+        size = os.path.getsize(self.path)
+        if valid_bytes < size:
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_bytes)
+
+    def _append(self, entry):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._entries += 1
+
+    def begin(self, inputs, outputs, archive_snapshot=None):
+        """Logs a batch's inputs and planned outputs; returns its batch id."""
+        if self.open_batch is not None:
+            raise RuntimeError(f"batch {self.open_batch['batch']} is still open; call recover() first")
+        entry = {"op": "begin", "batch": self.next_batch, "inputs": list(inputs),
+                 "outputs": list(outputs), "archive": archive_snapshot}
+        self._append(entry)
+        self.next_batch += 1
+        self.open_batch = entry
+        return entry["batch"]
+
+    def commit(self, batch):
+        for directory in {os.path.dirname(p) for p in self.open_batch["outputs"]}:
+            _fsync_dir(directory)  # the part files' renames are durable before the commit is
+        self._append({"op": "commit", "batch": batch})
+        self.committed.append(self.open_batch)
+        self.open_batch = None
+
+    def finish(self, consumed):
+        """
+        Deletes committed staging files. Files that can't be deleted are kept in
+        `stuck` (callers skip them when scanning) and the log is not compacted
+        past them, so a restart retries the delete instead of reprocessing them.
+        """
+        for path in consumed:
+            try:
+                os.remove(path)
+                self.stuck.discard(path)
+            except FileNotFoundError:
+                self.stuck.discard(path)
+            except OSError as e:
+                print(f"⚠️ Could not remove consumed staging file {path}: {e}")
+                self.stuck.add(path)
+        if not self.stuck and self._entries >= COMPACT_EVERY:
+            self.compact()
+
+    def recover(self, rollback_archive=None):
+        """Settles the batch in flight at the last shutdown. Returns 'rolled_back', 'rolled_forward' or None."""
+        outcome = None
+        if self.open_batch is not None:
+            batch = self.open_batch
+            for path in batch["outputs"]:
+                for leftover in (path, path + ".tmp"):
+                    try:
+                        os.remove(leftover)
+                    except FileNotFoundError:
+                        pass
+            if rollback_archive is not None and batch.get("archive"):
+                rollback_archive(batch["archive"])
+            self._append({"op": "abort", "batch": batch["batch"]})
+            self.open_batch = None
+            outcome = "rolled_back"
+            print(f"↩️ Rolled back uncommitted batch {batch['batch']} ({len(batch['inputs'])} staging files kept)")
+        leftover = [p for batch in self.committed for p in batch["inputs"] if os.path.exists(p)]
+        if leftover:
+            self.finish(leftover)
+            outcome = outcome or "rolled_forward"
+            print(f"⏩ Removed {len(leftover)} staging files left behind by committed batches")
+        if not self.stuck:
+            self.compact()
+        return outcome
+
+    def compact(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"op": "checkpoint", "next_batch": self.next_batch}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._entries = 1
+        self.committed = []
@@ -0,0 +1,165 @@
+import os
+import re
+import zlib
+import hashlib
+from collections import deque
+import numpy as np
+import pandas as pd
+
+# Streaming near-duplicate detection for headlines. The same story arrives from
+# MoneyControl and from several NewsAPI outlets with slightly different wording;
+# clustering the copies lets the processor score a story once and lets the
+# sentiment aggregations count it once.
+#
+# Text -> character shingles -> MinHash signature -> LSH bands. Records sharing
+# a band are candidates; a candidate joins the cluster when the signatures
+# agree on at least SIMILARITY_THRESHOLD of their positions (estimated Jaccard).
+# The index only remembers WINDOW_SECONDS of event time and at most MAX_ENTRIES
+# records, so memory stays flat however long the processor runs.
+
+# --- CONFIGURATION ---
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+BANDS = 16  # 4 rows per band: pairs above ~0.5 Jaccard almost always share a band
+SIMILARITY_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.6"))
+WINDOW_SECONDS = float(os.getenv("NEAR_DUP_WINDOW_HOURS", "48")) * 3600
+MAX_ENTRIES = int(os.getenv("NEAR_DUP_MAX_ENTRIES", "200000"))
+
+ROWS = NUM_PERM // BANDS
+# Multiply-shift hash family; fixed seed so signatures are comparable across runs
+_params = np.random.default_rng(0x5EED)
+_A = _params.integers(1, 2**63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _params.integers(0, 2**63, NUM_PERM, dtype=np.uint64)
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text):
+    return _NON_WORD.sub(" ", (text or "").lower()).strip()
+
+
+def signature(text):
+    """MinHash signature (uint64[NUM_PERM]) of the normalized text, or None if it has no words."""
+    norm = normalize(text)
+    if not norm:
+        return None
+    shingles = {norm[i:i + SHINGLE_SIZE] for i in range(max(1, len(norm) - SHINGLE_SIZE + 1))}
+    hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+    return ((hashes[:, None] * _A + _B) >> np.uint64(32)).min(axis=0)
+
+
+def cluster_key(text):
+    return hashlib.blake2b(normalize(text).encode(), digest_size=8).hexdigest()
+
+
+class NearDupIndex:
+    """Bounded, time-expiring LSH index mapping headlines to clusters."""
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, window_seconds=WINDOW_SECONDS, max_entries=MAX_ENTRIES):
+        self.threshold = threshold
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self._bands = [{} for _ in range(BANDS)]  # band -> {band bytes: entry id}
+        self._entries = {}  # entry id -> (signature, band keys, cluster id, payload)
+        self._order = deque()  # (event ts, entry id), insertion order
+        self._next_id = 0
+        self._horizon = float("-inf")  # newest event time seen
+        self._journal = None  # undo records since begin(), newest last
+
+    def __len__(self):
+        return len(self._entries)
+
+    def begin(self):
+        """Starts journaling changes, so rollback() can undo every cluster() call until commit()."""
+        self._journal = [("start", self._next_id, self._horizon)]
+
+    def commit(self):
+        self._journal = None
+
+    def rollback(self):
+        """Restores the index to its state at begin(), e.g. for a batch that will be retried."""
+        journal, self._journal = self._journal or [], None
+        for op in reversed(journal):
+            if op[0] == "add":
+                _, entry_id, previous = op
+                _, keys, _, _ = self._entries.pop(entry_id)
+                self._order.pop()
+                for band, key, prev in zip(self._bands, keys, previous):
+                    if band.get(key) == entry_id:
+                        if prev is None:
+                            del band[key]
+                        else:
+                            band[key] = prev
+            elif op[0] == "expire":
+                _, ts, entry_id, entry, owned = op
+                self._entries[entry_id] = entry
+                self._order.appendleft((ts, entry_id))
+                for band, key, own in zip(self._bands, entry[1], owned):
+                    if own:
+                        band[key] = entry_id
+            else:
+                _, self._next_id, self._horizon = op
+
+    def _expire(self):
+        cutoff = self._horizon - self.window_seconds
+        while self._order and (self._order[0][0] < cutoff or len(self._entries) > self.max_entries):
+            ts, entry_id = self._order.popleft()
+            entry = self._entries.pop(entry_id)
+            owned = [band.get(key) == entry_id for band, key in zip(self._bands, entry[1])]
+            for band, key, own in zip(self._bands, entry[1], owned):
+                if own:
+                    del band[key]
+            if self._journal is not None:
+                self._journal.append(("expire", ts, entry_id, entry, owned))
+
+    def _match(self, sig, keys):
+        best, best_score = None, self.threshold
+        for entry_id in {band[key] for band, key in zip(self._bands, keys) if key in band}:
+            entry = self._entries[entry_id]
+            score = float(np.count_nonzero(entry[0] == sig)) / NUM_PERM
+            if score >= best_score:
+                best, best_score = entry, score
+        return best
+
+    def cluster(self, text, ts, compute):
+        """
+        (cluster id, payload, is_duplicate) for a record with event time `ts`
+        (seconds). `compute(text)` runs only for the first record of a cluster;
+        later members get that representative's payload back.
+        """
+        sig = signature(text)
+        if sig is None:
+            return None, compute(text), False
+        self._horizon = max(self._horizon, ts)
+        self._expire()
+
+        keys = [sig[i * ROWS:(i + 1) * ROWS].tobytes() for i in range(BANDS)]
+        match = self._match(sig, keys)
+        if match is not None:
+            cluster_id, payload = match[2], match[3]
+        else:
+            cluster_id, payload = cluster_key(text), compute(text)
+
+        # Members are indexed too, so a story whose wording drifts still finds its cluster
+        entry_id = self._next_id
+        self._next_id += 1
+        if self._journal is not None:
+            self._journal.append(("add", entry_id, [band.get(key) for band, key in zip(self._bands, keys)]))
+        self._entries[entry_id] = (sig, keys, cluster_id, payload)
+        self._order.append((ts, entry_id))
+        for band, key in zip(self._bands, keys):
+            band[key] = entry_id
+        return cluster_id, payload, match is not None
+
+
+def cluster_mean(df, keys, value="sentiment_score"):
+    """
+    Mean of `value` per `keys` where each near-duplicate cluster counts once.
+    Rows without a cluster id (written before clustering existed) count as their own cluster.
+    """
+    clusters = pd.Series(np.arange(len(df)).astype(str), index=df.index)
+    if "cluster_id" in df.columns:
+        clusters = df["cluster_id"].astype(object).where(df["cluster_id"].notna(), "row-" + clusters)
+    per_cluster = df.assign(_cluster=clusters).groupby(list(keys) + ["_cluster"])[value].mean()
+    if not keys:
+        return per_cluster.mean()
+    return per_cluster.groupby(level=list(range(len(keys)))).mean().reset_index()
@@ -0,0 +1,40 @@
+import os
+
+# Helpers for the `date=YYYY-MM-DD` partitioned Parquet layout written by spark_streaming.py.
+# Partition values are ISO dates, so string comparison is date comparison.
+
+PARTITION_PREFIX = "date="
+
+
+def list_partitions(root, start=None, end=None, newest_first=True):
+    """Returns [(date, partition_dir)] for partitions with start <= date <= end (inclusive)."""
+    try:
+        entries = [e for e in os.scandir(root) if e.is_dir() and e.name.startswith(PARTITION_PREFIX)]
+    except FileNotFoundError:
+        return []
+
+    partitions = []
+    for entry in entries:
+        date = entry.name[len(PARTITION_PREFIX):]
+        if start is not None and date < start[:10]:
+            continue
+        if end is not None and date > end[:10]:
+            continue
+        partitions.append((date, entry.path))
+    return sorted(partitions, reverse=newest_first)
+
+
+def partition_files(partition_dir):
+    """Sorted Parquet part files inside one partition directory."""
+    try:
+        return sorted(e.path for e in os.scandir(partition_dir) if e.name.endswith(".parquet"))
+    except FileNotFoundError:
+        return []
+
+
+def list_files(root, start=None, end=None):
+    """All part files in the partitions overlapping [start, end], oldest partition first."""
+    files = []
+    for _, path in list_partitions(root, start, end, newest_first=False):
+        files.extend(partition_files(path))
+    return files
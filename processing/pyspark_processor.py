@@ -1,14 +1,17 @@
+import sys
 import os
-import polars as pl
-import shutil
 
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-CSV_INPUT = os.path.join(BASE_DIR, "data", "raw_stocks_10000.csv")
-OUTPUT_DIR = os.path.join(BASE_DIR, "data", "processed_data")
+# --- FIX: Add project root to path ---
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import polars as pl
+from monitoring import metrics
+from processing.stage_format import RAW_FILE, PROCESSED_FILE, PROCESSED_SCHEMA, write_stage
 
 def run_big_data_processing():
     print("🚀 Step 4: Big Data Processing...")
-    q = pl.scan_csv(CSV_INPUT)
+    # Arrow IPC input is memory-mapped; no CSV parsing or type inference
+    q = pl.scan_ipc(RAW_FILE)
     q = q.filter(pl.col("Volume") > 50000)
 
     q_transformed = q.with_columns([
@@ -20,13 +23,10 @@ def run_big_data_processing():
 
     df_final = q_transformed.sort(["Stock_Symbol", "Date"]).drop_nulls().collect()
 
-    if os.path.exists(OUTPUT_DIR):
-        shutil.rmtree(OUTPUT_DIR)
-    os.makedirs(OUTPUT_DIR)
-    
-    output_file = os.path.join(OUTPUT_DIR, "processed_stocks.csv")
-    df_final.write_csv(output_file)
-    print(f"✨ Step 4 Complete. Processed data saved.")
+    rows = write_stage(df_final, PROCESSED_FILE, PROCESSED_SCHEMA)
+    print(f"✨ Step 4 Complete. {rows} processed rows saved to {PROCESSED_FILE}")
 
 if __name__ == "__main__":
-    run_big_data_processing()
\ No newline at end of file
+    with metrics.timer("batch_stage_seconds", "Wall time of batch pipeline stages", {"stage": "processing"}):
+        run_big_data_processing()
+    metrics.flush("batch_processing")
\ No newline at end of file
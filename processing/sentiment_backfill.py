@@ -0,0 +1,254 @@
+import os
+import sys
+
+# --- FIX: Add project root to path ---
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+import sqlite3
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+from monitoring import metrics
+from processing import archive
+from processing.parquet_store import list_partitions, partition_files
+
+# Builds the daily sentiment table that batch ingestion joins onto (Stock_Symbol, Date).
+#
+# Every day with headlines is one unit of work. A source's records for the day
+# come from the archive segments when they exist (raw records, re-scored here)
+# and otherwise from the processed Parquet partition (its titles are re-scored,
+# so one run uses one model throughout). Headlines are tagged to every symbol
+# they mention and clustered, so each story is scored and counted once.
+# Days are scored in parallel, one per process, so memory is bounded by the
+# largest single day no matter how many years are covered.
+#
+# Runs are incremental: a day is redone only when its inputs (segment lengths,
+# part files) or the scorer changed since it was last written.
+
+# --- CONFIGURATION ---
+BASE_PATH = os.path.join(os.getcwd(), "data")
+SENTIMENT_DB = os.path.join(BASE_PATH, "sentiment_daily.db")
+ARCHIVE_PATH = os.path.join(BASE_PATH, "archive")
+PROCESSED_PATHS = {
+    "moneycontrol": os.path.join(BASE_PATH, "processed_moneycontrol"),
+    "news": os.path.join(BASE_PATH, "processed_news"),
+}
+TEXT_FIELDS = {"moneycontrol": "text", "news": "title"}
+# Older headlines fade with this half-life in decayed_sentiment
+HALF_LIFE_DAYS = float(os.getenv("SENTIMENT_HALF_LIFE_DAYS", "3"))
+# How long a day's decayed sentiment is carried onto following days without news
+CARRY_DAYS = int(os.getenv("SENTIMENT_CARRY_DAYS", "14"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_sentiment (
+    stock TEXT NOT NULL,
+    date TEXT NOT NULL,
+    mean_sentiment REAL,       -- mean over stories (near-duplicate clusters), not copies
+    headline_count INTEGER,
+    story_count INTEGER,
+    decayed_sentiment REAL,    -- story-weighted, exponentially decayed over previous days
+    top_title TEXT,            -- headline of the most widely carried story
+    PRIMARY KEY (stock, date)
+);
+CREATE TABLE IF NOT EXISTS backfill_days (
+    day TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL
+);
+"""
+
+
+def connect(path=SENTIMENT_DB):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def plan_days(archive_root=ARCHIVE_PATH, processed_paths=PROCESSED_PATHS, start=None, end=None):
+    """{day: {source: ('archive', [segment entries]) | ('processed', [part files])}}"""
+    plan = {}
+    for entry in archive.select_segments(archive.load_index(archive_root), tuple(processed_paths), start, end):
+        plan.setdefault(entry["day"], {}).setdefault(entry["source"], ("archive", []))[1].append(entry)
+    for source, root in processed_paths.items():
+        for day, path in list_partitions(root, start, end, newest_first=False):
+            sources = plan.setdefault(day, {})
+            if source not in sources:
+                files = partition_files(path)
+                if files:
+                    sources[source] = ("processed", files)
+    return {day: sources for day, sources in plan.items() if sources}
+
+
+def fingerprint(sources, scorer):
+    h = hashlib.sha256(scorer.encode())
+    for source, (kind, items) in sorted(sources.items()):
+        h.update(f"|{source}:{kind}".encode())
+        for item in items:
+            if kind == "archive":
+                h.update(f"{item['path']}={item['bytes']};".encode())
+            else:
+                st = os.stat(item)
+                h.update(f"{os.path.basename(item)}={st.st_size}:{st.st_mtime_ns};".encode())
+    return h.hexdigest()
+
+
+def _day_rows(day, sources, scorer, archive_root):
+    from ingestion.entity_tagger import registry_tagger
+    from processing.near_dup import NearDupIndex
+    from processing.records import prepare_record, SYMBOL_FIELDS
+
+    tagger, near_dups = registry_tagger(), NearDupIndex()
+    day_ts = pd.Timestamp(day).timestamp()
+    for source, (kind, items) in sources.items():
+        if kind == "archive":
+            for entry in items:
+                for record in archive.read_segment(entry, archive_root):
+                    for row in prepare_record(record, source, tagger, near_dups, scorer)[2]:
+                        yield row[SYMBOL_FIELDS[source]], row.get(TEXT_FIELDS[source]), row["sentiment_score"], row["cluster_id"]
+        else:
+            # Already tagged (one row per symbol); only the score is redone
+            columns = [SYMBOL_FIELDS[source], TEXT_FIELDS[source]]
+            for path in items:
+                part = pd.read_parquet(path, columns=columns)
+                for symbol, text in part.itertuples(index=False):
+                    cluster_id, score, _ = near_dups.cluster(text, day_ts, scorer)
+                    yield symbol, text, score, cluster_id
+
+
+def score_day(job):
+    """Aggregates one day: [(stock, date, mean, headlines, stories, top title)]."""
+    day, sources, scorer_spec, archive_root = job
+    scorer = archive.load_scorer(scorer_spec)
+    df = pd.DataFrame(list(_day_rows(day, sources, scorer, archive_root)),
+                      columns=["stock", "title", "sentiment_score", "cluster_id"])
+    df = df[df["stock"].notna()]
+    if df.empty:
+        return day, []
+    # Headlines with no words have no cluster; they count as their own story
+    df["cluster_id"] = df["cluster_id"].fillna(pd.Series(range(len(df)), index=df.index).map("row-{}".format))
+
+    stories = df.groupby(["stock", "cluster_id"]).agg(score=("sentiment_score", "mean"),
+                                                      copies=("title", "size"), title=("title", "first"))
+    rows = []
+    for stock, group in stories.groupby(level="stock"):
+        rows.append((stock, day, float(group["score"].mean()), int(group["copies"].sum()), len(group),
+                     group["title"].iloc[int(group["copies"].to_numpy().argmax())]))
+    return day, rows
+
+
+def recompute_decay(conn, stocks):
+    """decayed_sentiment for `stocks`: story-weighted mean where a day `g` days back weighs 0.5 ** (g / HALF_LIFE_DAYS)."""
+    for stock in stocks:
+        rows = conn.execute("SELECT date, mean_sentiment, story_count FROM daily_sentiment "
+                            "WHERE stock = ? ORDER BY date", (stock,)).fetchall()
+        total = weight = 0.0
+        prev = None
+        updates = []
+        for date, mean, stories in rows:
+            day = pd.Timestamp(date)
+            if prev is not None:
+                fade = 0.5 ** ((day - prev).days / HALF_LIFE_DAYS)
+                total, weight = total * fade, weight * fade
+            total += mean * stories
+            weight += stories
+            prev = day
+            updates.append((total / weight if weight else 0.0, stock, date))
+        conn.executemany("UPDATE daily_sentiment SET decayed_sentiment = ? WHERE stock = ? AND date = ?", updates)
+
+
+def run_backfill(start=None, end=None, workers=None, scorer=archive.DEFAULT_SCORER, force=False,
+                 db_path=SENTIMENT_DB, archive_root=ARCHIVE_PATH, processed_paths=PROCESSED_PATHS):
+    print("🚀 Starting sentiment backfill...")
+    conn = connect(db_path)
+    done = dict(conn.execute("SELECT day, fingerprint FROM backfill_days"))
+    plan = plan_days(archive_root, processed_paths, start, end)
+    jobs = []
+    for day, sources in sorted(plan.items()):
+        key = fingerprint(sources, scorer)
+        if force or done.get(day) != key:
+            jobs.append(((day, sources, scorer, archive_root), key))
+    print(f"📅 {len(plan)} days with headlines, {len(jobs)} new or changed.")
+    if not jobs:
+        conn.close()
+        return 0
+
+    keys = {job[0]: key for job, key in jobs}
+    touched = set()
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for i, (day, rows) in enumerate(pool.map(score_day, [job for job, _ in jobs]), 1):
+            with conn:
+                # Stocks no longer tagged on a redone day need their decay recomputed too
+                touched.update(s for (s,) in conn.execute("SELECT stock FROM daily_sentiment WHERE date = ?", (day,)))
+                conn.execute("DELETE FROM daily_sentiment WHERE date = ?", (day,))
+                conn.executemany("INSERT INTO daily_sentiment (stock, date, mean_sentiment, headline_count, "
+                                 "story_count, top_title) VALUES (?, ?, ?, ?, ?, ?)", rows)
+                conn.execute("INSERT OR REPLACE INTO backfill_days (day, fingerprint) VALUES (?, ?)", (day, keys[day]))
+            touched.update(row[0] for row in rows)
+            if i % 100 == 0:
+                print(f"   ...{i}/{len(jobs)} days")
+
+    with conn:
+        recompute_decay(conn, sorted(touched))
+    conn.close()
+    elapsed = time.perf_counter() - started
+    metrics.gauge("backfill_days_scored", "Days re-scored by the last sentiment backfill").set(len(jobs))
+    print(f"✅ Backfilled {len(jobs)} days for {len(touched)} stocks in {elapsed:.1f}s -> {db_path}")
+    return len(jobs)
+
+
+def read_daily_sentiment(db_path=SENTIMENT_DB):
+    """The daily_sentiment table as a DataFrame (empty if the backfill has never run)."""
+    columns = ["stock", "date", "mean_sentiment", "headline_count", "story_count", "decayed_sentiment", "top_title"]
+    if not os.path.exists(db_path):
+        return pd.DataFrame(columns=columns)
+    conn = sqlite3.connect(db_path)
+    try:
+        return pd.read_sql_query(f"SELECT {', '.join(columns)} FROM daily_sentiment", conn)
+    except sqlite3.DatabaseError:
+        return pd.DataFrame(columns=columns)
+    finally:
+        conn.close()
+
+
+def attach_sentiment(df, daily):
+    """
+    Sentiment_Score and Title for price rows (Stock_Symbol, Date 'YYYY-MM-DD').
+    Each row takes the latest decayed sentiment from a strictly earlier day, at
+    most CARRY_DAYS back, and Title is that day's most widely carried headline.
+    The row's own day is excluded: its headlines may come after the close.
+    """
+    out = df.copy()
+    out["Sentiment_Score"] = 0.0
+    out["Title"] = ""
+    if daily.empty:
+        return out
+
+    daily = daily.assign(_date=pd.to_datetime(daily["date"])).sort_values("_date")
+    keys = out[["Stock_Symbol", "Date"]].assign(_date=pd.to_datetime(out["Date"]), _row=range(len(out)))
+    merged = pd.merge_asof(keys.sort_values("_date"), daily[["stock", "_date", "decayed_sentiment", "top_title"]],
+                           on="_date", left_by="Stock_Symbol", right_by="stock", allow_exact_matches=False,
+                           tolerance=pd.Timedelta(days=CARRY_DAYS), direction="backward").sort_values("_row")
+    out["Sentiment_Score"] = merged["decayed_sentiment"].fillna(0.0).to_numpy(dtype="float64")
+    out["Title"] = merged["top_title"].fillna("").to_numpy(dtype=object)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score archived/processed headlines into daily per-stock sentiment.")
+    parser.add_argument("--from", dest="start", default=None, help="First day, YYYY-MM-DD (inclusive).")
+    parser.add_argument("--to", dest="end", default=None, help="Last day, YYYY-MM-DD (inclusive).")
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: all cores).")
+    parser.add_argument("--scorer", default=archive.DEFAULT_SCORER, help="Sentiment function as module:function.")
+    parser.add_argument("--force", action="store_true", help="Re-score every day in range.")
+    args = parser.parse_args()
+    with metrics.timer("batch_stage_seconds", "Wall time of batch pipeline stages", {"stage": "sentiment_backfill"}):
+        run_backfill(args.start, args.end, args.workers, args.scorer, args.force)
+    metrics.flush("sentiment_backfill")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,18 @@
 import os
 import sys
+
+# --- FIX: Add project root to path ---
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
 import time
 import json
 import glob
-import pandas as pd
-from datetime import datetime
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from monitoring import metrics
+from ingestion.entity_tagger import registry_tagger
+from processing.records import part_paths, prepare_record, write_partitions
+from processing.near_dup import NearDupIndex
+from processing.archive import SegmentArchive
+from processing.checkpoint import BatchLog
 
 # --- CONFIGURATION ---
 BASE_PATH = os.path.join(os.getcwd(), "data")
@@ -16,102 +23,117 @@ STAGING_NEWS = os.path.join(BASE_PATH, "staging", "news")
 MC_OUTPUT_PATH = os.path.join(BASE_PATH, "processed_moneycontrol")
 NEWS_OUTPUT_PATH = os.path.join(BASE_PATH, "processed_news")
 ARCHIVE_PATH = os.path.join(BASE_PATH, "archive")
+CHECKPOINT_PATH = os.path.join(BASE_PATH, "checkpoints")
+SOURCES = [(STAGING_MC, MC_OUTPUT_PATH, "moneycontrol"), (STAGING_NEWS, NEWS_OUTPUT_PATH, "news")]
 
 # Ensure directories exist
 for path in [STAGING_MC, STAGING_NEWS, MC_OUTPUT_PATH, NEWS_OUTPUT_PATH, ARCHIVE_PATH]:
     os.makedirs(path, exist_ok=True)
 
-analyzer = SentimentIntensityAnalyzer()
+# Shared by both sources so a story seen on MoneyControl and NewsAPI lands in one cluster
+near_dups = NearDupIndex()
+archive = SegmentArchive(ARCHIVE_PATH)
+_batch_logs = {}
 
-def get_sentiment(text):
-    if not text:
-        return 0.0
-    return float(analyzer.polarity_scores(text)['compound'])
+def batch_log(file_type):
+    """The source's checkpoint log; the first use settles a batch interrupted by the last shutdown."""
+    if file_type not in _batch_logs:
+        log = BatchLog(os.path.join(CHECKPOINT_PATH, f"{file_type}.wal"))
+        with metrics.timer("stream_recovery_seconds", "Checkpoint recovery at startup", {"source": file_type}):
+            log.recover(archive.rollback)
+        _batch_logs[file_type] = log
+    return _batch_logs[file_type]
 
 def process_files(source_dir, output_dir, file_type):
     """
     Reads JSON files from source_dir, applies sentiment, saves to output_dir (Parquet),
-    and moves raw files to archive.
+    and packs the raw records into the segment archive.
     """
-    # Find all JSON files
-    files = glob.glob(os.path.join(source_dir, "*.json"))
+    # Find all JSON files (except consumed ones whose delete failed; the checkpoint log retries those)
+    stuck = batch_log(file_type).stuck
+    files = [f for f in glob.glob(os.path.join(source_dir, "*.json")) if f not in stuck]
+    labels = {"source": file_type}
+    metrics.gauge("staging_backlog_files", "JSON files waiting in staging", labels).set(len(files))
     
     if not files:
         return
-    
+
+    with metrics.timer("stream_batch_seconds", "Wall time of one process_files batch", labels):
+        _process_batch(files, source_dir, output_dir, file_type)
+
+def _process_batch(files, source_dir, output_dir, file_type):
     data_buffer = []
+    archived = []
     processed_files = []
+    tagger = registry_tagger()
 
     print(f"🔄 Processing {len(files)} new files from {os.path.basename(source_dir)}...")
 
+    # A batch that fails is retried from staging, so its headlines must leave the index with it
+    near_dups.begin()
     for file_path in files:
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 record = json.load(f)
-            
-            # Extract text for sentiment
-            if file_type == "moneycontrol":
-                text = record.get("text", "") or record.get("title", "")
-                date_str = record.get("created_at", datetime.now().isoformat())
-            else: # news
-                text = record.get("title", "")
-                date_str = record.get("published_at", datetime.now().isoformat())
-
-            # Apply Sentiment
-            record['sentiment_score'] = get_sentiment(text)
-            
-            # Normalize Date for Partitioning
-            try:
-                dt = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
-                record['date'] = dt.strftime('%Y-%m-%d')
-            except:
-                record['date'] = datetime.now().strftime('%Y-%m-%d')
-            
-            data_buffer.append(record)
+
+            day, ts, rows = prepare_record(record, file_type, tagger, near_dups)
+            data_buffer.extend(rows)
+            archived.append((day, ts, record))
             processed_files.append(file_path)
             
         except Exception as e:
+            metrics.counter("stream_errors_total", "Staging files that failed to process", {"source": file_type}).inc()
             print(f"⚠️ Error reading {file_path}: {e}")
 
-    # Save to Parquet
-    if data_buffer:
-        df = pd.DataFrame(data_buffer)
-        
-        # Partition by Date
-        for date_key, group in df.groupby('date'):
-            partition_dir = os.path.join(output_dir, f"date={date_key}")
-            os.makedirs(partition_dir, exist_ok=True)
-            
-            # Save file
-            filename = f"part-{int(time.time())}.parquet"
-            save_path = os.path.join(partition_dir, filename)
-            group.to_parquet(save_path, index=False)
-            print(f"✅ Saved batch to {save_path}")
-
-    # Move processed files to archive (prevent re-reading)
-    for file_path in processed_files:
+    if not processed_files:
+        near_dups.commit()
+        return
+
+    try:
+        # Log the batch before touching any output, so a crash at any point below can be settled on restart
+        log = batch_log(file_type)
+        filename = f"part-{int(time.time())}-b{log.next_batch:08d}.parquet"
+        with metrics.timer("stream_checkpoint_seconds", "Checkpoint log write latency", {"source": file_type, "op": "begin"}):
+            batch = log.begin(processed_files, part_paths(data_buffer, output_dir, filename).values(),
+                              archive.snapshot(file_type, [day for day, _, _ in archived]))
+
         try:
-            filename = os.path.basename(file_path)
-            archive_subdir = os.path.join(ARCHIVE_PATH, os.path.basename(source_dir))
-            os.makedirs(archive_subdir, exist_ok=True)
-            os.replace(file_path, os.path.join(archive_subdir, filename))
-        except:
-            pass
+            # Save to Parquet, and pack the raw records into the compressed archive
+            write_partitions(data_buffer, output_dir, filename)
+            archive.append(file_type, archived)
+        except Exception:
+            log.recover(archive.rollback)  # undo the partial batch; its staging files are retried next poll
+            raise
+
+        with metrics.timer("stream_checkpoint_seconds", "Checkpoint log write latency", {"source": file_type, "op": "commit"}):
+            log.commit(batch)
+    except Exception:
+        near_dups.rollback()
+        raise
+    finally:
+        metrics.gauge("near_dup_index_entries", "Headlines held in the near-duplicate index").set(len(near_dups))
+    near_dups.commit()
+    metrics.counter("stream_records_total", "Records scored and written to Parquet", {"source": file_type}).inc(len(data_buffer))
+
+    # Only committed batches drop their staging files (prevent re-reading)
+    log.finish(processed_files)
 
 def run_streaming():
     print("=================================================")
     print("   NATIVE PYTHON SENTIMENT STREAMING ACTIVE      ")
     print("=================================================")
     print("🚀 Watching 'data/staging' for new news...")
+    metrics.start_flusher("stream_processor")
     
     while True:
-        try:
-            process_files(STAGING_MC, MC_OUTPUT_PATH, "moneycontrol")
-            process_files(STAGING_NEWS, NEWS_OUTPUT_PATH, "news")
-            time.sleep(5) # Poll every 5 seconds
-        except Exception as e:
-            print(f"❌ Processing Loop Error: {e}")
-            time.sleep(5)
+        # Each source fails on its own: a bad batch is rolled back and retried next poll
+        for source_dir, output_dir, file_type in SOURCES:
+            try:
+                process_files(source_dir, output_dir, file_type)
+            except Exception as e:
+                metrics.counter("stream_batch_failures_total", "Batches rolled back for a retry", {"source": file_type}).inc()
+                print(f"❌ Processing Loop Error ({file_type}): {e}")
+        time.sleep(5) # Poll every 5 seconds
 
 if __name__ == "__main__":
     run_streaming()
\ No newline at end of file
@@ -0,0 +1,132 @@
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+# Stage contract for the batch pipeline: ingestion -> processing -> EDA / training / API.
+#
+# Each stage hands the next an uncompressed Arrow IPC file. It is written one
+# record batch per symbol (split at BATCH_ROWS), so readers can memory-map it:
+# projecting a few columns only touches those columns' pages, and iterating
+# batches streams the file with bounded memory. Nothing is parsed on read.
+#
+# Stage files are build output and are not checked in. The repo ships the
+# sample data as CSV so it can be reviewed in diffs; `python
+# processing/stage_format.py` (run by start_app.py before the pipeline) builds
+# any missing stage file from its sample.
+
+# --- CONFIGURATION ---
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAW_FILE = os.path.join(ROOT_DIR, "data", "raw_stocks.arrow")
+PROCESSED_FILE = os.path.join(ROOT_DIR, "data", "processed_data", "processed_stocks.arrow")
+
+# Set PIPELINE_CSV_EXPORT=1 to also write a .csv next to every stage file (for spreadsheets / ad-hoc tools)
+CSV_EXPORT = os.getenv("PIPELINE_CSV_EXPORT", "0") == "1"
+BATCH_ROWS = 64_000
+
+# Dates stay ISO 'YYYY-MM-DD' strings: every consumer compares them lexically
+RAW_SCHEMA = pa.schema([
+    ("Date", pa.string()),
+    ("Open", pa.float64()),
+    ("High", pa.float64()),
+    ("Low", pa.float64()),
+    ("Close", pa.float64()),
+    ("Volume", pa.int64()),
+    ("Dividends", pa.float64()),
+    ("Stock_Splits", pa.float64()),
+    ("Stock_Symbol", pa.string()),
+    ("Sentiment_Score", pa.float64()),
+    ("Title", pa.string()),
+    ("Target", pa.int8()),
+])
+
+PROCESSED_SCHEMA = pa.schema(list(RAW_SCHEMA) + [
+    ("MA_10", pa.float64()),
+    ("Prev_Day_Sentiment", pa.float64()),
+    ("Volatility", pa.float64()),
+    ("Daily_Return", pa.float64()),
+])
+
+# (checked-in CSV sample, stage file it seeds, schema)
+SAMPLES = [
+    (os.path.join(ROOT_DIR, "data", "raw_stocks_10000.csv"), RAW_FILE, RAW_SCHEMA),
+    (os.path.join(ROOT_DIR, "data", "processed_data", "processed_stocks.csv"), PROCESSED_FILE, PROCESSED_SCHEMA),
+]
+
+
+def conform(data, schema):
+    """
+    Returns `data` (a pandas/polars DataFrame or Arrow table) as an Arrow table
+    with exactly `schema`'s columns, in order and cast to its types. Extra
+    columns are dropped; a missing column raises ValueError.
+    """
+    if not isinstance(data, pa.Table):
+        data = data.to_arrow() if hasattr(data, "to_arrow") else pa.Table.from_pandas(data, preserve_index=False)
+    missing = [name for name in schema.names if name not in data.column_names]
+    if missing:
+        raise ValueError(f"Stage data is missing columns {missing}")
+    return data.select(schema.names).cast(schema)
+
+
+def write_stage(data, path, schema, csv_export=CSV_EXPORT):
+    """Atomically writes a stage file, one record batch per symbol, plus an optional CSV copy."""
+    table = conform(data, schema).sort_by([("Stock_Symbol", "ascending"), ("Date", "ascending")])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    tmp_path = path + ".tmp"
+    symbols = table.column("Stock_Symbol").to_numpy(zero_copy_only=False)
+    with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        start = 0
+        for end in list((symbols[1:] != symbols[:-1]).nonzero()[0] + 1) + [len(symbols)]:
+            writer.write_table(table.slice(start, end - start), max_chunksize=BATCH_ROWS)
+            start = end
+    os.replace(tmp_path, path)
+
+    if csv_export:
+        csv_path = os.path.splitext(path)[0] + ".csv"
+        pa_csv.write_csv(table, csv_path + ".tmp")
+        os.replace(csv_path + ".tmp", csv_path)
+    return table.num_rows
+
+
+def _open(path):
+    return pa.ipc.open_file(pa.memory_map(path, "r"))
+
+
+def stage_columns(path):
+    return _open(path).schema.names
+
+
+def read_stage(path, columns=None):
+    """Memory-maps a stage file and returns the projected columns as an Arrow table (zero-copy)."""
+    table = _open(path).read_all()
+    return table.select(columns) if columns else table
+
+
+def read_frame(path, columns=None):
+    """read_stage() converted to pandas; only the projected columns are materialized."""
+    return read_stage(path, columns).to_pandas()
+
+
+def iter_frames(path, columns=None):
+    """Yields one pandas frame per record batch (at most BATCH_ROWS rows, never mixing symbols)."""
+    reader = _open(path)
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i)
+        yield (batch.select(columns) if columns else batch).to_pandas()
+
+
+def seed_samples(samples=SAMPLES):
+    """Builds each missing stage file from its CSV sample; existing stage files (real pipeline output) are kept."""
+    built = 0
+    for csv_path, path, schema in samples:
+        if os.path.exists(path) or not os.path.exists(csv_path):
+            continue
+        rows = write_stage(pd.read_csv(csv_path), path, schema, csv_export=False)
+        print(f"🌱 Built {os.path.relpath(path, ROOT_DIR)} from sample ({rows} rows)")
+        built += 1
+    return built
+
+
+if __name__ == "__main__":
+    seed_samples()
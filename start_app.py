@@ -1,46 +1,265 @@
 import subprocess
 import sys
 import os
+import ast
 import time
+import json
+import hashlib
+import argparse
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
 PYTHON_EXEC = sys.executable
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+STAGE_CACHE_FILE = os.path.join(ROOT_DIR, "data", ".stage_cache.json")
+# Builds missing Arrow stage files from the checked-in CSV samples before any stage runs
+SETUP_SCRIPT = "processing/stage_format.py"
+
+# Each stage declares the files it reads and writes (relative to ROOT_DIR).
+# Dependencies are inferred from those paths, and a stage is skipped when the
+# hash of its script, the project modules it imports (transitively) and its
+# inputs matches the last successful run and its outputs exist.
+Stage = namedtuple("Stage", ["name", "title", "script", "inputs", "outputs"])
+
+STAGES = [
+    # 0. Daily sentiment from archived headlines (re-scores only new or changed days)
+    Stage("sentiment_backfill", "Historical Sentiment Backfill", "processing/sentiment_backfill.py",
+          inputs=["data/archive/index.json"], outputs=["data/sentiment_daily.db"]),
+    # 1. Ingestion (Step 1-3). Market data is not a file input: rerun with --force ingestion to refresh it
+    Stage("ingestion", "Data Ingestion & Preprocessing", "ingestion/load_data.py",
+          inputs=["data/sentiment_daily.db"], outputs=["data/raw_stocks.arrow", "data/stocks_data.db"]),
+    # 2. Big Data Processing (Step 4)
+    Stage("processing", "Big Data Feature Engineering", "processing/pyspark_processor.py",
+          inputs=["data/raw_stocks.arrow"], outputs=["data/processed_data/processed_stocks.arrow"]),
+    # 3. EDA & Insights (Step 5-6)
+    Stage("eda", "Exploratory Data Analysis", "eda/data_analysis.py",
+          inputs=["data/processed_data/processed_stocks.arrow"],
+          outputs=["eda/plots/sentiment_hist.png", "eda/plots/correlation_heatmap.png", "eda/plots/sentiment_vs_return.png"]),
+    # 3b. Precomputed EDA aggregates served by /eda/stats (rebuilds changed symbols only)
+    Stage("eda_stats", "EDA Statistics Artifact", "eda/eda_stats.py",
+          inputs=["data/processed_data/processed_stocks.arrow"], outputs=["data/eda_stats/manifest.json"]),
+    # 4. Model Training (Step 7)
+    Stage("training", "ML Model Training & Prediction", "ml_pipeline/model_training.py",
+          inputs=["data/processed_data/processed_stocks.arrow"],
+          outputs=["models/stock_model.json", "data/latest_predictions.json"]),
+]
+
+_print_lock = threading.Lock()
+
+
+def log(message):
+    with _print_lock:
+        print(message, flush=True)
+
+
+def load_cache():
+    try:
+        with open(STAGE_CACHE_FILE) as f:
+            return json.load(f)
+    except Exception:
+        return {"stages": {}, "files": {}}
+
+
+def save_cache(cache):
+    os.makedirs(os.path.dirname(STAGE_CACHE_FILE), exist_ok=True)
+    tmp_path = STAGE_CACHE_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp_path, STAGE_CACHE_FILE)
+
+
+def file_digest(rel_path, cache):
+    """sha256 of a file, reusing the cached digest while its size and mtime are unchanged."""
+    path = os.path.join(ROOT_DIR, rel_path)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return "missing"
+    entry = cache["files"].get(rel_path)
+    if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+        return entry["sha256"]
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    cache["files"][rel_path] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": h.hexdigest()}
+    return h.hexdigest()
+
+
+def _module_files(name, search_dirs):
+    """Project files executed by `import name`: each package __init__.py on the way, then the module itself."""
+    parts = name.split(".")
+    for base in search_dirs:
+        if not os.path.exists(os.path.join(base, parts[0] + ".py")) and not os.path.isdir(os.path.join(base, parts[0])):
+            continue
+        found = []
+        for i in range(1, len(parts) + 1):
+            path = os.path.join(base, *parts[:i])
+            if os.path.isfile(path + ".py"):
+                found.append(path + ".py")
+            elif os.path.isfile(os.path.join(path, "__init__.py")):
+                found.append(os.path.join(path, "__init__.py"))
+        return found
+    return []
+
+
+def code_dependencies(script):
+    """Project-local modules (relative paths) imported by `script`, transitively, including function-level imports."""
+    # Scripts run with their own directory on sys.path, and add ROOT_DIR themselves
+    search_dirs = [os.path.dirname(os.path.join(ROOT_DIR, script)), ROOT_DIR]
+    found, queue = set(), [os.path.join(ROOT_DIR, script)]
+    while queue:
+        path = queue.pop()
+        try:
+            with open(path, encoding="utf-8") as f:
+                tree = ast.parse(f.read(), path)
+        except (OSError, SyntaxError):
+            continue
+        names = []
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names += [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                # `from pkg import name` may name a submodule
+                names += [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+        for name in names:
+            for dep in _module_files(name, search_dirs):
+                rel_path = os.path.relpath(dep, ROOT_DIR)
+                if rel_path not in found and rel_path != script:
+                    found.add(rel_path)
+                    queue.append(dep)
+    return sorted(found)
+
+
+def stage_key(stage, cache):
+    h = hashlib.sha256()
+    for rel_path in [stage.script] + code_dependencies(stage.script) + sorted(stage.inputs):
+        h.update(f"{rel_path}={file_digest(rel_path, cache)}\n".encode())
+    return h.hexdigest()
+
+
+def stage_dependencies(stages):
+    producers = {out: s.name for s in stages for out in s.outputs}
+    return {s.name: {producers[i] for i in s.inputs if i in producers} for s in stages}
+
+
+def run_stage(stage):
+    """Runs one stage script, prefixing its output lines with the stage name."""
+    proc = subprocess.Popen([PYTHON_EXEC, os.path.join(ROOT_DIR, stage.script)], cwd=ROOT_DIR,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, encoding="utf-8",
+                            errors="replace")
+    for line in proc.stdout:
+        log(f"[{stage.name}] {line.rstrip()}")
+    return proc.wait()
+
+
+def run_pipeline(stages, force=()):
+    """Executes the stage DAG. Returns {stage: (status, start, end)}, timestamps relative to start."""
+    cache = load_cache()
+    deps = stage_dependencies(stages)
+    by_name = {s.name: s for s in stages}
+    results = {}
+    cache_lock = threading.Lock()
+    t0 = time.perf_counter()
+
+    def execute(stage):
+        start = time.perf_counter() - t0
+        with cache_lock:
+            key = stage_key(stage, cache)
+        outputs_exist = all(os.path.exists(os.path.join(ROOT_DIR, o)) for o in stage.outputs)
+        if stage.name not in force and "all" not in force and outputs_exist \
+                and cache["stages"].get(stage.name) == key:
+            log(f"⏭️ [STEP: {stage.title}] up to date, skipped.")
+            return "cached", start, time.perf_counter() - t0
+
+        log(f"\n--- [STEP: {stage.title}] ---")
+        if run_stage(stage) != 0:
+            log(f"❌ {stage.title} failed.")
+            return "failed", start, time.perf_counter() - t0
+        with cache_lock:
+            # Key on the inputs as they were when the stage read them
+            cache["stages"][stage.name] = key
+            for out in stage.outputs:
+                file_digest(out, cache)
+            save_cache(cache)
+        log(f"✅ {stage.title} completed.")
+        return "ran", start, time.perf_counter() - t0
+
+    pending = dict(deps)
+    running = {}
+    with ThreadPoolExecutor(max_workers=len(stages)) as pool:
+        while pending or running:
+            for name in [n for n, d in pending.items() if d <= set(results)]:
+                del pending[name]
+                if any(results[d][0] in ("failed", "blocked") for d in deps[name]):
+                    results[name] = ("blocked", 0.0, 0.0)
+                    continue
+                running[pool.submit(execute, by_name[name])] = name
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+    return results
+
+
+def critical_path(stages, results):
+    """Longest chain of dependent stages by duration."""
+    deps = stage_dependencies(stages)
+    best = {}
+    for s in stages:  # STAGES is declared in topological order
+        status, start, end = results[s.name]
+        prev = max((best[d] for d in deps[s.name]), key=lambda p: p[0], default=(0.0, []))
+        best[s.name] = (prev[0] + (end - start), prev[1] + [s.name])
+    return max(best.values(), key=lambda p: p[0])
+
+
+def print_summary(stages, results):
+    print("\n⏱️ Stage timing summary")
+    print("-" * 50)
+    for s in stages:
+        status, start, end = results[s.name]
+        print(f"{s.name:<12} {status:<8} {end - start:8.2f}s")
+    total, path = critical_path(stages, results)
+    print("-" * 50)
+    print(f"Critical path: {' → '.join(path)} ({total:.2f}s)")
+    print(f"Wall time:     {max(end for _, _, end in results.values()):.2f}s")
 
-def run_step(script_path, name):
-    print(f"\n--- [STEP: {name}] ---")
-    script_full_path = os.path.join(ROOT_DIR, script_path)
-    result = subprocess.run([PYTHON_EXEC, script_full_path], capture_output=False)
-    if result.returncode != 0:
-        print(f"❌ {name} failed. Exiting.")
-        sys.exit(1)
-    print(f"✅ {name} completed.")
 
 def main():
+    parser = argparse.ArgumentParser(description="Run the batch pipeline and launch the API.")
+    parser.add_argument("--force", action="append", default=[], metavar="STAGE",
+                        help="Rerun a stage even if up to date (repeatable, or 'all').")
+    parser.add_argument("--no-serve", action="store_true", help="Exit after the batch stages.")
+    args = parser.parse_args()
+
     print("=================================================")
     print("   STOCK SENTIMENT BIG DATA FULL-STACK APP       ")
     print("=================================================")
 
-    # 1. Ingestion (Step 1-3)
-    run_step("ingestion/load_data.py", "Data Ingestion & Preprocessing")
-
-    # 2. Big Data Processing (Step 4)
-    run_step("processing/pyspark_processor.py", "Big Data Feature Engineering")
+    if subprocess.run([PYTHON_EXEC, os.path.join(ROOT_DIR, SETUP_SCRIPT)], cwd=ROOT_DIR).returncode != 0:
+        print("❌ Setup failed. Exiting.")
+        sys.exit(1)
 
-    # 3. EDA & Insights (Step 5-6)
-    run_step("eda/data_analysis.py", "Exploratory Data Analysis")
+    results = run_pipeline(STAGES, force=set(args.force))
+    print_summary(STAGES, results)
+    if any(status in ("failed", "blocked") for status, _, _ in results.values()):
+        print("❌ Pipeline failed. Exiting.")
+        sys.exit(1)
 
-    # 4. Model Training (Step 7)
-    run_step("ml_pipeline/model_training.py", "ML Model Training & Prediction")
+    if args.no_serve:
+        return
 
     # 5. Start Backend API
     print("\n🚀 All Big Data steps complete. Launching Backend API...")
     backend_dir = os.path.join(ROOT_DIR, "backend")
-    
-    # We use subprocess.Popen for the backend to keep it running
+
     try:
         subprocess.run([PYTHON_EXEC, "-m", "uvicorn", "main:app", "--host", "0.0.0.0", "--port", "8000"], cwd=backend_dir)
     except KeyboardInterrupt:
         print("\n🛑 Shutting down...")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
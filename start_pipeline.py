@@ -13,9 +13,9 @@ ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 SCRIPT_MC = os.path.join(ROOT_DIR, "ingestion", "producer_moneycontrol.py")
 SCRIPT_NEWS = os.path.join(ROOT_DIR, "ingestion", "producer_news.py")
 SCRIPT_SPARK = os.path.join(ROOT_DIR, "processing", "spark_streaming.py")
-SCRIPT_TRAIN = os.path.join(ROOT_DIR, "ml_pipeline", "train_model.py")
-SCRIPT_PREDICT = os.path.join(ROOT_DIR, "ml_pipeline", "daily_prediction.py")
 BACKEND_DIR = os.path.join(ROOT_DIR, "backend")
+# Producer processes per source; symbols are split between them by ingestion/symbols.py
+INGEST_SHARDS = int(os.getenv("INGEST_SHARDS", "1"))
 
 processes = []
 
@@ -62,32 +62,9 @@ def run_process(cmd_list, name, cwd=ROOT_DIR):
         print(f"❌ Failed to start {name}: {e}")
 
 def ml_scheduler():
-    """Runs ML Training and Prediction periodically"""
-    print("⏳ ML Scheduler initializing...")
-    
-    # Visual countdown for the first run
-    for i in range(60, 0, -10):
-        print(f"⏳ ML Pipeline starting in {i} seconds (waiting for data)...")
-        time.sleep(10)
-    
-    env = setup_environment()
-    
-    while True:
-        print("\n🧠 --- RUNNING ML PIPELINE ---")
-        try:
-            # Run Training
-            print("   Running Model Training...")
-            subprocess.run([PYTHON_EXEC, SCRIPT_TRAIN], check=False, env=env)
-            
-            # Run Prediction
-            print("   Running Daily Prediction...")
-            subprocess.run([PYTHON_EXEC, SCRIPT_PREDICT], check=False, env=env)
-            
-            print("✅ ML Pipeline Finished. Next run in 10 minutes.\n")
-        except Exception as e:
-            print(f"❌ ML Pipeline Error: {e}")
-            
-        time.sleep(600)  # Run every 10 minutes
+    """Runs ML Training and Prediction whenever new price/sentiment data crosses its thresholds"""
+    from ml_pipeline.scheduler import MLScheduler
+    MLScheduler().run_forever()
 
 def cleanup(signum, frame):
     """Kills all processes on Ctrl+C"""
@@ -108,9 +85,11 @@ def main():
     print("   BIG DATA STOCK SENTIMENT SYSTEM - STARTUP     ")
     print("=================================================")
 
-    # 1. Start Ingestion
-    run_process([PYTHON_EXEC, SCRIPT_MC], "MoneyControl Scraper")
-    run_process([PYTHON_EXEC, SCRIPT_NEWS], "News Producer")
+    # 1. Start Ingestion (one producer per shard of the symbol registry)
+    for shard in range(INGEST_SHARDS):
+        shard_args = ["--shard", str(shard), "--shards", str(INGEST_SHARDS)]
+        run_process([PYTHON_EXEC, SCRIPT_MC, *shard_args], f"MoneyControl Scraper [{shard + 1}/{INGEST_SHARDS}]")
+        run_process([PYTHON_EXEC, SCRIPT_NEWS, *shard_args], f"News Producer [{shard + 1}/{INGEST_SHARDS}]")
 
     # 2. Start Spark Streaming
     run_process([PYTHON_EXEC, SCRIPT_SPARK], "Spark Streaming")
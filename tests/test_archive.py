@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+from processing import archive
+
+
+def _records(n, day="2025-03-04"):
+    return [(day, i, {"title": f"Headline {i}", "body": "é" * (i % 7)}) for i in range(n)]
+
+
+@pytest.mark.parametrize("compressed", ["zstd", "gzip"])
+def test_segment_frames_stream_back_in_order(tmp_path, monkeypatch, compressed):
+    if compressed == "gzip":
+        monkeypatch.setattr(archive, "zstandard", None)
+        monkeypatch.setattr(archive, "SEGMENT_EXT", ".jsonl.gz")
+    elif archive.zstandard is None:
+        pytest.skip("zstandard not installed")
+    store = archive.SegmentArchive(str(tmp_path))
+    batches = [_records(3), _records(500), _records(1)]
+    for batch in batches:
+        store.append("news", batch)
+    entry, = archive.load_index(str(tmp_path))
+    assert entry["records"] == 504
+
+    # Bytes past the indexed length (a frame whose index update never landed) are not read
+    with open(os.path.join(str(tmp_path), entry["path"]), "ab") as f:
+        f.write(archive._compress(b'{"title": "orphan"}\n'))
+    expected = [record for batch in batches for _, _, record in batch]
+    assert list(archive.read_segment(entry, str(tmp_path))) == expected
+
+
+def test_replay_writes_bounded_chunks(tmp_path, monkeypatch):
+    store = archive.SegmentArchive(str(tmp_path / "archive"))
+    store.append("news", [("2025-03-04", i, {"title": f"TCS wins order number {i}", "source": "test",
+                                             "published_at": "2025-03-04T10:00:00"}) for i in range(25)])
+    monkeypatch.setattr(archive, "REPLAY_CHUNK_ROWS", 10)
+    entry, = archive.load_index(str(tmp_path / "archive"))
+    job = (entry, str(tmp_path / "archive"), str(tmp_path / "replay"), archive.DEFAULT_SCORER)
+    replayed, rows = archive._replay_segment(job)
+    parts = list((tmp_path / "replay" / "processed_news").rglob("*.parquet"))
+    assert replayed == 25 and rows >= 25 and len(parts) > 1  # one part file per chunk
@@ -0,0 +1,54 @@
+import os
+import numpy as np
+import pandas as pd
+
+from eda.eda_stats import EdaStatsStore, build_artifact
+from processing.stage_format import PROCESSED_SCHEMA, write_stage
+
+
+def _write_processed(path, symbols, seed):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for symbol in symbols:
+        n = 40
+        frames.append(pd.DataFrame({
+            "Date": pd.date_range("2025-01-01", periods=n).strftime("%Y-%m-%d"),
+            "Open": 100.0, "High": 101.0, "Low": 99.0, "Close": 100 + rng.normal(0, 1, n),
+            "Volume": 1000, "Dividends": 0.0, "Stock_Splits": 0.0, "Stock_Symbol": symbol,
+            "Sentiment_Score": rng.uniform(-1, 1, n), "Title": "", "Target": 0,
+            "MA_10": 100.0, "Prev_Day_Sentiment": 0.0, "Volatility": 1.0, "Daily_Return": rng.normal(0, 1, n),
+        }))
+    write_stage(pd.concat(frames), path, PROCESSED_SCHEMA, csv_export=False)
+
+
+def _pin(store, manifest):
+    """Makes `store` treat `manifest` as current, like a reader that loaded it just before a publish."""
+    st = os.stat(os.path.join(store.artifact_dir, "manifest.json"))
+    store._manifest, store._manifest_version, store._files = manifest, (st.st_mtime_ns, st.st_size), {}
+
+
+def test_previous_generation_survives_one_publish(tmp_path):
+    data, artifact = str(tmp_path / "processed.arrow"), str(tmp_path / "eda_stats")
+    _write_processed(data, ["TCS", "INFY"], seed=1)
+    build_artifact(data, artifact, workers=1)
+    store = EdaStatsStore(artifact)
+    assert store.query(["TCS"])["rows"] == 40
+    v1 = store.manifest()
+
+    # v2 replaces TCS's file and the global file; v1's copies are retired, not deleted
+    _write_processed(data, ["TCS", "INFY"], seed=2)
+    build_artifact(data, artifact, workers=1)
+    _pin(store, v1)
+    assert store.query(["TCS"])["version"] == 1
+    assert store.query()["rows"] == 80
+
+    # v3 deletes them; a store still on v1 reloads the manifest instead of failing
+    _write_processed(data, ["TCS", "INFY"], seed=3)
+    build_artifact(data, artifact, workers=1)
+    _pin(store, v1)
+    result = store.query(["TCS"])
+    assert result["rows"] == 40 and result["version"] == 3
+    manifest = store.manifest()
+    on_disk = {f"symbols/{name}" for name in os.listdir(os.path.join(artifact, "symbols"))}
+    on_disk |= {name for name in os.listdir(artifact) if name.startswith("global-")}
+    assert on_disk == {e["file"] for e in manifest["symbols"].values()} | {manifest["global"]} | set(manifest["retired"])
@@ -0,0 +1,118 @@
+import os
+import time
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+from fastapi.testclient import TestClient
+
+import backend.main as main
+from backend.explanations_cache import HistoricalExplainer
+from backend.history_cache import HistoryCache, synthetic_fetcher
+from ml_pipeline.explanations import FEATURES, explain_batch, price_features
+
+SYMBOLS = ["TCS", "INFY"]
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    rng = np.random.default_rng(7)
+    X = pd.DataFrame(rng.normal(size=(200, len(FEATURES))), columns=FEATURES)
+    model = xgb.XGBClassifier(n_estimators=10, max_depth=3)
+    model.fit(X, (X["close"] + X["mc_sentiment"] > 0).astype(int))
+    path = str(tmp_path / "model.json")
+    model.save_model(path)
+    return path
+
+
+def _explainer(model_path, cache_dir, fetcher=synthetic_fetcher):
+    cache = HistoryCache(fetcher=fetcher)
+    return HistoricalExplainer(model_path, str(cache_dir), lambda symbols: cache.get_many(symbols, "1d"),
+                               lambda date: {}, lambda: SYMBOLS)
+
+
+def test_contributions_sum_to_margin(model_path):
+    booster = xgb.Booster()
+    booster.load_model(model_path)
+    rng = np.random.default_rng(1)
+    rows = [dict(zip(FEATURES, rng.normal(size=len(FEATURES)).tolist())) for _ in SYMBOLS]
+    out = explain_batch(booster, SYMBOLS, rows)
+
+    margins = booster.predict(xgb.DMatrix([[r[f] for f in FEATURES] for r in rows], feature_names=FEATURES),
+                              output_margin=True)
+    for stock, margin in zip(SYMBOLS, margins.tolist()):
+        entry = out[stock]
+        assert entry["base_value"] + sum(entry["contributions"].values()) == pytest.approx(margin, abs=1e-5)
+        assert entry["confidence"] == pytest.approx(100 / (1 + np.exp(-margin)), abs=0.01)
+
+
+def test_price_features_match_training_definitions():
+    # The same windows train_model.py computes with pandas before fitting
+    closes = pd.Series(1000 * np.exp(np.cumsum(np.random.default_rng(3).normal(0, 0.02, 40))))
+    expected = {"close": closes, "ma_5": closes.rolling(window=5).mean(), "ma_10": closes.rolling(window=10).mean(),
+                "volatility": closes.pct_change().rolling(window=5).std()}
+    features = price_features(closes.tolist())
+    for name, series in expected.items():
+        assert features[name] == pytest.approx(series.iloc[-1], rel=1e-12)
+    assert price_features(closes.tolist()[:9]) is None  # ma_10 needs 10 closes
+
+
+def test_failed_fetch_is_not_cached(model_path, tmp_path):
+    day = (pd.Timestamp.now().normalize() - pd.Timedelta(days=30)).strftime("%Y-%m-%d")
+
+    def broken(symbols, interval, period):
+        raise ConnectionError("upstream down")
+
+    with pytest.raises(LookupError):
+        _explainer(model_path, tmp_path / "cache", broken).explain(day)
+    assert not (tmp_path / "cache").exists()
+
+    result = _explainer(model_path, tmp_path / "cache").explain(day)
+    assert set(result["explanations"]) == set(SYMBOLS)
+    assert len(os.listdir(next((tmp_path / "cache").iterdir()))) == 1
+
+
+def test_dates_before_the_history_window_are_not_found(model_path, tmp_path):
+    with pytest.raises(LookupError):
+        _explainer(model_path, tmp_path / "cache").explain("2001-01-02")
+    assert not (tmp_path / "cache").exists()
+
+
+def test_concurrent_requests_share_one_computation(model_path, tmp_path):
+    explainer = _explainer(model_path, tmp_path / "cache")
+    calls, release = [], threading.Event()
+    history = explainer.history
+
+    def slow_history(symbols):
+        calls.append(symbols)
+        release.wait(5)
+        return history(symbols)
+
+    explainer.history = slow_history
+    day = (pd.Timestamp.now().normalize() - pd.Timedelta(days=30)).strftime("%Y-%m-%d")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(explainer.explain(day))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while not explainer._inflight:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(calls) == 1 and len(results) == 4
+    assert all(r is results[0] for r in results)
+
+
+def test_explain_endpoint_errors(model_path, tmp_path, monkeypatch):
+    client = TestClient(main.app)
+    monkeypatch.setattr(main, "HISTORICAL_EXPLAINER", _explainer(str(tmp_path / "missing.json"), tmp_path / "cache"))
+    assert client.get("/explain/TCS", params={"date": "2025-01-02"}).status_code == 404
+
+    monkeypatch.setattr(main, "HISTORICAL_EXPLAINER", _explainer(model_path, tmp_path / "cache"))
+    assert client.get("/explain/TCS", params={"date": "notadate"}).status_code == 400
+    assert client.get("/explain/TCS", params={"date": "2001-01-02"}).status_code == 404
+    day = (pd.Timestamp.now().normalize() - pd.Timedelta(days=30)).strftime("%Y-%m-%d")
+    response = client.get("/explain/TCS", params={"date": day})
+    assert response.status_code == 200 and set(response.json()["contributions"]) == set(FEATURES)
@@ -0,0 +1,79 @@
+import time
+import threading
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import backend.main as main
+from backend.history_cache import HistoryCache, synthetic_fetcher
+
+
+def _frame(columns):
+    index = pd.date_range("2025-01-01", periods=3, freq="B")
+    return pd.DataFrame({c: [1.0, 2.0, 3.0] for c in columns}, index=index)
+
+
+def _get_with_timeout(cache, symbol, timeout=5):
+    outcome = {}
+
+    def run():
+        try:
+            outcome["series"] = cache.get(symbol)
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "request for the same symbol hung after a failed fetch"
+    return outcome
+
+
+def test_failed_normalization_does_not_leave_symbol_inflight():
+    calls = []
+
+    def fetcher(symbols, interval, period):
+        calls.append(symbols)
+        # First response has no close column, the retry is well formed
+        return {s: _frame(["open"] if len(calls) == 1 else ["close"]) for s in symbols}
+
+    cache = HistoryCache(fetcher=fetcher)
+    with pytest.raises(KeyError):
+        cache.get("TCS")
+
+    outcome = _get_with_timeout(cache, "TCS")
+    assert "error" not in outcome
+    assert len(outcome["series"]) == 3
+    assert len(calls) == 2
+
+
+def test_waiters_receive_the_exception():
+    release = threading.Event()
+
+    def fetcher(symbols, interval, period):
+        release.wait(5)
+        return {s: _frame(["open"]) for s in symbols}
+
+    cache = HistoryCache(fetcher=fetcher)
+    first = threading.Thread(target=lambda: _get_with_timeout(cache, "INFY"), daemon=True)
+    first.start()
+    while not cache._inflight:
+        time.sleep(0.01)
+    waiter = {}
+    second = threading.Thread(target=lambda: waiter.update(_get_with_timeout(cache, "INFY")), daemon=True)
+    second.start()
+    release.set()
+    first.join(5)
+    second.join(5)
+    assert isinstance(waiter.get("error"), KeyError)
+    assert not cache._inflight
+
+
+def test_bulk_history_rejects_bad_dates_before_streaming(monkeypatch):
+    monkeypatch.setattr(main, "HISTORY_CACHE", HistoryCache(fetcher=synthetic_fetcher))
+    client = TestClient(main.app)
+    response = client.get("/history", params={"symbols": "TCS,INFY", "start": "notadate"})
+    assert response.status_code == 400
+
+    body = client.get("/history", params={"symbols": "TCS,INFY", "start": "2020-01-01"}).json()
+    assert set(body["symbols"]) == {"TCS", "INFY"} and body["symbols"]["TCS"]["close"]
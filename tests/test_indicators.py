@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml_pipeline.daily_prediction import continues_checkpoint
+from ml_pipeline.indicators import IndicatorBook, SymbolIndicators
+
+
+def _walk(bars=600, seed=42):
+    return 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.02, bars)))
+
+
+def _wilder_rsi(closes, period=14):
+    changes = np.diff(closes)
+    gains, losses = np.clip(changes, 0, None), np.clip(-changes, 0, None)
+    out = [None] * len(closes)
+    avg_gain, avg_loss = gains[:period].mean(), losses[:period].mean()
+    for i in range(period, len(changes) + 1):
+        if i > period:
+            avg_gain = (avg_gain * (period - 1) + gains[i - 1]) / period
+            avg_loss = (avg_loss * (period - 1) + losses[i - 1]) / period
+        out[i] = 100.0 if avg_loss == 0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return out
+
+
+def test_matches_pandas_on_a_random_walk():
+    closes = _walk()
+    s = pd.Series(closes)
+    expected = {"ma_5": s.rolling(5).mean(), "ma_10": s.rolling(10).mean(),
+                "volatility": s.pct_change().rolling(5).std(), "ema_12": s.ewm(span=12, adjust=False).mean()}
+    rsi = _wilder_rsi(closes)
+    state = SymbolIndicators()
+    for i, close in enumerate(closes):
+        peeked = state.snapshot(close)
+        state.update(i, close)
+        snap = state.snapshot()
+        for name, value in snap.items():  # scoring a forming bar equals committing it
+            assert peeked[name] == (None if value is None else pytest.approx(value, rel=1e-12)), (name, i)
+        for name, series in expected.items():
+            if pd.isna(series.iloc[i]):
+                assert snap[name] is None, (name, i)
+            else:
+                assert snap[name] == pytest.approx(series.iloc[i], rel=1e-9, abs=1e-12), (name, i)
+        if rsi[i] is None:
+            assert snap["rsi_14"] is None
+        else:
+            assert snap["rsi_14"] == pytest.approx(rsi[i], rel=1e-9)
+
+
+def test_older_bars_are_ignored():
+    state = SymbolIndicators()
+    assert state.update(2, 10.0)
+    assert not state.update(1, 99.0)
+    assert state.last_close == 10.0 and state.bars == 1
+
+
+def test_book_round_trip(tmp_path):
+    path = str(tmp_path / "state" / "indicators.json")
+    book = IndicatorBook(path)
+    for i, close in enumerate(_walk(37)):
+        book.update("TCS", i, close)
+        book.update("INFY", i, close * 2)
+    book.save()
+
+    restored = IndicatorBook.load(path)
+    assert set(restored.symbols) == {"TCS", "INFY"}
+    for symbol in ("TCS", "INFY"):
+        assert restored[symbol].snapshot() == pytest.approx(book[symbol].snapshot(), rel=1e-12)
+        assert restored[symbol].snapshot(123.0) == pytest.approx(book[symbol].snapshot(123.0), rel=1e-12)
+    # Both keep advancing identically after the restore
+    book.update("TCS", 100, 101.0)
+    restored.update("TCS", 100, 101.0)
+    assert restored["TCS"].snapshot() == pytest.approx(book["TCS"].snapshot(), rel=1e-12)
+    assert IndicatorBook.load(str(tmp_path / "missing.json")).symbols == {}
+
+
+def test_adjusted_history_breaks_the_checkpoint():
+    state = SymbolIndicators()
+    state.update("2025-01-02", 100.0)
+    index = pd.to_datetime(["2025-01-02", "2025-01-03"])
+    assert continues_checkpoint(pd.DataFrame({"close": [100.0, 101.0]}, index=index), state)
+    assert not continues_checkpoint(pd.DataFrame({"close": [50.0, 50.5]}, index=index), state)  # 2:1 split
+    assert not continues_checkpoint(pd.DataFrame({"close": [101.0]}, index=index[1:]), state)
+    assert continues_checkpoint(pd.DataFrame(), state)
+    assert IndicatorBook().reset("TCS").last_ts is None
@@ -0,0 +1,37 @@
+import os
+import pytest
+
+from ingestion import mc_extract
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "moneycontrol_tag_reliance.html")
+
+EXPECTED = [
+    ("Reliance Q2 Results: Net profit rises 10% to ₹18,165 crore; Jio & retail drive growth",
+     "October 17, 2025 07:45 PM IST"),
+    ("Reliance shares gain as brokerages see value unlocking from Jio’s IPO",
+     "October 16, 2025 11:02 AM IST"),
+    ("Reliance New Energy commissions first giga factory module line",
+     "October 15, 2025 09:30 AM IST"),
+]
+
+EXTRACTORS = [pytest.param(mc_extract.extract_streaming, id="streaming"),
+              pytest.param(mc_extract.extract_lxml, id="lxml",
+                           marks=pytest.mark.skipif(mc_extract.lxml is None, reason="lxml not installed"))]
+
+
+@pytest.fixture
+def page():
+    with open(FIXTURE, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("extract", EXTRACTORS)
+def test_saved_page_headlines(extract, page):
+    # Nav items, the ad slot, the commented-out item and the string in <script> are not stories
+    assert extract(page, 2) == EXPECTED[:2]
+    assert extract(page, 10) == EXPECTED
+
+
+@pytest.mark.parametrize("extract", EXTRACTORS)
+def test_empty_body(extract):
+    assert extract(b"", 2) == []
@@ -0,0 +1,32 @@
+from processing.near_dup import NearDupIndex
+
+HEADLINE = "Reliance Industries shares rise 3% after strong quarterly results"
+
+
+def _state(index):
+    return dict(index._entries), list(index._order), [dict(b) for b in index._bands], index._horizon
+
+
+def test_rollback_forgets_a_failed_batch():
+    index = NearDupIndex(window_seconds=100, max_entries=2)
+    index.cluster("HDFC Bank raises deposit rates for senior citizens", 0, lambda t: 0.1)
+    index.cluster("Infosys wins large deal from European bank", 50, lambda t: 0.2)
+    before = _state(index)
+
+    index.begin()
+    cluster_id, score, duplicate = index.cluster(HEADLINE, 120, lambda t: 0.5)  # expires the first entry
+    assert not duplicate and len(index) == 2
+    index.rollback()
+    assert _state(index) == before
+
+    # The retried record is a new story again, not a duplicate of its own failed attempt
+    assert index.cluster(HEADLINE, 120, lambda t: 0.5) == (cluster_id, score, False)
+
+
+def test_committed_batch_stays_indexed():
+    index = NearDupIndex()
+    index.begin()
+    cluster_id, _, _ = index.cluster(HEADLINE, 0, lambda t: 0.5)
+    index.commit()
+    index.rollback()  # nothing journaled since the commit
+    assert index.cluster(HEADLINE + "!", 10, lambda t: 0.9) == (cluster_id, 0.5, True)
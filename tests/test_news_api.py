@@ -0,0 +1,54 @@
+import os
+import functools
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fastapi.testclient import TestClient
+
+import backend.main as main
+from backend.database import NEWS_SCHEMA, query_news
+
+
+def test_news_with_null_fields(tmp_path, monkeypatch):
+    partition = tmp_path / "date=2025-03-04"
+    partition.mkdir()
+    rows = [
+        {"stock": "TCS", "title": "TCS wins deal", "description": None, "source": None,
+         "published_at": None, "sentiment_score": 0.4},
+        {"stock": "TCS", "title": "TCS results", "description": "Q4", "source": "Wire",
+         "published_at": "2025-03-04T10:00:00Z", "sentiment_score": 0.1},
+    ]
+    pq.write_table(pa.Table.from_pylist(rows, schema=NEWS_SCHEMA), os.path.join(partition, "part-0.parquet"))
+    monkeypatch.setattr(main, "query_news", functools.partial(query_news, root=str(tmp_path)))
+
+    response = TestClient(main.app).get("/news/TCS")
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [item["title"] for item in items] == ["TCS results", "TCS wins deal"]
+    assert items[1]["published_at"] is None and items[1]["source"] is None
+
+
+def test_cursor_pages_through_null_timestamps(tmp_path, monkeypatch):
+    days = {
+        "2025-03-05": [("TCS", "B late", "2025-03-05T15:00:00Z"), ("TCS", "A no time", None),
+                       ("TCS", "C no time", None), ("INFY", "Other", None)],
+        "2025-03-04": [("TCS", "D early", "2025-03-04T09:00:00Z"), ("TCS", "E no time", None)],
+    }
+    for day, rows in days.items():
+        partition = tmp_path / f"date={day}"
+        partition.mkdir()
+        rows = [{"stock": s, "title": t, "description": None, "source": None, "published_at": p,
+                 "sentiment_score": 0.0} for s, t, p in rows]
+        pq.write_table(pa.Table.from_pylist(rows, schema=NEWS_SCHEMA), os.path.join(partition, "part-0.parquet"))
+    monkeypatch.setattr(main, "query_news", functools.partial(query_news, root=str(tmp_path)))
+    client = TestClient(main.app)
+
+    titles, cursor = [], None
+    for _ in range(10):
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/news/TCS", params=params).json()
+        titles += [item["title"] for item in body["items"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    # Newest partition first; inside one, timestamped headlines first and null timestamps last
+    assert titles == ["B late", "C no time", "A no time", "D early", "E no time"]
@@ -0,0 +1,28 @@
+import pandas as pd
+
+from backend.pipeline_watcher import PipelineWatcher
+
+
+def test_unreadable_part_is_retried_until_read(tmp_path):
+    partition = tmp_path / "date=2025-03-04"
+    partition.mkdir()
+    watcher = PipelineWatcher(None, None, {"news": str(tmp_path)})
+    part = partition / "part-0.parquet"
+    part.write_bytes(b"not parquet yet")
+    assert watcher._read_new_headlines() == []
+
+    # Rewriting the file in place leaves the partition's mtime unchanged
+    pd.DataFrame({"stock": ["TCS"], "title": ["TCS wins deal"]}).to_parquet(part, index=False)
+    assert [item["title"] for item in watcher._read_new_headlines()] == ["TCS wins deal"]
+    assert watcher._read_new_headlines() == []
+
+
+def test_corrupt_part_is_skipped_after_a_few_attempts(tmp_path):
+    partition = tmp_path / "date=2025-03-04"
+    partition.mkdir()
+    watcher = PipelineWatcher(None, None, {"news": str(tmp_path)}, read_attempts=3)
+    (partition / "part-0.parquet").write_bytes(b"truncated")
+    for _ in range(3):
+        assert watcher._read_new_headlines() == []
+    assert watcher.watchers["news"].scan() == []
+    assert not watcher._failures
@@ -0,0 +1,54 @@
+import gzip
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import backend.main as main
+from backend.predictions_cache import PredictionsPayload, accepts_gzip
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", True),
+    ("gzip;q=0", False),
+    ("gzip; q=0.0, identity", False),
+    ("br;q=1.0, gzip;q=0.5", True),
+    ("*", True),
+    ("*;q=0", False),
+    ("*, gzip;q=0", False),
+    ("identity", False),
+    (None, False),
+])
+def test_accepts_gzip(header, expected):
+    assert accepts_gzip(header) is expected
+
+
+def test_predictions_respect_refused_gzip(tmp_path, monkeypatch):
+    path = tmp_path / "latest_predictions.json"
+    path.write_text(json.dumps([{"stock": "TCS", "prediction": "UP"}]))
+    monkeypatch.setattr(main, "PREDICTIONS", PredictionsPayload(str(path)))
+    client = TestClient(main.app)
+
+    # httpx decodes gzip bodies itself, so the raw stream is read to see what was sent
+    with client.stream("GET", "/predictions", headers={"Accept-Encoding": "gzip;q=0"}) as response:
+        assert "content-encoding" not in response.headers
+        assert json.loads(b"".join(response.iter_raw()))[0]["stock"] == "TCS"
+    with client.stream("GET", "/predictions", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert json.loads(gzip.decompress(b"".join(response.iter_raw())))[0]["stock"] == "TCS"
+
+
+def test_each_encoding_has_its_own_etag(tmp_path, monkeypatch):
+    path = tmp_path / "latest_predictions.json"
+    path.write_text(json.dumps([{"stock": "TCS", "prediction": "UP"}]))
+    monkeypatch.setattr(main, "PREDICTIONS", PredictionsPayload(str(path)))
+    client = TestClient(main.app)
+
+    plain = client.get("/predictions", headers={"Accept-Encoding": "identity"})
+    packed = client.get("/predictions", headers={"Accept-Encoding": "gzip"})
+    assert plain.headers["etag"] != packed.headers["etag"]
+    assert "Accept-Encoding" in plain.headers["vary"] and "Accept-Encoding" in packed.headers["vary"]
+
+    # Revalidating with either ETag is a 304 carrying the ETag of the encoding that would be sent
+    again = client.get("/predictions", headers={"Accept-Encoding": "gzip", "If-None-Match": plain.headers["etag"]})
+    assert again.status_code == 304 and again.headers["etag"] == packed.headers["etag"]
@@ -0,0 +1,32 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from processing.sentiment_backfill import CARRY_DAYS, attach_sentiment
+
+
+def test_rows_only_see_earlier_days():
+    prices = pd.DataFrame({"Stock_Symbol": ["TCS"] * 3, "Date": ["2025-01-06", "2025-01-07", "2025-01-08"]})
+    daily = pd.DataFrame({"stock": ["TCS", "TCS"], "date": ["2025-01-06", "2025-01-07"],
+                          "decayed_sentiment": [0.4, -0.8], "top_title": ["Deal win", "Results miss after close"]})
+    out = attach_sentiment(prices, daily)
+    assert out["Sentiment_Score"].tolist() == [0.0, 0.4, -0.8]
+    assert out["Title"].tolist() == ["", "Deal win", "Results miss after close"]
+
+
+def test_carry_window_still_applies():
+    late = (pd.Timestamp("2025-01-06") + pd.Timedelta(days=CARRY_DAYS + 1)).strftime("%Y-%m-%d")
+    prices = pd.DataFrame({"Stock_Symbol": ["TCS"], "Date": [late]})
+    daily = pd.DataFrame({"stock": ["TCS"], "date": ["2025-01-06"], "decayed_sentiment": [0.4], "top_title": ["Deal win"]})
+    assert attach_sentiment(prices, daily)["Sentiment_Score"].tolist() == [0.0]
+
+
+def test_record_helpers_import_without_stream_setup(tmp_path):
+    # Pool workers import processing.records; it must not create data dirs or load the scorer
+    code = ("import sys, processing.records; "
+            "assert not {'processing.spark_streaming', 'vaderSentiment'} & set(sys.modules)")
+    subprocess.run([sys.executable, "-c", code], cwd=tmp_path, check=True,
+                   env={"PYTHONPATH": str(Path(__file__).resolve().parents[1])})
+    assert not any(tmp_path.iterdir())
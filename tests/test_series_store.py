@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from backend.series_store import BAR_BYTES, Series
+from backend.history_cache import HistoryCache
+
+
+def _frame(start, closes):
+    index = pd.bdate_range(start, periods=len(closes))
+    return pd.DataFrame({"Close": closes, "Volume": [1] * len(closes)}, index=index)
+
+
+def test_growth_publishes_equal_length_columns():
+    series = Series()
+    for i in range(100):
+        before = series.columns()
+        series.append(i, float(i))
+        assert len({len(a) for a in before.values()}) == 1  # a reader's snapshot never mixes generations
+        after = series.columns()
+        assert len({len(a) for a in after.values()}) == 1 and len(after["dates"]) == i + 1
+    assert series.capacity == 128
+
+
+def test_extend_appends_and_rejects_rewritten_history():
+    series = Series.from_frame(_frame("2025-01-01", [1.0, 2.0, 3.0]).rename(columns=str.lower))
+    recent = Series.from_frame(_frame("2025-01-02", [2.0, 3.5, 4.0]).rename(columns=str.lower))
+    assert series.extend(recent)
+    assert series.columns()["close"].tolist() == [1.0, 2.0, 3.5, 4.0]
+
+    adjusted = Series.from_frame(_frame("2025-01-03", [3.4, 4.0, 5.0]).rename(columns=str.lower))
+    assert not series.extend(adjusted)
+    assert len(series) == 4
+
+
+def test_refresh_appends_to_the_cached_series():
+    calls = []
+
+    def fetcher(symbols, interval, period):
+        calls.append(period)
+        if period == "5d":
+            return {s: _frame("2025-01-06", [4.0, 6.0, 7.0]) for s in symbols}
+        return {s: _frame("2025-01-01", [1.0, 2.0, 3.0, 4.0, 5.5]) for s in symbols}
+
+    cache = HistoryCache(fetcher=fetcher, ttl=-1)  # every get is a refresh
+    first = cache.get("TCS")
+    second = cache.get("TCS")
+    assert second is first
+    assert calls == ["2y", "5d"]
+    assert first.columns()["close"].tolist() == [1.0, 2.0, 3.0, 4.0, 6.0, 7.0]
+    assert np.all(np.diff(first.columns()["dates"]) > 0)
+
+
+def test_five_years_of_daily_bars_for_2000_symbols_fit_the_documented_footprint():
+    # series_store.py header: 2,000 symbols x 5 years of daily bars (~252/year) = ~87 MiB at exact size
+    bars = 5 * 252
+    dates = pd.bdate_range(end="2025-12-31", periods=bars).values.view(np.int64)
+    close = np.linspace(100.0, 200.0, bars)
+    series = Series.from_arrays(dates, close, np.ones(bars), open=close, high=close, low=close)
+    assert series.nbytes == BAR_BYTES * bars
+    assert 2000 * series.nbytes <= 87 * 2**20
+
+    # Spare capacity after growth at most doubles it
+    series.append(dates[-1] + 86_400 * 10**9, 201.0)
+    assert 2000 * series.nbytes <= 2 * 87 * 2**20
@@ -0,0 +1,12 @@
+from processing.stage_format import SAMPLES, read_stage, seed_samples
+
+
+def test_seed_samples_builds_missing_stage_files(tmp_path):
+    samples = [(csv_path, str(tmp_path / f"stage{i}.arrow"), schema) for i, (csv_path, _, schema) in enumerate(SAMPLES)]
+    assert seed_samples(samples) == len(SAMPLES)
+    for csv_path, path, schema in samples:
+        table = read_stage(path)
+        assert table.schema == schema
+        with open(csv_path) as f:
+            assert table.num_rows == sum(1 for _ in f) - 1
+    assert seed_samples(samples) == 0  # existing stage files are never overwritten
@@ -0,0 +1,29 @@
+import start_app
+
+
+def _write(root, rel_path, text):
+    path = root / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def test_stage_key_follows_imported_project_modules(tmp_path, monkeypatch):
+    monkeypatch.setattr(start_app, "ROOT_DIR", str(tmp_path))
+    _write(tmp_path, "pkg/__init__.py", "")
+    _write(tmp_path, "pkg/stage.py", "import json\nfrom pkg import helpers\n\ndef main():\n    from pkg.lazy import f\n")
+    _write(tmp_path, "pkg/helpers.py", "from pkg.deep import VALUE\n")
+    _write(tmp_path, "pkg/deep.py", "VALUE = 1\n")
+    _write(tmp_path, "pkg/lazy.py", "def f(): pass\n")
+    stage = start_app.Stage("stage", "Stage", "pkg/stage.py", inputs=[], outputs=[])
+
+    assert start_app.code_dependencies(stage.script) == ["pkg/__init__.py", "pkg/deep.py", "pkg/helpers.py", "pkg/lazy.py"]
+    cache = {"stages": {}, "files": {}}
+    before = start_app.stage_key(stage, cache)
+    _write(tmp_path, "pkg/deep.py", "VALUE = 20\n")
+    assert start_app.stage_key(stage, cache) != before
+
+
+def test_real_stages_include_their_helpers():
+    deps = {s.name: start_app.code_dependencies(s.script) for s in start_app.STAGES}
+    assert "processing/stage_format.py" in deps["training"]
+    assert "eda/eda_stats.py" in deps["eda"]